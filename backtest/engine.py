@@ -1,8 +1,59 @@
-"""Backtest engine stub."""
+"""Event-driven backtest replaying :class:`main.TradingBot` over stored bars.
+
+History is read from a :class:`~data.columnar.ColumnarBarStore` holding
+``1 hour`` and ``1 day`` bars.  At every primary cycle time (the scheduler's
+4H boundaries on weekdays) the engine:
+
+1. lets :class:`SimulatedBroker` fill working orders against the 1H bars
+   that closed since the previous cycle,
+2. moves :class:`BacktestMarketData` to the cycle time and
+3. runs the real :meth:`~main.TradingBot.run_cycle` for every symbol.
+
+Indicators are computed once per symbol and timeframe over the whole
+history; a point-in-time request only slices the rows that had closed by
+the cycle time, so no bar is seen before it completes.
+"""
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from loguru import logger
+from config import settings
+from data.columnar import ColumnarBarStore, ColumnarMarketData, SymbolBars, _to_ns
+from data.columns import DEFAULT_COLUMNS, add_columns, select
+from data.rollups import Session, bucket_ends, rollup
+from exec.broker import Broker, Order
+from scheduler import FOUR_HOUR_BOUNDARIES
+
+from .metrics import StreamingMetrics, cagr, max_drawdown
+
+# Store bar size and bucket behind each timeframe ``get_bars`` serves.
+TIMEFRAMES = {"1H": ("1 hour", "1 hour"), "4H": ("1 hour", "4 hours"), "D": ("1 day", "1 day")}
+_YEAR_NS = 365.25 * 86_400 * 10**9
+
+
+@dataclass
+class Trade:
+    """One round trip from flat to flat."""
+
+    symbol: str
+    entry_time: int
+    qty: int
+    entry_price: float
+    exit_time: int = 0
+    exit_price: float = 0.0
+    _proceeds: float = field(default=0.0, repr=False)
+
+    @property
+    def pnl(self) -> float:
+        return (self.exit_price - self.entry_price) * self.qty
 
 
 @dataclass
@@ -10,11 +61,323 @@ class BacktestResult:
     trades: int = 0
     cagr: float = 0.0
     max_dd: float = 0.0
+    trade_log: List[Trade] = field(default_factory=list)
+    metrics: StreamingMetrics | None = None
+    times: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    equity: np.ndarray = field(default_factory=lambda: np.empty(0))
+    errors: int = 0
+
+
+@dataclass
+class BacktestMarketData(ColumnarMarketData):
+    """Point-in-time market data served from precomputed history.
+
+    The first request of a ``(symbol, tf)`` computes its indicator columns
+    over the full stored history; later requests slice the bars closed by
+    :attr:`as_of`.
+    """
+
+    session: Session = field(default_factory=Session)
+    _history: Dict[Tuple[str, str], Tuple[pd.DataFrame, np.ndarray]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def history(self, symbol: str, tf: str) -> Tuple[pd.DataFrame, np.ndarray]:
+        """Full indicator frame of ``symbol`` and the close time of every bar."""
+
+        key = (symbol, tf)
+        if key not in self._history:
+            if tf not in TIMEFRAMES:
+                raise NotImplementedError(tf)
+            source, bucket = TIMEFRAMES[tf]
+            df = self.store.open(symbol, source).to_frame()
+            if bucket != source and len(df):
+                df = rollup(df, bucket, source, self.session)
+            add_columns(df, DEFAULT_COLUMNS.get(tf, ()))
+            ends = bucket_ends(df.index.asi8, bucket, self.session) if len(df) else np.empty(0, dtype=np.int64)
+            self._history[key] = (df, ends)
+        return self._history[key]
+
+    def available(self, symbol: str, tf: str) -> int:
+        """Number of ``tf`` bars of ``symbol`` closed by :attr:`as_of`."""
+
+        _, ends = self.history(symbol, tf)
+        return int(np.searchsorted(ends, _to_ns(self.as_of), side="right"))
+
+    def get_bars(
+        self, symbol: str, tf: str, lookback: int, columns: Iterable[str] | None = None
+    ) -> pd.DataFrame:
+        columns = DEFAULT_COLUMNS.get(tf, ()) if columns is None else tuple(columns)
+        df, _ = self.history(symbol, tf)
+        add_columns(df, columns)
+        n = self.available(symbol, tf)
+        return select(df.iloc[max(n - lookback, 0) : n], columns)
+
+    def last_closed_bar(self, symbol: str, tf: str, now: float | None = None) -> int:
+        df, _ = self.history(symbol, tf)
+        n = self.available(symbol, tf)
+        return int(df.index.asi8[n - 1]) if n else 0
+
+    def load_panel(self, symbols: Sequence[str], tf: str, lookback: int) -> None:
+        # Indicators are already computed over the whole history.
+        return None
+
+    def get_vix(self) -> float | None:
+        if "VIX" not in self.store.symbols("1 day"):
+            return None
+        df = self.get_bars("VIX", "D", 1, columns=())
+        return float(df["close"].iloc[-1]) if len(df) else None
+
+
+@dataclass(eq=False)
+class _Working:
+    order: Order
+    placed: int
+    parent: "_Working | None" = None
+    filled: bool = False
+
+    @property
+    def active(self) -> bool:
+        return self.parent is None or self.parent.filled
+
+    @property
+    def stop(self) -> bool:
+        """A bracket sell below its entry price is the protective stop."""
+
+        return self.parent is not None and self.order.price < self.parent.order.price
 
 
-def run_backtest() -> BacktestResult:  # pragma: no cover - placeholder
-    return BacktestResult()
+@dataclass
+class SimulatedBroker(Broker):
+    """Broker filling limit and stop orders against later 1H bars.
+
+    Orders placed at :attr:`now` only see bars starting at or after it.  A
+    buy limit fills at the open when the bar gaps through the limit and at
+    the limit otherwise; sell limits and sell stops mirror that.  Sell
+    orders placed while the symbol's entry is still working are its bracket
+    and only become active once it fills; the one priced below the entry is
+    its stop.  Stops are checked before targets within a bar, a symbol going
+    flat cancels its remaining orders and an entry still working after
+    ``entry_expiry`` is cancelled with its bracket.
+    :attr:`metrics` is updated as every round trip closes.
+    """
+
+    store: ColumnarBarStore
+    cash: float = 100_000.0
+    session: Session = field(default_factory=Session)
+    entry_expiry: timedelta = timedelta(days=1)
+    now: int = 0
+    positions: Dict[str, int] = field(default_factory=dict)
+    working: Dict[str, List[_Working]] = field(default_factory=dict)
+    trades: List[Trade] = field(default_factory=list)
+    _open: Dict[str, Trade] = field(default_factory=dict, repr=False)
+    _marks: Dict[str, float] = field(default_factory=dict, repr=False)
+    _bars: Dict[str, Tuple[SymbolBars, np.ndarray]] = field(default_factory=dict, repr=False)
+    metrics: StreamingMetrics | None = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.metrics is None:
+            self.metrics = StreamingMetrics(self.cash)
+
+    def place_order(self, order: Order) -> str:
+        orders = self.working.setdefault(order.symbol, [])
+        entry = next((w for w in orders if w.order.side == "BUY" and not w.filled), None)
+        parent = entry if order.side == "SELL" else None
+        orders.append(_Working(order, self.now, parent))
+        return str(sum(len(v) for v in self.working.values()))
+
+    def get_balance(self) -> float:
+        return self.cash + sum(qty * self._marks.get(symbol, 0.0) for symbol, qty in self.positions.items())
+
+    def get_positions(self) -> Dict[str, int]:
+        return dict(self.positions)
+
+    def advance(self, until: int) -> None:
+        """Fill working orders on the 1H bars closing in ``(now, until]``."""
+
+        for symbol in list(self.working):
+            self._advance_symbol(symbol, until)
+        for symbol in self.positions:
+            bars, ends = self.bars(symbol)
+            n = int(np.searchsorted(ends, until, side="right"))
+            if n:
+                self._marks[symbol] = float(bars["close"][n - 1])
+        self.now = until
+
+    def bars(self, symbol: str) -> Tuple[SymbolBars, np.ndarray]:
+        """1H bars of ``symbol`` and the close time of each."""
+
+        if symbol not in self._bars:
+            bars = self.store.open(symbol, "1 hour")
+            self._bars[symbol] = (bars, bucket_ends(bars.ts, "1 hour", self.session))
+        return self._bars[symbol]
+
+    def _advance_symbol(self, symbol: str, until: int) -> None:
+        bars, ends = self.bars(symbol)
+        lo, hi = np.searchsorted(ends, [self.now, until], side="right")
+        for t, o, h, l in zip(bars.ts[lo:hi], bars["open"][lo:hi], bars["high"][lo:hi], bars["low"][lo:hi]):
+            orders = self.working.get(symbol, [])
+            due = sorted((w for w in orders if w.active and w.placed <= t), key=lambda w: not w.stop)
+            for w in due:
+                if w not in self.working.get(symbol, []):
+                    continue  # cancelled by an earlier fill in this bar
+                if w.order.side == "BUY" and t - w.placed > self.entry_expiry.total_seconds() * 1e9:
+                    self._cancel(symbol, w)
+                    continue
+                price = self._trigger(w, o, h, l)
+                if price is not None:
+                    self._fill(symbol, w, int(t), price)
+            if not self.working.get(symbol):
+                break
+        if not self.working.get(symbol):
+            self.working.pop(symbol, None)
+
+    @staticmethod
+    def _trigger(w: _Working, o: float, h: float, l: float) -> float | None:
+        order = w.order
+        if order.side == "BUY":
+            return min(o, order.price) if l <= order.price else None
+        if w.stop:
+            return min(o, order.price) if l <= order.price else None
+        return max(o, order.price) if h >= order.price else None
+
+    def _fill(self, symbol: str, w: _Working, t: int, price: float) -> None:
+        held = self.positions.get(symbol, 0)
+        qty = w.order.qty if w.order.side == "BUY" else min(w.order.qty, held)
+        w.filled = True
+        if w in self.working.get(symbol, []):
+            self.working[symbol].remove(w)
+        if qty <= 0:
+            return
+        if w.order.side == "BUY":
+            self.cash -= qty * price
+            self.positions[symbol] = held + qty
+            trade = self._open.get(symbol)
+            if trade is None:
+                self._open[symbol] = Trade(symbol, t, qty, price)
+            else:
+                trade.entry_price = (trade.entry_price * trade.qty + price * qty) / (trade.qty + qty)
+                trade.qty += qty
+            return
+        self.cash += qty * price
+        self.positions[symbol] = held - qty
+        trade = self._open[symbol]
+        trade._proceeds += qty * price
+        if self.positions[symbol] == 0:
+            del self.positions[symbol]
+            trade.exit_time = t
+            trade.exit_price = trade._proceeds / trade.qty
+            self.trades.append(self._open.pop(symbol))
+            self.metrics.close_trade(trade.pnl)
+            self.working.pop(symbol, None)
+
+    def _cancel(self, symbol: str, entry: _Working) -> None:
+        self.working[symbol] = [w for w in self.working[symbol] if w is not entry and w.parent is not entry]
+
+
+def cycle_times(start: date, end: date, tz: ZoneInfo | None = None) -> List[datetime]:
+    """Primary cycle times (4H boundaries) of every weekday in ``[start, end]``."""
+
+    tz = tz or ZoneInfo(settings.timezone)
+    times = []
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            times.extend(datetime.combine(day, t, tzinfo=tz) for t in FOUR_HOUR_BOUNDARIES)
+        day += timedelta(days=1)
+    return times
+
+
+def _sync_positions(bot: Any, broker: SimulatedBroker) -> None:
+    """Align the bot's bookkeeping with the broker after fills.
+
+    Symbols that went flat with nothing working are forgotten so the bot
+    may enter them again.
+    """
+
+    for symbol in list(bot.positions):
+        held = broker.positions.get(symbol, 0)
+        if held:
+            bot.position_sizes[symbol] = held
+        elif not broker.working.get(symbol):
+            bot.positions.pop(symbol)
+            bot.position_sizes.pop(symbol, None)
+
+
+def run_backtest(
+    store: ColumnarBarStore,
+    symbols: Sequence[str],
+    start: date,
+    end: date,
+    cash: float = 100_000.0,
+    skip_errors: bool = False,
+    **bot_kwargs: Any,
+) -> BacktestResult:
+    """Replay ``symbols`` from ``start`` to ``end`` through :class:`main.TradingBot`.
+
+    An exception while evaluating a symbol aborts the run so a scoring or
+    data bug cannot pass for a quiet backtest.  With ``skip_errors`` it is
+    logged, the symbol is skipped for that cycle and
+    :attr:`BacktestResult.errors` counts the failures.
+    """
+
+    from main import TradingBot
+    from scoring.context import MarketContext
+
+    market_data = BacktestMarketData(store=store, as_of=datetime.combine(start, datetime.min.time(), timezone.utc))
+    broker = SimulatedBroker(store, cash=cash, session=market_data.session)
+    if "context" not in bot_kwargs and market_data.get_reference_symbol() in store.symbols("1 hour"):
+        bot_kwargs["context"] = MarketContext(
+            market_data,
+            fear_greed=lambda: 50,
+            clock=lambda: market_data.as_of.timestamp(),
+        )
+    bot = TradingBot(market_data, broker, clock=lambda: market_data.as_of, **bot_kwargs)
+
+    times, equity, errors = [], [], 0
+    for now in cycle_times(start, end):
+        t = _to_ns(now)
+        broker.advance(t)
+        _sync_positions(bot, broker)
+        market_data.as_of = now
+        market = bot.begin_cycle()
+        bot.score_exits(symbols)
+        for symbol in symbols:
+            try:
+                bot.run_cycle(symbol, market)
+            except Exception:
+                if not skip_errors:
+                    raise
+                errors += 1
+                logger.opt(exception=True).error("Backtest cycle failed", symbol=symbol, time=str(now))
+        times.append(t)
+        equity.append(broker.get_balance())
+
+    equity_arr = np.asarray(equity, dtype=float)
+    years = (times[-1] - times[0]) / _YEAR_NS if len(times) > 1 else 0.0
+    logger.info("Backtest finished", cycles=len(times), trades=len(broker.trades), errors=errors)
+    return BacktestResult(
+        trades=len(broker.trades),
+        cagr=cagr(equity_arr, years),
+        max_dd=max_drawdown(equity_arr),
+        trade_log=broker.trades,
+        metrics=broker.metrics,
+        times=np.asarray(times, dtype=np.int64),
+        equity=equity_arr,
+        errors=errors,
+    )
 
 
 if __name__ == "__main__":  # pragma: no cover
-    print(run_backtest())
+    import argparse
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("store", type=Path, help="columnar bar store directory")
+    parser.add_argument("start", type=date.fromisoformat)
+    parser.add_argument("end", type=date.fromisoformat)
+    parser.add_argument("--cash", type=float, default=100_000.0)
+    parser.add_argument("--skip-errors", action="store_true", help="log and count failing symbols instead of stopping")
+    args = parser.parse_args()
+    bar_store = ColumnarBarStore(args.store)
+    print(run_backtest(bar_store, bar_store.symbols("1 hour"), args.start, args.end, args.cash, args.skip_errors))
@@ -1,14 +1,236 @@
-"""Metrics helpers for backtests."""
+"""Metrics helpers for backtests.
+
+Every function reduces along the last axis, so a single curve gives a
+scalar and a ``(strategies, time)`` matrix - e.g. the equity curves of a
+whole sweep - gives one value per strategy in the same call.  Equity-based
+metrics take equity curves; :func:`sharpe`, :func:`sortino` and
+:func:`rolling_sharpe` take per-period returns, annualised with
+``periods`` per year (``1`` leaves them per period).  Trade metrics take
+per-trade returns or PnL where ``NaN`` marks "no trade", the layout of
+:attr:`backtest.signals.SignalResult.returns`.
+
+:class:`StreamingMetrics` keeps the trade metrics and the drawdown of a
+run up to date as trades close, without storing them.
+"""
 
 from __future__ import annotations
 
-from typing import Iterable
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator
 
 import numpy as np
 
 
-def sharpe(returns: Iterable[float]) -> float:
-    arr = np.array(list(returns))
-    if arr.std() == 0:
-        return 0.0
-    return arr.mean() / arr.std()
+def _array(x: Iterable[float] | np.ndarray) -> np.ndarray:
+    if isinstance(x, Iterator):
+        x = list(x)
+    return np.asarray(x, dtype=np.float64)
+
+
+def _out(x: np.ndarray) -> float | np.ndarray:
+    """Plain ``float`` for 1-D inputs, an array per strategy otherwise."""
+
+    return float(x) if np.ndim(x) == 0 else x
+
+
+def returns(equity: Iterable[float] | np.ndarray) -> np.ndarray:
+    """Simple per-period returns of ``equity``."""
+
+    arr = _array(equity)
+    return arr[..., 1:] / arr[..., :-1] - 1.0
+
+
+def _sharpe(mean: np.ndarray, var: np.ndarray, mean_sq: np.ndarray, periods: float) -> np.ndarray:
+    """``mean / sqrt(var)``, ``0`` where the variance is only rounding noise."""
+
+    var = np.asarray(var, dtype=np.float64)
+    flat = var <= 1e-10 * mean_sq
+    std = np.sqrt(np.maximum(var, 0.0))
+    return np.divide(mean, std, out=np.zeros_like(std), where=~flat) * math.sqrt(periods)
+
+
+def sharpe(returns: Iterable[float] | np.ndarray, periods: float = 1.0) -> float | np.ndarray:
+    """Mean over standard deviation of ``returns``; ``0`` for constant returns."""
+
+    arr = _array(returns)
+    return _out(_sharpe(arr.mean(axis=-1), arr.var(axis=-1), np.mean(arr**2, axis=-1), periods))
+
+
+def sortino(
+    returns: Iterable[float] | np.ndarray, periods: float = 1.0, target: float = 0.0
+) -> float | np.ndarray:
+    """Mean excess return over downside deviation below ``target``."""
+
+    excess = _array(returns) - target
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2, axis=-1))
+    ratio = np.divide(excess.mean(axis=-1), downside, out=np.zeros_like(downside), where=downside > 0)
+    return _out(ratio * math.sqrt(periods))
+
+
+def rolling_sharpe(returns: Iterable[float] | np.ndarray, window: int, periods: float = 1.0) -> np.ndarray:
+    """:func:`sharpe` of every ``window`` consecutive returns.
+
+    The result is ``window - 1`` periods shorter than ``returns``.
+    """
+
+    arr = _array(returns)
+    zeros = np.zeros(arr.shape[:-1] + (1,))
+    total = np.concatenate([zeros, np.cumsum(arr, axis=-1)], axis=-1)
+    squares = np.concatenate([zeros, np.cumsum(arr**2, axis=-1)], axis=-1)
+    mean = (total[..., window:] - total[..., :-window]) / window
+    mean_sq = (squares[..., window:] - squares[..., :-window]) / window
+    return _sharpe(mean, mean_sq - mean**2, mean_sq, periods)
+
+
+def cagr(equity: Iterable[float] | np.ndarray, years: float) -> float | np.ndarray:
+    """Compound annual growth rate of ``equity`` over ``years``.
+
+    ``0`` for fewer than two points, no elapsed time or a non-positive start
+    and ``-1`` for a curve ending at or below zero.
+    """
+
+    arr = _array(equity)
+    if arr.shape[-1] < 2 or years <= 0:
+        return _out(np.zeros(arr.shape[:-1]))
+    first, last = arr[..., 0], arr[..., -1]
+    valid = (first > 0) & (last > 0)
+    growth = np.divide(last, first, out=np.ones_like(first), where=valid)
+    rate = np.where(valid, growth ** (1.0 / years) - 1.0, np.where(first > 0, -1.0, 0.0))
+    return _out(rate)
+
+
+def max_drawdown(equity: Iterable[float] | np.ndarray) -> float | np.ndarray:
+    """Largest peak-to-trough decline of ``equity`` as a positive fraction."""
+
+    arr = _array(equity)
+    if arr.shape[-1] == 0:
+        return _out(np.zeros(arr.shape[:-1]))
+    peak = np.maximum.accumulate(arr, axis=-1)
+    return _out(np.max(1.0 - arr / peak, axis=-1))
+
+
+def drawdown_duration(equity: Iterable[float] | np.ndarray) -> int | np.ndarray:
+    """Longest number of periods ``equity`` spent below its running peak."""
+
+    arr = _array(equity)
+    if arr.shape[-1] == 0:
+        return _out(np.zeros(arr.shape[:-1], dtype=np.int64))
+    index = np.arange(arr.shape[-1])
+    at_peak = arr >= np.maximum.accumulate(arr, axis=-1)
+    last_peak = np.maximum.accumulate(np.where(at_peak, index, 0), axis=-1)
+    longest = np.max(index - last_peak, axis=-1)
+    return int(longest) if np.ndim(longest) == 0 else longest
+
+
+def calmar(equity: Iterable[float] | np.ndarray, years: float) -> float | np.ndarray:
+    """:func:`cagr` over :func:`max_drawdown`; ``0`` without a drawdown."""
+
+    arr = _array(equity)
+    growth, dd = np.asarray(cagr(arr, years)), np.asarray(max_drawdown(arr))
+    return _out(np.divide(growth, dd, out=np.zeros_like(dd), where=dd > 0))
+
+
+def hit_rate(trades: Iterable[float] | np.ndarray) -> float | np.ndarray:
+    """Fraction of trades with a positive result; ``NaN`` entries are not trades."""
+
+    arr = _array(trades)
+    count = np.sum(~np.isnan(arr), axis=-1)
+    wins = np.sum(arr > 0, axis=-1)
+    return _out(np.divide(wins, count, out=np.zeros(np.shape(count)), where=count > 0))
+
+
+def profit_factor(trades: Iterable[float] | np.ndarray) -> float | np.ndarray:
+    """Gross profit over gross loss; ``inf`` with profits but no losses."""
+
+    arr = _array(trades)
+    gains = np.nansum(np.where(arr > 0, arr, 0.0), axis=-1)
+    losses = -np.nansum(np.where(arr < 0, arr, 0.0), axis=-1)
+    ratio = np.divide(gains, losses, out=np.where(gains > 0, np.inf, 0.0), where=losses > 0)
+    return _out(ratio)
+
+
+def exposure(positions: Iterable[float] | np.ndarray) -> float | np.ndarray:
+    """Fraction of periods with a non-zero position."""
+
+    arr = _array(positions)
+    if arr.shape[-1] == 0:
+        return _out(np.zeros(arr.shape[:-1]))
+    return _out(np.mean(np.nan_to_num(arr) != 0, axis=-1))
+
+
+def summary(equity: np.ndarray, years: float, periods: float = 1.0) -> Dict[str, float | np.ndarray]:
+    """Equity-curve metrics of one curve or a ``(strategies, time)`` matrix."""
+
+    arr = _array(equity)
+    rets = returns(arr)
+    return {
+        "cagr": cagr(arr, years),
+        "max_dd": max_drawdown(arr),
+        "dd_duration": drawdown_duration(arr),
+        "calmar": calmar(arr, years),
+        "sharpe": sharpe(rets, periods),
+        "sortino": sortino(rets, periods),
+    }
+
+
+@dataclass
+class StreamingMetrics:
+    """Trade metrics and drawdown updated one closed trade at a time.
+
+    Per-trade returns are PnL over the equity before the trade; their mean
+    and variance follow Welford's update.
+    """
+
+    equity: float = 100_000.0
+    trades: int = 0
+    wins: int = 0
+    gross_profit: float = 0.0
+    gross_loss: float = 0.0
+    peak: float = 0.0
+    max_dd: float = 0.0
+    _mean: float = 0.0
+    _m2: float = 0.0
+    _downside: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.peak = max(self.peak, self.equity)
+
+    def close_trade(self, pnl: float) -> None:
+        ret = pnl / self.equity if self.equity else 0.0
+        self.equity += pnl
+        self.trades += 1
+        if pnl > 0:
+            self.wins += 1
+            self.gross_profit += pnl
+        elif pnl < 0:
+            self.gross_loss -= pnl
+        delta = ret - self._mean
+        self._mean += delta / self.trades
+        self._m2 += delta * (ret - self._mean)
+        self._downside += min(ret, 0.0) ** 2
+        self.peak = max(self.peak, self.equity)
+        if self.peak > 0:
+            self.max_dd = max(self.max_dd, 1.0 - self.equity / self.peak)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.wins / self.trades if self.trades else 0.0
+
+    @property
+    def profit_factor(self) -> float:
+        if self.gross_loss:
+            return self.gross_profit / self.gross_loss
+        return math.inf if self.gross_profit else 0.0
+
+    @property
+    def sharpe(self) -> float:
+        """Per-trade Sharpe ratio, as :func:`sharpe` of the trade returns."""
+
+        std = math.sqrt(self._m2 / self.trades) if self.trades else 0.0
+        return self._mean / std if std > 0 else 0.0
+
+    @property
+    def sortino(self) -> float:
+        downside = math.sqrt(self._downside / self.trades) if self.trades else 0.0
+        return self._mean / downside if downside > 0 else 0.0
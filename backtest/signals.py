@@ -0,0 +1,460 @@
+"""Vectorised signal-matrix backtests.
+
+:mod:`backtest.engine` replays the bot cycle by cycle; this mode trades the
+same rules for research sweeps.  The compiled entry and exit rules of
+:mod:`scoring.entry_scoring` and :mod:`scoring.exit_scoring` are evaluated
+for every ``(symbol, 4H bar)`` at once, with the daily and 1H columns taken
+from the last bars closed by each 4H close.  Rule conditions do not depend
+on the weights, so a weight or threshold sweep only re-runs
+:meth:`SignalMatrix.run`.
+
+Trades follow a simplified version of the live order flow:
+
+* a flat symbol enters at the close of a 4H bar whose entry score reaches
+  the threshold,
+* the :data:`~exec.orders.BRACKET` stop and targets are then watched on the
+  following ``max_hold`` bars: half the position exits at ``pt1``, the rest
+  at ``pt2``; the stop is checked before the targets within a bar and gaps
+  fill at the open,
+* an exit score reaching its threshold closes what is left at that bar's
+  close, as does reaching ``max_hold``.
+
+Each trade's first-hit bars come from sliding windows over the following
+bars and the sequence of trades actually taken - a symbol cannot re-enter
+before its previous trade is closed - from pointer doubling over "next entry
+after this trade" links, so there is no loop over bars.  Every trade is
+sized at ``portfolio_pct`` of equity and its return is realised at its exit
+bar.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, time, timezone
+from typing import Any, Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from config import settings
+from data.columnar import ColumnarBarStore
+from data.kernels import adx
+from data.panel import Panel, add_indicators, sma
+from data.rollups import RollupEngine, Session, bucket_ends
+from exec.orders import BRACKET, BracketParams
+from scoring import entry_scoring, exit_scoring
+from scoring.entry_scoring import ENTRY_THRESHOLD
+from scoring.exit_scoring import EXIT_THRESHOLD
+from scoring.context import DEFAULT_REGIME
+from scoring.earnings import EarningsCalendar
+from scoring.regime import detect_regimes
+from scoring.rules import CompiledRules, RuleSet, columns
+
+from .metrics import cagr, max_drawdown
+
+# Panel timeframe, bucket size and rule table key of every input.
+TIMEFRAMES = {"D": ("1 day", "D"), "4H": ("4 hours", "H4"), "1H": ("1 hour", "H1")}
+_YEAR_NS = 365.25 * 86_400 * 10**9
+
+
+@dataclass(frozen=True)
+class SignalParams:
+    """One parameter set of :meth:`SignalMatrix.run`.
+
+    ``entry_weights`` and ``exit_weights`` replace the rule weights, in rule
+    order, when given.
+    """
+
+    entry_threshold: float = ENTRY_THRESHOLD
+    exit_threshold: float = EXIT_THRESHOLD
+    bracket: BracketParams = BRACKET
+    max_hold: int = 60
+    portfolio_pct: float = settings.portfolio_pct
+    entry_weights: Tuple[float, ...] | None = None
+    exit_weights: Tuple[float, ...] | None = None
+
+
+@dataclass
+class SignalResult:
+    trades: int = 0
+    cagr: float = 0.0
+    max_dd: float = 0.0
+    times: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    equity: np.ndarray = field(default_factory=lambda: np.empty(0))
+    # ``(symbols, bars)``: trades taken at each entry bar, their exit bar and return.
+    entries: np.ndarray = field(default_factory=lambda: np.empty((0, 0), dtype=bool))
+    exit_bars: np.ndarray = field(default_factory=lambda: np.empty((0, 0), dtype=np.int64))
+    returns: np.ndarray = field(default_factory=lambda: np.empty((0, 0)))
+
+
+def pairs(x: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """Bar before and bar ``idx`` of ``x`` as a ``(..., len(idx), 2)`` table.
+
+    Indices below zero, i.e. no bar yet, read ``NaN``.
+    """
+
+    x = np.concatenate([np.asarray(x, dtype=np.float64), np.full(x.shape[:-1] + (1,), np.nan)], axis=-1)
+    idx = np.asarray(idx)
+    return np.stack([x[..., np.where(idx > 0, idx - 1, -1)], x[..., idx]], axis=-1)
+
+
+def _first(hits: np.ndarray) -> np.ndarray:
+    """Offset of the first hit along the last axis, its length when none."""
+
+    return np.where(hits.any(axis=-1), hits.argmax(axis=-1), hits.shape[-1])
+
+
+def _windows(x: np.ndarray, width: int) -> np.ndarray:
+    """``(symbols, bars, width)`` view of the ``width`` bars after every bar."""
+
+    padded = np.concatenate([x[:, 1:], np.full((x.shape[0], width), np.nan)], axis=1)
+    return sliding_window_view(padded, width, axis=1)[:, : x.shape[1]]
+
+
+def chain(entries: np.ndarray, exit_bars: np.ndarray) -> np.ndarray:
+    """Entries taken when a symbol only re-enters after its last exit.
+
+    ``exit_bars`` holds the exit bar of a trade entered at every bar; the
+    next trade may enter on the bar after it.
+    """
+
+    n, bars = entries.shape
+    index = np.where(entries, np.arange(bars), bars)
+    following = np.minimum.accumulate(index[:, ::-1], axis=1)[:, ::-1]
+    following = np.concatenate([following, np.full((n, 1), bars)], axis=1)
+    resume = np.minimum(np.where(entries, exit_bars + 1, bars), bars)
+    jump = np.concatenate([np.take_along_axis(following, resume, axis=1), np.full((n, 1), bars)], axis=1)
+    # f^(2^k) for every k; together they reach any number of trades.
+    jumps = [jump]
+    while 1 << len(jumps) <= bars:
+        jumps.append(np.take_along_axis(jumps[-1], jumps[-1], axis=1))
+    taken = np.zeros((n, bars + 1), dtype=bool)
+    taken[np.arange(n), following[:, 0]] = True
+    for jump in reversed(jumps):
+        rows, cols = np.nonzero(taken)
+        taken[rows, jump[rows, cols]] = True
+    return taken[:, :bars]
+
+
+def simulate(
+    prices: Mapping[str, np.ndarray],
+    entries: np.ndarray,
+    exits: np.ndarray,
+    bracket: BracketParams = BRACKET,
+    max_hold: int = 60,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Trades of ``(symbols, bars)`` entry and exit signals.
+
+    Returns:
+        Entries taken, the exit bar and the return of a trade entered at
+        every bar; the latter two are only meaningful where an entry is
+        taken.
+    """
+
+    close = prices["close"]
+    bars = close.shape[1]
+    span = np.arange(bars)
+    last = np.minimum(max_hold, bars - 1 - span) - 1
+    win = {name: _windows(prices[name], max_hold) for name in ("open", "high", "low", "close")}
+    stop, pt1, pt2 = (level[..., None] for level in bracket.prices(close))
+    stopped = _first(win["low"] <= stop)
+    first = _first(win["high"] >= pt1)
+    second = _first(win["high"] >= pt2)
+    # The exit score is read at each bar's close, after its intrabar fills.
+    signal = np.minimum(_first(_windows(exits.astype(np.float64), max_hold) > 0), last)
+    by_stop = stopped <= signal
+    rest = np.where(by_stop, stopped, signal)
+
+    def at(window: np.ndarray, offset: np.ndarray) -> np.ndarray:
+        return np.take_along_axis(window, np.minimum(offset, max_hold - 1)[..., None], -1)[..., 0]
+
+    rest_price = np.where(by_stop, np.minimum(at(win["open"], rest), stop[..., 0]), at(win["close"], rest))
+    halves = []
+    for hit, level in ((first, pt1[..., 0]), (second, pt2[..., 0])):
+        at_target = (hit < stopped) & (hit <= rest)
+        price = np.fmax(at(win["open"], hit), level)
+        halves.append((np.where(at_target, hit, rest), np.where(at_target, price, rest_price)))
+    exit_bars = span + 1 + np.maximum(halves[0][0], halves[1][0])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = 0.5 * (halves[0][1] + halves[1][1]) / close - 1.0
+    entries = entries & (last >= 0) & np.isfinite(returns)
+    return chain(entries, exit_bars), exit_bars, returns
+
+
+@dataclass
+class SignalMatrix:
+    """Rule conditions and prices of a universe on the 4H bar grid.
+
+    Attributes:
+        times: Close time (UTC ns) of every 4H bar.
+        prices: ``open``, ``high``, ``low`` and ``close`` as ``(symbols, bars)``.
+        entry_fired: Entry rule conditions, ``(rules, symbols, bars)``.
+        exit_fired: Exit rule conditions, ``(rules, symbols, bars)``.
+        daily_rsi: Latest daily RSI at every bar for the sentiment overlay.
+        regime: Market regime label at every bar.
+        tradable: Bars on which entries may be opened.
+        blackout: ``(symbols, bars)`` earnings blackouts in which no entry
+            is opened, see :meth:`from_ohlcv`.
+    """
+
+    symbols: Sequence[str]
+    times: np.ndarray
+    prices: Dict[str, np.ndarray]
+    entry_fired: np.ndarray
+    exit_fired: np.ndarray
+    daily_rsi: np.ndarray
+    regime: np.ndarray
+    tradable: np.ndarray
+    entry_rules: CompiledRules
+    exit_rules: CompiledRules
+    sentiment: Mapping[str, Any] = field(default_factory=lambda: {"fg": 50})
+    blackout: np.ndarray | None = None
+
+    @classmethod
+    def from_tables(
+        cls,
+        symbols: Sequence[str],
+        times: np.ndarray,
+        prices: Mapping[str, np.ndarray],
+        tables: Mapping[str, Mapping[str, np.ndarray]],
+        regime: str | np.ndarray = DEFAULT_REGIME,
+        tradable: np.ndarray | None = None,
+        entry_rules: RuleSet = entry_scoring.RULES,
+        exit_rules: RuleSet = exit_scoring.RULES,
+        **kwargs: Any,
+    ) -> "SignalMatrix":
+        """Evaluate the rules on ``(symbols, bars, 2)`` tables of previous and latest bars."""
+
+        entry, exit_ = entry_rules.compile(), exit_rules.compile()
+        rsi = tables["D"].get("rsi")
+        rsi = rsi[..., 1] if rsi is not None else np.full(prices["close"].shape, entry_scoring.DEFAULTS["rsi"])
+        return cls(
+            symbols=list(symbols),
+            times=np.asarray(times, dtype=np.int64),
+            prices={name: np.asarray(prices[name], dtype=np.float64) for name in ("open", "high", "low", "close")},
+            entry_fired=entry.conditions(tables)[..., 0],
+            exit_fired=exit_.conditions(tables)[..., 0],
+            daily_rsi=rsi,
+            regime=np.broadcast_to(np.asarray(regime), np.shape(times)),
+            tradable=np.ones(np.shape(times), dtype=bool) if tradable is None else np.asarray(tradable),
+            entry_rules=entry,
+            exit_rules=exit_,
+            **kwargs,
+        )
+
+    @classmethod
+    def from_panels(
+        cls, panels: Mapping[str, Panel], session: Session | None = None, **kwargs: Any
+    ) -> "SignalMatrix":
+        """Build the matrix from ``"D"``, ``"4H"`` and ``"1H"`` indicator panels.
+
+        The panels must list the same symbols in the same order.
+        """
+
+        session = session or Session()
+        ends = {
+            tf: bucket_ends(panels[tf].index.asi8, TIMEFRAMES[tf][0], session) for tf in TIMEFRAMES if tf in panels
+        }
+        times = ends["4H"]
+        rule_sets = (kwargs.get("entry_rules", entry_scoring.RULES), kwargs.get("exit_rules", exit_scoring.RULES))
+        needed: Dict[str, set] = {}
+        for rule_set in rule_sets:
+            for key, names in columns(rule_set).items():
+                needed.setdefault(key, set()).update(names)
+        needed.setdefault("D", set()).add("rsi")
+        tables = {}
+        for tf, (_, key) in TIMEFRAMES.items():
+            if tf not in panels:
+                continue
+            idx = np.searchsorted(ends[tf], times, side="right") - 1
+            data = panels[tf].data
+            tables[key] = {name: pairs(data[name], idx) for name in needed.get(key, ()) if name in data}
+        h4 = panels["4H"]
+        return cls.from_tables(h4.symbols, times, h4.data, tables, **kwargs)
+
+    @classmethod
+    def from_store(
+        cls,
+        store: ColumnarBarStore,
+        symbols: Sequence[str],
+        start: date,
+        end: date,
+        warmup_days: int = 400,
+        session: Session | None = None,
+        reference: str = "SPY",
+        **kwargs: Any,
+    ) -> "SignalMatrix":
+        """Load ``symbols`` from a columnar store and trade from ``start`` to ``end``.
+
+        ``warmup_days`` of earlier history feed the indicators only.
+        """
+
+        session = session or Session()
+        panels = load_panels(store, symbols, start, end, warmup_days, session, reference)
+        return cls.from_ohlcv(panels, symbols, start, session, reference, **kwargs)
+
+    @classmethod
+    def from_ohlcv(
+        cls,
+        panels: Mapping[str, Panel],
+        symbols: Sequence[str],
+        start: date,
+        session: Session | None = None,
+        reference: str = "SPY",
+        calendar: EarningsCalendar | None = None,
+        **kwargs: Any,
+    ) -> "SignalMatrix":
+        """Build the matrix from the raw OHLCV panels of :func:`load_panels`.
+
+        Indicators are computed with the current settings on copies of the
+        panel mappings, so the OHLCV arrays themselves can be shared by many
+        calls.  The regime follows the reference symbol's 4H bars and the
+        VIX when both exist, like :class:`~scoring.context.MarketContext`.
+        With an earnings ``calendar`` and ``EARNINGS_POLICY=BLOCK_NEW`` no
+        entry is opened inside a symbol's blackout, like the bot.
+        """
+
+        session = session or Session()
+        panels = {tf: Panel(p.symbols, p.index, dict(p.data)) for tf, p in panels.items()}
+        for tf in TIMEFRAMES:
+            add_indicators(panels[tf], tf)
+        times = bucket_ends(panels["4H"].index.asi8, "4 hours", session)
+        kwargs.setdefault("regime", _regimes(panels, reference, times, session))
+        kwargs.setdefault("tradable", times >= _midnight(start))
+        if calendar is not None and settings.earnings_policy == "BLOCK_NEW":
+            grid = np.broadcast_to(times, (len(symbols), len(times)))
+            kwargs.setdefault("blackout", calendar.blackout(symbols, grid))
+        return cls.from_panels({tf: _rows(panels[tf], symbols) for tf in TIMEFRAMES}, session, **kwargs)
+
+    def locate(self, when: date | datetime | int) -> int:
+        """Index of the first bar closing at or after ``when``."""
+
+        if isinstance(when, datetime):
+            ns = int(when.timestamp()) * 10**9
+        elif isinstance(when, date):
+            ns = _midnight(when)
+        else:
+            ns = int(when)
+        return int(np.searchsorted(self.times, ns))
+
+    def window(self, start: int, stop: int) -> "SignalMatrix":
+        """Bars ``start:stop`` of the matrix as views of its arrays."""
+
+        bars = slice(start, stop)
+        return replace(
+            self,
+            times=self.times[bars],
+            prices={name: values[:, bars] for name, values in self.prices.items()},
+            entry_fired=self.entry_fired[..., bars],
+            exit_fired=self.exit_fired[..., bars],
+            daily_rsi=self.daily_rsi[:, bars],
+            regime=self.regime[bars],
+            tradable=self.tradable[bars],
+            blackout=None if self.blackout is None else self.blackout[:, bars],
+        )
+
+    def entry_scores(self, weights: np.ndarray | None = None) -> np.ndarray:
+        """Entry score of every symbol and bar; a ``(sets, rules)`` weight array adds a leading axis."""
+
+        score = None
+        for label in np.unique(self.regime):
+            points = self.entry_rules.components(self.entry_fired, str(label), weights)
+            scored = entry_scoring.combine(points, self.daily_rsi, str(label), self.sentiment)
+            score = scored if score is None else np.where(self.regime == label, scored, score)
+        return score
+
+    def exit_scores(self, weights: np.ndarray | None = None) -> np.ndarray:
+        """Exit score of every symbol and bar, see :meth:`entry_scores`."""
+
+        return sum(self.exit_rules.components(self.exit_fired, None, weights).values())
+
+    def run(self, params: SignalParams = SignalParams(), cash: float = 100_000.0) -> SignalResult:
+        """Trade the matrix with one parameter set."""
+
+        entries = (self.entry_scores(params.entry_weights) >= params.entry_threshold) & self.tradable
+        if self.blackout is not None:
+            entries &= ~self.blackout
+        exits = self.exit_scores(params.exit_weights) >= params.exit_threshold
+        taken, exit_bars, returns = simulate(self.prices, entries, exits, params.bracket, params.max_hold)
+        start = int(np.argmax(self.tradable)) if self.tradable.any() else len(self.times)
+        realised = np.bincount(
+            exit_bars[taken], weights=params.portfolio_pct * returns[taken], minlength=len(self.times)
+        )
+        equity = cash * np.cumprod(1.0 + realised[start : len(self.times)])
+        times = self.times[start:]
+        years = (times[-1] - times[0]) / _YEAR_NS if len(times) > 1 else 0.0
+        return SignalResult(
+            trades=int(taken.sum()),
+            cagr=cagr(equity, years),
+            max_dd=max_drawdown(equity),
+            times=times,
+            equity=equity,
+            entries=taken,
+            exit_bars=exit_bars,
+            returns=np.where(taken, returns, np.nan),
+        )
+
+
+def _midnight(day: date) -> int:
+    return int(datetime.combine(day, time(0), timezone.utc).timestamp()) * 10**9
+
+
+def _rows(panel: Panel, symbols: Sequence[str]) -> Panel:
+    """``panel`` restricted to ``symbols``, in that order."""
+
+    rows = [panel.row(s) for s in symbols]
+    return Panel(list(symbols), panel.index, {name: values[rows] for name, values in panel.data.items()})
+
+
+def load_panels(
+    store: ColumnarBarStore,
+    symbols: Sequence[str],
+    start: date,
+    end: date,
+    warmup_days: int = 400,
+    session: Session | None = None,
+    reference: str = "SPY",
+) -> Dict[str, Panel]:
+    """Raw OHLCV panels of ``symbols`` for :meth:`SignalMatrix.from_ohlcv`.
+
+    Returns ``"D"``, ``"4H"`` (rolled up from the 1H bars) and ``"1H"``
+    panels, which also hold the reference symbol when it is stored, plus a
+    ``"VIX"`` daily panel when the VIX is stored.
+    """
+
+    session = session or Session()
+    lo = _midnight(start) - warmup_days * 86_400 * 10**9
+    hi = _midnight(end) + 86_400 * 10**9 - 1
+    names = list(dict.fromkeys([*symbols, *([reference] if reference in store.symbols("1 hour") else [])]))
+    hourly = {s: store.open(s, "1 hour").slice(lo, hi) for s in names}
+    rolled = {}
+    for s, bars in hourly.items():
+        engine = RollupEngine("4 hours", session=session)
+        engine.append(bars.ts, **bars.fields)
+        rolled[s] = engine.arrays()
+    panels = {
+        "D": store.panel(names, "1 day", lo, hi),
+        "4H": Panel.from_arrays(rolled),
+        "1H": Panel.from_arrays({s: {"ts": v.ts, **v.fields} for s, v in hourly.items()}),
+    }
+    if "VIX" in store.symbols("1 day"):
+        panels["VIX"] = store.panel(["VIX"], "1 day", lo, hi)
+    return panels
+
+
+def _regimes(panels: Mapping[str, Panel], reference: str, times: np.ndarray, session: Session) -> str | np.ndarray:
+    h4 = panels["4H"]
+    if reference not in h4 or "VIX" not in panels:
+        return DEFAULT_REGIME
+    row = h4.row(reference)
+    d = {name: h4.data[name][row : row + 1] for name in ("high", "low", "close")}
+    vix = panels["VIX"]
+    idx = np.searchsorted(bucket_ends(vix.index.asi8, "1 day", session), times, side="right") - 1
+    vix_close = np.where(idx >= 0, vix.data["close"][0][np.maximum(idx, 0)], np.nan)
+    return detect_regimes(
+        d["close"][0],
+        sma(d["close"], settings.sma_fast)[0],
+        sma(d["close"], settings.sma_slow)[0],
+        adx(d["high"], d["low"], d["close"])[0],
+        vix_close,
+    )
@@ -0,0 +1,254 @@
+"""Parallel parameter sweeps over shared-memory bar panels.
+
+The raw OHLCV panels of a universe (:func:`~backtest.signals.load_panels`)
+are copied once into :mod:`multiprocessing.shared_memory` blocks; worker
+processes attach to them without copying and score parameter sets with
+:class:`~backtest.signals.SignalMatrix`.  A parameter set mixes
+
+* :class:`~backtest.signals.SignalParams` fields (``entry_threshold``,
+  ``max_hold``, ...),
+* :class:`~exec.orders.BracketParams` fields (``stop_pct``, ``pt1_pct``,
+  ``pt2_pct``) and
+* any :class:`config.Settings` field (``supertrend_mult``,
+  ``regime_vix_tr``, ...), applied with :func:`config.overridden` inside
+  the worker.
+
+Settings feed the indicators and the regime, so a new combination of them
+needs a new matrix while the other fields only re-run the simulation.  Sets
+are sent out ordered by their settings and every worker keeps the matrix of
+the last combination it built.  Results stream back as they complete into a
+:class:`SweepTable` ranked by one metric.
+"""
+
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import os
+import random
+from bisect import insort
+from dataclasses import dataclass, field, fields
+from datetime import date
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from loguru import logger
+from config import overridden, settings
+from data.panel import FIELDS, Panel
+from exec.orders import BracketParams
+
+from .signals import SignalMatrix, SignalParams
+
+_SIGNAL_FIELDS = {f.name for f in fields(SignalParams)} - {"bracket"}
+_BRACKET_FIELDS = {f.name for f in fields(BracketParams)}
+_METRICS = ("trades", "cagr", "max_dd")
+
+
+def split_params(params: Mapping[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """Split a parameter set into signal, bracket and settings fields."""
+
+    signal, bracket, overrides = {}, {}, {}
+    for name, value in params.items():
+        if name in _SIGNAL_FIELDS:
+            signal[name] = value
+        elif name in _BRACKET_FIELDS:
+            bracket[name] = value
+        elif hasattr(settings, name):
+            overrides[name] = value
+        else:
+            raise ValueError(f"Unknown sweep parameter: {name}")
+    return signal, bracket, overrides
+
+
+def grid(**values: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Every combination of the given parameter values."""
+
+    names = list(values)
+    return [dict(zip(names, combo)) for combo in itertools.product(*values.values())]
+
+
+def sample(space: Mapping[str, Any], n: int, seed: int | None = None) -> List[Dict[str, Any]]:
+    """``n`` random parameter sets.
+
+    A ``(low, high)`` tuple is a uniform range (integers when both ends are
+    ints); any other sequence is a list of choices.
+    """
+
+    rng = random.Random(seed)
+
+    def draw(spec: Any) -> Any:
+        if isinstance(spec, tuple) and len(spec) == 2:
+            low, high = spec
+            return rng.randint(low, high) if isinstance(low, int) and isinstance(high, int) else rng.uniform(low, high)
+        return rng.choice(list(spec))
+
+    return [{name: draw(spec) for name, spec in space.items()} for _ in range(n)]
+
+
+@dataclass
+class SweepTable:
+    """Sweep results kept sorted by ``metric``, best first."""
+
+    metric: str = "cagr"
+    descending: bool = True
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add(self, row: Dict[str, Any]) -> None:
+        sign = -1.0 if self.descending else 1.0
+        insort(self.rows, row, key=lambda r: sign * r[self.metric])
+
+    def top(self, n: int = 10) -> List[Dict[str, Any]]:
+        return self.rows[:n]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.rows)
+
+
+@dataclass
+class SharedPanels:
+    """Raw OHLCV panels placed in shared memory.
+
+    Instances pickle as block names, so workers receive them cheaply and
+    :meth:`panels` maps the same memory.  The creating process owns the
+    blocks: use the instance as a context manager, or call :meth:`close`
+    and :meth:`unlink`, to release them.
+    """
+
+    symbols: Dict[str, List[str]]
+    blocks: Dict[str, Tuple[str, str, int, int]]
+    _owned: List[shared_memory.SharedMemory] = field(default_factory=list, repr=False, compare=False)
+    _open: List[shared_memory.SharedMemory] = field(default_factory=list, repr=False, compare=False)
+
+    @classmethod
+    def create(cls, panels: Mapping[str, Panel]) -> "SharedPanels":
+        shared = cls({}, {})
+        for key, panel in panels.items():
+            ts = np.asarray(panel.index.asi8, dtype=np.int64)
+            rows, bars = len(panel.symbols), len(ts)
+            ts_block = shared_memory.SharedMemory(create=True, size=max(ts.nbytes, 1))
+            data_block = shared_memory.SharedMemory(create=True, size=max(len(FIELDS) * rows * bars * 8, 1))
+            shared._owned += [ts_block, data_block]
+            np.ndarray(ts.shape, np.int64, ts_block.buf)[:] = ts
+            data = np.ndarray((len(FIELDS), rows, bars), np.float64, data_block.buf)
+            for i, name in enumerate(FIELDS):
+                data[i] = panel.data[name]
+            shared.symbols[key] = list(panel.symbols)
+            shared.blocks[key] = (ts_block.name, data_block.name, rows, bars)
+        logger.debug("Panels placed in shared memory", panels=list(shared.blocks))
+        return shared
+
+    def arrays(self, key: str) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Timestamps and OHLCV arrays of panel ``key``, mapped without copying."""
+
+        ts_name, data_name, rows, bars = self.blocks[key]
+        # Workers share the creator's resource tracker, which unlinks
+        # leftover blocks only when the whole process tree is gone.
+        ts_block, data_block = shared_memory.SharedMemory(ts_name), shared_memory.SharedMemory(data_name)
+        self._open += [ts_block, data_block]
+        data = np.ndarray((len(FIELDS), rows, bars), np.float64, data_block.buf)
+        return np.ndarray((bars,), np.int64, ts_block.buf), {name: data[i] for i, name in enumerate(FIELDS)}
+
+    def panels(self) -> Dict[str, Panel]:
+        out = {}
+        for key in self.blocks:
+            ts, data = self.arrays(key)
+            out[key] = Panel(self.symbols[key], pd.to_datetime(ts, utc=True), data)
+        return out
+
+    def close(self) -> None:
+        for block in self._open + self._owned:
+            block.close()
+        self._open.clear()
+
+    def unlink(self) -> None:
+        """Free the blocks; only the creating process may call this."""
+
+        for block in self._owned:
+            block.unlink()
+        self._owned.clear()
+
+    def __enter__(self) -> "SharedPanels":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+        self.unlink()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"symbols": self.symbols, "blocks": self.blocks}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["symbols"], state["blocks"])
+
+
+# Per-process state of sweep workers.
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(shared: SharedPanels, symbols: Sequence[str], start: date, options: Dict[str, Any]) -> None:
+    _WORKER.clear()
+    _WORKER.update(shared=shared, panels=shared.panels(), symbols=symbols, start=start, options=options)
+    _WORKER.update(key=None, matrix=None)
+
+
+def _evaluate(params: Dict[str, Any]) -> Dict[str, Any]:
+    signal, bracket, overrides = split_params(params)
+    key = tuple(sorted(overrides.items()))
+    with overridden(**overrides):
+        if _WORKER["key"] != key:
+            _WORKER["matrix"] = None  # release the previous matrix before building the next
+            _WORKER["matrix"] = SignalMatrix.from_ohlcv(
+                _WORKER["panels"], _WORKER["symbols"], _WORKER["start"], **_WORKER["options"]
+            )
+            _WORKER["key"] = key
+        result = _WORKER["matrix"].run(SignalParams(**signal, bracket=BracketParams(**bracket)))
+    return {**params, **{name: getattr(result, name) for name in _METRICS}}
+
+
+def iter_sweep(
+    shared: SharedPanels,
+    symbols: Sequence[str],
+    start: date,
+    params: Iterable[Mapping[str, Any]],
+    processes: int | None = None,
+    chunksize: int | None = None,
+    **options: Any,
+) -> Iterator[Dict[str, Any]]:
+    """Yield one result row per parameter set as workers finish them.
+
+    ``options`` are passed on to :meth:`SignalMatrix.from_ohlcv`.  With
+    ``processes=1`` the sets are evaluated in this process.
+    """
+
+    sets = [dict(p) for p in params]
+    for p in sets:
+        split_params(p)
+    sets.sort(key=lambda p: repr(sorted(split_params(p)[2].items())))
+    processes = processes or os.cpu_count() or 1
+    logger.info("Starting parameter sweep", sets=len(sets), processes=processes)
+    if processes == 1:
+        _init_worker(shared, symbols, start, options)
+        yield from map(_evaluate, sets)
+        return
+    chunksize = chunksize or max(1, len(sets) // (processes * 4))
+    with multiprocessing.Pool(processes, _init_worker, (shared, list(symbols), start, options)) as pool:
+        yield from pool.imap_unordered(_evaluate, sets, chunksize)
+
+
+def run_sweep(
+    shared: SharedPanels,
+    symbols: Sequence[str],
+    start: date,
+    params: Iterable[Mapping[str, Any]],
+    metric: str = "cagr",
+    **kwargs: Any,
+) -> SweepTable:
+    """Run :func:`iter_sweep` and collect the rows into a ranked table."""
+
+    table = SweepTable(metric, descending=metric != "max_dd")
+    for row in iter_sweep(shared, symbols, start, params, **kwargs):
+        table.add(row)
+    return table
@@ -0,0 +1,185 @@
+"""Walk-forward optimisation on a precomputed signal matrix.
+
+Indicators and rule conditions are computed once for the whole history
+(:class:`~backtest.signals.SignalMatrix`); every fold is a pair of bar
+ranges whose matrices are views of the same arrays.  Each fold picks the
+best candidate parameter set on its in-sample range and trades it on the
+out-of-sample range that follows.  Folds run in parallel and the
+out-of-sample equity curves are chained into one report.
+
+Candidates may set :class:`~backtest.signals.SignalParams` and
+:class:`~exec.orders.BracketParams` fields.  Settings overrides would need
+new indicators; sweep those with :mod:`backtest.sweep` instead.  Trades
+still open at the end of a range are closed at its last bar, so no fold
+sees bars beyond its own range.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+
+from loguru import logger
+from exec.orders import BracketParams
+
+from .metrics import cagr, max_drawdown, returns, sharpe
+from .signals import SignalMatrix, SignalParams, SignalResult
+from .sweep import SweepTable, split_params
+
+_YEAR_NS = 365.25 * 86_400 * 10**9
+
+
+@dataclass(frozen=True)
+class Fold:
+    """In-sample bars ``train`` followed by out-of-sample bars ``test``."""
+
+    train: slice
+    test: slice
+
+
+@dataclass
+class FoldResult:
+    fold: Fold
+    params: Dict[str, Any]
+    in_sample: Dict[str, Any]
+    out_of_sample: SignalResult
+
+
+@dataclass
+class WalkForwardReport:
+    """Out-of-sample results of every fold and their chained equity curve."""
+
+    folds: List[FoldResult] = field(default_factory=list)
+    times: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    equity: np.ndarray = field(default_factory=lambda: np.empty(0))
+    trades: int = 0
+    cagr: float = 0.0
+    max_dd: float = 0.0
+    sharpe: float = 0.0
+
+
+def _ns(span: timedelta) -> int:
+    return int(span.total_seconds()) * 10**9
+
+
+def make_folds(
+    times: np.ndarray,
+    train: timedelta,
+    test: timedelta,
+    step: timedelta | None = None,
+    start: int = 0,
+) -> List[Fold]:
+    """Rolling folds over bar close ``times`` from bar ``start`` on.
+
+    Folds advance by ``step`` (default ``test``); the last one is cut at the
+    end of ``times``.  A ``step`` shorter than ``test`` is rejected: the
+    out-of-sample ranges would overlap and their stitched curve would count
+    the shared bars twice.
+    """
+
+    train_ns, test_ns, step_ns = _ns(train), _ns(test), _ns(step or test)
+    if step_ns < test_ns:
+        raise ValueError(f"Walk-forward step {step} is shorter than the test span {test}")
+    folds = []
+    if start >= len(times):
+        return folds
+    anchor = int(times[start])
+    while True:
+        lo, mid, hi = np.searchsorted(times, [anchor, anchor + train_ns, anchor + train_ns + test_ns])
+        if mid >= len(times):
+            return folds
+        folds.append(Fold(slice(int(lo), int(mid)), slice(int(mid), int(hi))))
+        anchor += step_ns
+
+
+def _params(candidate: Mapping[str, Any]) -> SignalParams:
+    signal, bracket, overrides = split_params(candidate)
+    if overrides:
+        raise ValueError(f"Walk-forward candidates cannot override settings: {', '.join(overrides)}")
+    return SignalParams(**signal, bracket=BracketParams(**bracket))
+
+
+# Per-process state of fold workers; forked workers inherit the matrix without a copy.
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(matrix: SignalMatrix, candidates: List[Dict[str, Any]], metric: str, cash: float) -> None:
+    _WORKER.update(matrix=matrix, candidates=candidates, metric=metric, cash=cash)
+
+
+def _run_fold(fold: Fold) -> FoldResult:
+    matrix, metric, cash = _WORKER["matrix"], _WORKER["metric"], _WORKER["cash"]
+    train = matrix.window(fold.train.start, fold.train.stop)
+    table = SweepTable(metric, descending=metric != "max_dd")
+    for candidate in _WORKER["candidates"]:
+        result = train.run(_params(candidate), cash)
+        table.add({**candidate, "trades": result.trades, "cagr": result.cagr, "max_dd": result.max_dd})
+    best = table.rows[0]
+    params = {name: best[name] for name in best if name not in ("trades", "cagr", "max_dd")}
+    test = matrix.window(fold.test.start, fold.test.stop)
+    return FoldResult(fold, params, best, test.run(_params(params), cash))
+
+
+def stitch(results: Sequence[SignalResult], cash: float = 100_000.0) -> tuple[np.ndarray, np.ndarray]:
+    """Chain the equity curves of consecutive runs started with ``cash`` each."""
+
+    times, curves, level = [], [], 1.0
+    for result in results:
+        if not len(result.equity):
+            continue
+        times.append(result.times)
+        curves.append(result.equity / cash * level)
+        level = curves[-1][-1]
+    if not curves:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    return np.concatenate(times), cash * np.concatenate(curves)
+
+
+def walk_forward(
+    matrix: SignalMatrix,
+    candidates: Sequence[Mapping[str, Any]],
+    train: timedelta = timedelta(days=365),
+    test: timedelta = timedelta(days=90),
+    step: timedelta | None = None,
+    start: date | None = None,
+    metric: str = "cagr",
+    processes: int | None = None,
+    cash: float = 100_000.0,
+) -> WalkForwardReport:
+    """Optimise ``candidates`` on rolling in-sample ranges and trade them out of sample.
+
+    Folds start at ``start`` or the first tradable bar of ``matrix``.
+    """
+
+    candidates = [dict(c) for c in candidates]
+    for candidate in candidates:
+        _params(candidate)
+    first = matrix.locate(start) if start is not None else int(np.argmax(matrix.tradable))
+    folds = make_folds(matrix.times, train, test, step, first)
+    processes = min(processes or os.cpu_count() or 1, max(len(folds), 1))
+    logger.info("Starting walk-forward", folds=len(folds), candidates=len(candidates), processes=processes)
+    if processes == 1:
+        _init_worker(matrix, candidates, metric, cash)
+        results = [_run_fold(fold) for fold in folds]
+    else:
+        with multiprocessing.Pool(processes, _init_worker, (matrix, candidates, metric, cash)) as pool:
+            results = pool.map(_run_fold, folds)
+
+    times, equity = stitch([r.out_of_sample for r in results], cash)
+    years = (times[-1] - times[0]) / _YEAR_NS if len(times) > 1 else 0.0
+    # Annualise the per-bar Sharpe ratio like cagr, with the bars per year of the report.
+    periods = (len(times) - 1) / years if years > 0 else 1.0
+    return WalkForwardReport(
+        folds=results,
+        times=times,
+        equity=equity,
+        trades=sum(r.out_of_sample.trades for r in results),
+        cagr=cagr(equity, years),
+        max_dd=max_drawdown(equity),
+        sharpe=sharpe(returns(equity), periods) if len(equity) > 1 else 0.0,
+    )
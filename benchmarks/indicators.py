@@ -0,0 +1,98 @@
+"""Benchmark the indicator kernels against ``ta``.
+
+Times ATR, RSI, ADX and SuperTrend over a universe of synthetic hourly bars
+(100 symbols x 2 years of RTH 1H bars by default)::
+
+    python benchmarks/indicators.py [--symbols 100] [--bars 3528]
+
+``ta`` is run per symbol on pandas Series; the kernels process the whole
+``(symbols, bars)`` array at once, once with the NumPy fallback and once
+compiled with numba when it is installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import sys
+import time
+from typing import Callable, Dict
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from data import kernels  # noqa: E402
+
+
+def synthetic_bars(symbols: int, bars: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(rng.normal(0, 0.004, (symbols, bars)).cumsum(axis=1))
+    spread = close * rng.uniform(0.001, 0.01, (symbols, bars))
+    return close + spread, close - spread, close
+
+
+def timed(func: Callable[[], object], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_ta(high, low, close) -> Dict[str, float]:
+    import pandas as pd
+    from ta.momentum import RSIIndicator
+    from ta.trend import ADXIndicator
+    from ta.volatility import AverageTrueRange
+
+    frames = [pd.DataFrame({"high": h, "low": lo, "close": c}) for h, lo, c in zip(high, low, close)]
+    return {
+        "atr": timed(lambda: [AverageTrueRange(f.high, f.low, f.close, 14).average_true_range() for f in frames], 1),
+        "rsi": timed(lambda: [RSIIndicator(f.close, 14).rsi() for f in frames], 1),
+        "adx": timed(lambda: [ADXIndicator(f.high, f.low, f.close, 14).adx() for f in frames], 1),
+    }
+
+
+def run_kernels(high, low, close, jit: bool) -> Dict[str, float]:
+    kernels.JIT = jit
+    calls = {
+        "atr": lambda: kernels.atr(high, low, close, 14),
+        "rsi": lambda: kernels.rsi(close, 14),
+        "adx": lambda: kernels.adx(high, low, close, 14),
+        "supertrend": lambda: kernels.supertrend(high, low, close, 10, 3.0),
+    }
+    for call in calls.values():
+        call()  # compile / warm up
+    return {name: timed(call) for name, call in calls.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--bars", type=int, default=2 * 252 * 7)
+    args = parser.parse_args()
+
+    high, low, close = synthetic_bars(args.symbols, args.bars)
+    results = {"ta": run_ta(high, low, close), "numpy": run_kernels(high, low, close, jit=False)}
+    if kernels.njit is not None:
+        results["numba"] = run_kernels(high, low, close, jit=True)
+
+    print(f"{args.symbols} symbols x {args.bars} bars, best time in ms (speedup vs ta)")
+    names = ("atr", "rsi", "adx", "supertrend")
+    print(f"{'':8}" + "".join(f"{name:>20}" for name in names))
+    for engine, times in results.items():
+        cells = []
+        for name in names:
+            if name not in times:
+                cells.append(f"{'n/a':>20}")
+                continue
+            base = results["ta"].get(name)
+            speedup = f" ({base / times[name]:.0f}x)" if base and engine != "ta" else ""
+            cells.append(f"{times[name] * 1e3:>12.1f}{speedup:>8}")
+        print(f"{engine:8}" + "".join(cells))
+
+
+if __name__ == "__main__":
+    main()
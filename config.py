@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from typing import Any, Iterator
 
 from dotenv import load_dotenv
 
@@ -40,6 +42,16 @@ class Settings:
     primary_tf: str = _getenv("PRIMARY_TF", "4H")
     run_interval_min: int = _getenv("RUN_INTERVAL_MIN", 60)
 
+    # Market data caching
+    bar_cache_dir: str = _getenv("BAR_CACHE_DIR", ".cache/bars")
+    bar_cache_ttl_min: int = _getenv("BAR_CACHE_TTL_MIN", 30)
+    panel_mode: bool = _getenv("PANEL_MODE", False)
+    async_fetch: bool = _getenv("ASYNC_FETCH", False)
+    live_bars: bool = _getenv("LIVE_BARS", False)
+    live_tick_sec: int = _getenv("LIVE_TICK_SEC", 5)
+    warm_start_file: str = _getenv("WARM_START_FILE", ".cache/warm_start.pkl.gz")
+    warm_start_max_age_h: int = _getenv("WARM_START_MAX_AGE_H", 24)
+
     risk_per_trade: float = _getenv("RISK_PER_TRADE", 0.01)
     max_positions: int = _getenv("MAX_POSITIONS", 5)
     portfolio_pct: float = _getenv("PORTFOLIO_PCT", 0.1)
@@ -55,6 +67,9 @@ class Settings:
     regime_vix_tr: float = _getenv("REGIME_VIX_TR", 22.0)
     regime_vix_ro: float = _getenv("REGIME_VIX_RO", 26.0)
     adx_trend: float = _getenv("ADX_TREND", 20.0)
+    context_bars_ttl_min: int = _getenv("CONTEXT_BARS_TTL_MIN", 30)
+    context_vix_ttl_min: int = _getenv("CONTEXT_VIX_TTL_MIN", 5)
+    context_fg_ttl_min: int = _getenv("CONTEXT_FG_TTL_MIN", 60)
 
     # Indicator parameters
     rsi_window: int = _getenv("RSI_WINDOW", 14)
@@ -71,8 +86,14 @@ class Settings:
     sentiment_overheat_rsi: int = _getenv("SENTIMENT_OVERHEAT_RSI", 70)
     news_sent_pos_bonus: int = _getenv("NEWS_SENT_POS_BONUS", 3)
     news_sent_neg_penalty: int = _getenv("NEWS_SENT_NEG_PENALTY", 5)
+    news_file: str = _getenv("NEWS_FILE", "")
+    news_ttl_min: int = _getenv("NEWS_TTL_MIN", 30)
+    news_cache_size: int = _getenv("NEWS_CACHE_SIZE", 500)
 
     earnings_policy: str = _getenv("EARNINGS_POLICY", "BLOCK_NEW")
+    earnings_file: str = _getenv("EARNINGS_FILE", "")
+    earnings_blackout_before_d: int = _getenv("EARNINGS_BLACKOUT_BEFORE_D", 3)
+    earnings_blackout_after_d: int = _getenv("EARNINGS_BLACKOUT_AFTER_D", 1)
 
     db_url: str = _getenv("DB_URL", "sqlite:///./bot.db")
     timezone: str = _getenv("TIMEZONE", "America/New_York")
@@ -82,3 +103,24 @@ class Settings:
 
 
 settings = Settings()
+
+
+@contextmanager
+def overridden(**values: Any) -> Iterator[Settings]:
+    """Temporarily replace fields of :data:`settings` in this process.
+
+    Meant for backtests and parameter sweeps.  Code reading ``settings`` at
+    call time sees the new values; defaults bound at import time do not.
+    """
+
+    unknown = set(values) - {f.name for f in fields(Settings)}
+    if unknown:
+        raise AttributeError(f"Unknown settings: {', '.join(sorted(unknown))}")
+    previous = {name: getattr(settings, name) for name in values}
+    for name, value in values.items():
+        object.__setattr__(settings, name, value)
+    try:
+        yield settings
+    finally:
+        for name, value in previous.items():
+            object.__setattr__(settings, name, value)
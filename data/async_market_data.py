@@ -0,0 +1,126 @@
+"""Concurrent historical data fetching for Interactive Brokers.
+
+:class:`AsyncIBKRMarketData` downloads the bars for a whole cycle up front
+with ``ib_insync``'s ``reqHistoricalDataAsync``.  Requests run concurrently
+but each one still waits for the shared :class:`~data.pacing.PacingScheduler`
+before it is sent, so the 6-per-2s and 60-per-10min limits hold.  The
+results are placed in the per-cycle memo which lets the synchronous
+:meth:`get_bars` - and therefore :class:`main.TradingBot` - run unchanged
+afterwards.  Failed downloads are retried inside the prefetch so nothing
+falls back to a blocking request on the event loop's thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Coroutine, Iterable, Tuple
+
+import pandas as pd
+
+from loguru import logger
+
+from .market_data import IBKRMarketData, Stock, util
+
+
+def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run ``coro`` on ``ib_insync``'s event loop when available."""
+
+    if util is not None:  # pragma: no cover - requires ib_insync
+        return util.run(coro)
+    return asyncio.run(coro)
+
+
+@dataclass
+class AsyncIBKRMarketData(IBKRMarketData):
+    """IBKR market data provider able to prefetch many symbols at once.
+
+    Attributes:
+        retries: Times a failed download is retried within a prefetch.
+    """
+
+    retries: int = 1
+    _failed: dict[tuple[str, str, str], BaseException] = field(default_factory=dict, init=False, repr=False)
+
+    def begin_cycle(self) -> None:
+        super().begin_cycle()
+        self._failed.clear()
+
+    async def prefetch_async(self, requests: Iterable[Tuple[str, str, int]]) -> None:
+        """Download the raw bars behind ``(symbol, tf, lookback)`` requests.
+
+        Identical downloads are issued once.  Failures are awaited again up
+        to :attr:`retries` times; a download that still fails is logged and
+        :meth:`get_bars` raises for it until the next cycle instead of
+        retrying with a blocking request, so one bad symbol neither aborts
+        the cycle nor stalls the event loop.
+        """
+
+        keys = []
+        for symbol, tf, lookback in requests:
+            key = (symbol, *self._raw_request(tf, lookback))
+            if key not in self._memo and key not in keys:
+                keys.append(key)
+        started, requested = time.monotonic(), len(keys)
+        for attempt in range(self.retries + 1):
+            if attempt:
+                logger.debug("Retrying failed downloads", attempt=attempt, requests=len(keys))
+            results = await asyncio.gather(*(self._load_async(*key) for key in keys), return_exceptions=True)
+            failed = []
+            for key, result in zip(keys, results):
+                if isinstance(result, BaseException):
+                    self._failed[key] = result
+                    failed.append(key)
+                    continue
+                self._failed.pop(key, None)
+                self._memo[key] = result
+                self._memo_misses += 1
+            keys = failed
+            if not keys:
+                break
+        for key in keys:
+            logger.error(
+                "Async download failed",
+                symbol=key[0],
+                duration=key[1],
+                bar_size=key[2],
+                error=repr(self._failed[key]),
+            )
+        logger.debug("Prefetch complete", requests=requested, seconds=round(time.monotonic() - started, 2))
+
+    # -- internal helpers -------------------------------------------------
+    def _load(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:
+        error = self._failed.get((symbol, duration, bar_size))
+        if error is not None:
+            raise RuntimeError(f"Download of {symbol} {bar_size} bars failed this cycle") from error
+        return super()._load(symbol, duration, bar_size)
+
+    async def _load_async(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:
+        """Asynchronous counterpart of :meth:`IBKRMarketData._load`."""
+
+        if self.cache is None:
+            return await self._fetch_async(symbol, duration, bar_size)
+        entry, fetch = self._cache_plan(symbol, duration, bar_size)
+        if fetch is None:
+            return entry["bars"].copy()
+        fetched = await self._fetch_async(symbol, fetch, bar_size)
+        return self._cache_merge(symbol, duration, bar_size, entry, fetched)
+
+    async def _fetch_async(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:  # pragma: no cover - network
+        await self._throttle_async()
+        logger.debug("Downloading bars", symbol=symbol, duration=duration, bar_size=bar_size)
+        bars = await self.ib.reqHistoricalDataAsync(
+            Stock(symbol, "SMART", "USD"),
+            endDateTime="",
+            durationStr=duration,
+            barSizeSetting=bar_size,
+            whatToShow="TRADES",
+            useRTH=True,
+        )
+        return self._to_frame(bars)
+
+    async def _throttle_async(self) -> None:
+        """Wait for a pacing slot without blocking the event loop."""
+
+        await self.pacer.acquire_async()
@@ -0,0 +1,126 @@
+"""On-disk cache of historical bars.
+
+Each ``(symbol, bar_size)`` pair is stored as a pickle holding the bars
+alongside a little metadata: the duration string of the original full
+download, the number of rows it produced and the time of the last refresh.
+Market data providers consult the cache before hitting the network and then
+only request the tail of the history that is missing.
+"""
+
+from __future__ import annotations
+
+import math
+import pickle
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+import pandas as pd
+
+from loguru import logger
+from config import settings
+
+# Approximate length of the duration units accepted by IBKR in days.  ``D``
+# durations count trading sessions, so they are scaled up to calendar days
+# when converted.
+_DURATION_DAYS = {"S": 1 / 86_400, "D": 7 / 5, "W": 7.0, "M": 30.0, "Y": 365.0}
+
+
+def duration_days(duration: str) -> float:
+    """Return the approximate calendar length of an IBKR ``duration`` string."""
+
+    match = re.fullmatch(r"\s*(\d+)\s*([SDWMY])\s*", duration.upper())
+    if match is None:
+        raise ValueError(f"Unsupported duration: {duration!r}")
+    return int(match.group(1)) * _DURATION_DAYS[match.group(2)]
+
+
+def tail_duration(last: datetime, now: datetime | None = None) -> str:
+    """Return the duration string needed to cover ``last`` up to ``now``.
+
+    One extra day is requested so the (possibly incomplete) last cached bar is
+    refreshed as well.
+    """
+
+    now = now or datetime.now(tz=timezone.utc)
+    if last.tzinfo is None:
+        last = last.replace(tzinfo=timezone.utc)
+    days = max(1, math.ceil((now - last).total_seconds() / 86_400) + 1)
+    return f"{days} D"
+
+
+def merge_bars(cached: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+    """Combine ``cached`` and ``fresh`` bars preferring the fresh values."""
+
+    df = pd.concat([cached, fresh])
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+@dataclass
+class BarCache:
+    """Pickle backed store of OHLCV frames per symbol and bar size.
+
+    Args:
+        root: Directory holding the cache files.
+        ttl_sec: Entries refreshed within this many seconds are served
+            without contacting the data provider at all.
+    """
+
+    root: Path
+    ttl_sec: float = 0.0
+
+    @classmethod
+    def from_settings(cls) -> "BarCache | None":
+        """Build the cache configured in :mod:`config.settings`.
+
+        Returns ``None`` when ``BAR_CACHE_DIR`` is empty which disables
+        caching altogether.
+        """
+
+        if not settings.bar_cache_dir:
+            return None
+        return cls(Path(settings.bar_cache_dir), ttl_sec=settings.bar_cache_ttl_min * 60)
+
+    def path(self, symbol: str, bar_size: str) -> Path:
+        return self.root / f"{symbol}_{bar_size.replace(' ', '')}.pkl"
+
+    def load(self, symbol: str, bar_size: str) -> Dict[str, Any] | None:
+        """Return the cache entry for ``symbol``/``bar_size`` if present."""
+
+        path = self.path(symbol, bar_size)
+        if not path.exists():
+            return None
+        try:
+            with path.open("rb") as fh:
+                return pickle.load(fh)
+        except Exception:
+            logger.opt(exception=True).warning("Discarding unreadable bar cache", path=str(path))
+            return None
+
+    def store(self, symbol: str, bar_size: str, bars: pd.DataFrame, duration: str, rows: int) -> Dict[str, Any]:
+        """Persist ``bars`` together with the metadata of the full download.
+
+        Returns the stored entry.
+        """
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        entry = {"bars": bars, "duration": duration, "rows": rows, "fetched": time.time()}
+        path = self.path(symbol, bar_size)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("wb") as fh:
+            pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+        return entry
+
+    @staticmethod
+    def covers(entry: Dict[str, Any], duration: str) -> bool:
+        """Return ``True`` if ``entry`` holds at least ``duration`` of history."""
+
+        return duration_days(entry["duration"]) >= duration_days(duration)
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry["fetched"] < self.ttl_sec
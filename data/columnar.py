@@ -0,0 +1,190 @@
+"""Memory-mapped columnar bar store.
+
+Bars are kept per timeframe and symbol as one fixed-width binary file per
+field::
+
+    <root>/<bar_size>/<symbol>/ts.i8       int64 UTC nanoseconds (the index)
+    <root>/<bar_size>/<symbol>/close.f8    float64, one value per bar
+
+Files are opened with :class:`numpy.memmap`, so opening the whole universe
+only maps the files and reading a date range touches just the pages of that
+range.  The timestamp file doubles as the index: ``searchsorted`` on it maps
+timestamps to row offsets.  :class:`ColumnarMarketData` serves ``get_bars``
+from the store, optionally as of a point in time for backtests.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .bar_cache import BarCache, duration_days
+from .market_data import IBKRMarketData
+from .panel import FIELDS, Panel
+
+TS_FILE = "ts.i8"
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_ns(ts: datetime | np.datetime64 | int) -> int:
+    """Convert ``ts`` to UTC nanoseconds; naive datetimes are taken as UTC."""
+
+    if isinstance(ts, (int, np.integer)):
+        return int(ts)
+    if hasattr(ts, "value"):  # pandas.Timestamp keeps nanoseconds
+        return int(ts.tz_localize("UTC").value if ts.tzinfo is None else ts.value)
+    if isinstance(ts, datetime):
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return (ts - _EPOCH) // timedelta(microseconds=1) * 1_000
+    return int(np.datetime64(ts, "ns").astype(np.int64))
+
+
+@dataclass
+class SymbolBars:
+    """Zero-copy view of one symbol's bars."""
+
+    ts: np.ndarray
+    fields: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.ts if name == "ts" else self.fields[name]
+
+    def locate(self, ts: datetime | np.datetime64 | int, side: str = "left") -> int:
+        """Row offset of ``ts`` via a binary search on the index."""
+
+        return int(np.searchsorted(self.ts, _to_ns(ts), side=side))
+
+    def slice(self, start=None, end=None) -> "SymbolBars":
+        """Bars with ``start <= ts <= end`` as views into the mapped files."""
+
+        lo = 0 if start is None else self.locate(start, "left")
+        hi = len(self) if end is None else self.locate(end, "right")
+        return SymbolBars(self.ts[lo:hi], {k: v[lo:hi] for k, v in self.fields.items()})
+
+    def tail(self, n: int) -> "SymbolBars":
+        lo = max(len(self) - n, 0)
+        return SymbolBars(self.ts[lo:], {k: v[lo:] for k, v in self.fields.items()})
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materialise the view as a UTC indexed OHLCV frame."""
+
+        index = pd.to_datetime(np.asarray(self.ts), utc=True)
+        return pd.DataFrame({k: np.asarray(v) for k, v in self.fields.items()}, index=index)
+
+
+@dataclass
+class ColumnarBarStore:
+    """Directory of memory-mapped bar columns."""
+
+    root: Path
+
+    def path(self, symbol: str, bar_size: str) -> Path:
+        return self.root / bar_size.replace(" ", "") / symbol
+
+    def symbols(self, bar_size: str) -> List[str]:
+        base = self.root / bar_size.replace(" ", "")
+        if not base.exists():
+            return []
+        return sorted(p.name for p in base.iterdir() if (p / TS_FILE).exists())
+
+    def write_arrays(self, symbol: str, bar_size: str, ts: np.ndarray, **columns: np.ndarray) -> None:
+        """Replace the stored bars with ``ts`` and the OHLCV ``columns``."""
+
+        path = self.path(symbol, bar_size)
+        path.mkdir(parents=True, exist_ok=True)
+        np.ascontiguousarray(ts, dtype=np.int64).tofile(path / TS_FILE)
+        for name in FIELDS:
+            np.ascontiguousarray(columns[name], dtype=np.float64).tofile(path / f"{name}.f8")
+
+    def append_arrays(self, symbol: str, bar_size: str, ts: np.ndarray, **columns: np.ndarray) -> int:
+        """Append the bars newer than the last stored one; return rows added."""
+
+        ts = np.asarray(ts, dtype=np.int64)
+        path = self.path(symbol, bar_size)
+        if not (path / TS_FILE).exists():
+            self.write_arrays(symbol, bar_size, ts, **columns)
+            return len(ts)
+        current = self.open(symbol, bar_size)
+        keep = ts > current.ts[-1] if len(current) else np.ones(len(ts), dtype=bool)
+        del current
+        with (path / TS_FILE).open("ab") as fh:
+            ts[keep].tofile(fh)
+        for name in FIELDS:
+            with (path / f"{name}.f8").open("ab") as fh:
+                np.asarray(columns[name], dtype=np.float64)[keep].tofile(fh)
+        return int(keep.sum())
+
+    def write(self, symbol: str, bar_size: str, df: pd.DataFrame, append: bool = False) -> int:
+        """Store a UTC indexed OHLCV frame; return the number of rows written."""
+
+        ts = pd.DatetimeIndex(df.index).tz_convert("UTC").asi8 if df.index.tz else df.index.asi8
+        columns = {name: df[name].to_numpy(dtype=np.float64) for name in FIELDS}
+        if append:
+            return self.append_arrays(symbol, bar_size, ts, **columns)
+        self.write_arrays(symbol, bar_size, ts, **columns)
+        return len(ts)
+
+    def open(self, symbol: str, bar_size: str) -> SymbolBars:
+        """Map ``symbol``'s columns read-only without reading them."""
+
+        path = self.path(symbol, bar_size)
+        ts = self._map(path / TS_FILE, np.int64)
+        return SymbolBars(ts, {name: self._map(path / f"{name}.f8", np.float64) for name in FIELDS})
+
+    def open_universe(self, bar_size: str, symbols: Iterable[str] | None = None) -> Dict[str, SymbolBars]:
+        return {s: self.open(s, bar_size) for s in (symbols or self.symbols(bar_size))}
+
+    def panel(self, symbols: Sequence[str], bar_size: str, start=None, end=None) -> Panel:
+        """Aligned :class:`~data.panel.Panel` of ``symbols`` for a date range.
+
+        Only the requested range of each symbol is read.
+        """
+
+        views = {s: self.open(s, bar_size).slice(start, end) for s in symbols}
+        return Panel.from_arrays({s: {"ts": v.ts, **v.fields} for s, v in views.items()})
+
+    @staticmethod
+    def _map(path: Path, dtype) -> np.ndarray:
+        if not path.exists() or path.stat().st_size == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+
+@dataclass
+class ColumnarMarketData(IBKRMarketData):
+    """:class:`~data.market_data.MarketData` backed by a columnar store.
+
+    ``as_of`` limits every request to bars at or before that time, which lets
+    backtests replay the store point in time.  Call :meth:`begin_cycle` after
+    moving ``as_of`` so the cycle memo does not serve the previous slice.
+    """
+
+    store: ColumnarBarStore | None = None
+    cache: BarCache | None = None
+    as_of: datetime | None = None
+
+    def __post_init__(self) -> None:
+        # Everything is read from local files; no connection is needed.
+        if self.store is None:
+            raise ValueError("ColumnarMarketData requires a store")
+
+    # -- internal helpers -------------------------------------------------
+    def _load(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:
+        return self._slice(symbol, duration, bar_size).to_frame()
+
+    def _slice(self, symbol: str, duration: str, bar_size: str) -> SymbolBars:
+        bars = self.store.open(symbol, bar_size).slice(end=self.as_of)
+        if not len(bars):
+            return bars
+        end = int(bars.ts[-1])
+        start = end - int(timedelta(days=duration_days(duration)).total_seconds() * 1e9)
+        return bars.slice(start=start)
@@ -0,0 +1,132 @@
+"""Indicator columns computed on demand.
+
+Every indicator column ``get_bars`` can return is registered here together
+with the columns it depends on.  Scoring modules declare the columns they
+read and :func:`add_columns` computes just those, plus their dependencies,
+skipping anything already present on the frame.  Indicators producing
+several columns (MACD) fill all of them in one pass.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import pandas as pd
+
+from loguru import logger
+from config import settings
+
+from .indicators import adx, bbands, macd, obv, rsi, sma, supertrend
+
+OHLCV = ("open", "high", "low", "close", "volume")
+
+
+@dataclass(frozen=True)
+class Indicator:
+    """Columns ``outputs`` produced by ``compute`` from ``deps``."""
+
+    outputs: Tuple[str, ...]
+    deps: Tuple[str, ...]
+    compute: Callable[[pd.DataFrame], Sequence[pd.Series]]
+
+
+def _supertrend(df: pd.DataFrame):
+    return (supertrend(df, period=settings.supertrend_period, multiplier=settings.supertrend_mult),)
+
+
+def _macd(df: pd.DataFrame):
+    return macd(df["close"], fast=settings.macd_fast, slow=settings.macd_slow, signal=settings.macd_signal)
+
+
+def _bb_pos(df: pd.DataFrame):
+    lband, _, hband = bbands(df["close"], window=settings.sma_exit)
+    return ((df["close"] - lband) / (hband - lband),)
+
+
+def _flag(df: pd.DataFrame):
+    # Placeholder pattern flags until real detectors exist.
+    return (False,)
+
+
+INDICATORS: Tuple[Indicator, ...] = (
+    Indicator(("sma20",), ("close",), lambda df: (sma(df["close"], settings.sma_exit),)),
+    Indicator(("sma50",), ("close",), lambda df: (sma(df["close"], settings.sma_fast),)),
+    Indicator(("sma200",), ("close",), lambda df: (sma(df["close"], settings.sma_slow),)),
+    Indicator(("supertrend",), ("high", "low", "close"), _supertrend),
+    Indicator(("rsi",), ("close",), lambda df: (rsi(df["close"], window=settings.rsi_window),)),
+    Indicator(("macd_line", "macd_signal", "macd_hist"), ("close",), _macd),
+    Indicator(("avg_vol",), ("volume",), lambda df: (df["volume"].rolling(settings.sma_exit).mean(),)),
+    Indicator(("session_vol",), ("volume",), lambda df: (df["volume"],)),
+    Indicator(("obv_slope",), ("close", "volume"), lambda df: (obv(df["close"], df["volume"]).diff(),)),
+    Indicator(("bb_pos",), ("close",), _bb_pos),
+    Indicator(("adx",), ("high", "low", "close"), lambda df: (adx(df),)),
+    Indicator(("pullback",), (), _flag),
+    Indicator(("extended",), (), _flag),
+    Indicator(("gap_up",), (), _flag),
+    Indicator(("bearish_pattern",), (), _flag),
+)
+
+REGISTRY: Dict[str, Indicator] = {name: ind for ind in INDICATORS for name in ind.outputs}
+
+# Columns returned per timeframe when the caller does not ask for specific ones.
+DEFAULT_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "D": (
+        "sma50",
+        "sma200",
+        "supertrend",
+        "rsi",
+        "macd_line",
+        "macd_signal",
+        "macd_hist",
+        "avg_vol",
+        "session_vol",
+        "obv_slope",
+        "bb_pos",
+        "pullback",
+        "extended",
+        "gap_up",
+    ),
+    "1H": ("supertrend", "macd_line", "macd_signal"),
+    "4H": ("supertrend", "rsi", "macd_line", "macd_signal", "sma20", "bearish_pattern"),
+}
+
+
+def resolve(columns: Iterable[str]) -> List[Indicator]:
+    """Return the indicators behind ``columns`` in dependency order."""
+
+    order: List[Indicator] = []
+
+    def visit(name: str) -> None:
+        ind = REGISTRY.get(name)
+        if ind is None or ind in order:
+            return
+        for dep in ind.deps:
+            visit(dep)
+        order.append(ind)
+
+    for name in columns:
+        visit(name)
+    return order
+
+
+def add_columns(df: pd.DataFrame, columns: Iterable[str]) -> List[str]:
+    """Compute the missing ``columns`` of ``df`` in place; return those added."""
+
+    added: List[str] = []
+    for ind in resolve(columns):
+        if all(name in df.columns for name in ind.outputs):
+            continue
+        for name, values in zip(ind.outputs, ind.compute(df)):
+            df[name] = values
+            added.append(name)
+    if added:
+        logger.debug("Computed indicator columns", columns=added)
+    return added
+
+
+def select(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+    """Return the OHLCV and the requested ``columns`` present on ``df``."""
+
+    wanted = list(OHLCV) + [c for c in columns if c not in OHLCV]
+    return df[[c for c in dict.fromkeys(wanted) if c in df.columns]]
@@ -1,29 +1,22 @@
-"""Indicator helper functions built on pandas/ta."""
+"""Indicator helper functions built on pandas/ta.
+
+The Wilder style indicators (ATR, RSI, ADX, SuperTrend) use the in-house
+:mod:`data.kernels` instead of ``ta``; ATR, RSI and ADX reproduce ``ta``'s
+values.
+"""
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
-from ta.momentum import RSIIndicator
-from ta.trend import MACD, ADXIndicator
-from ta.volatility import AverageTrueRange, BollingerBands
-
+from ta.trend import MACD
+from ta.volatility import BollingerBands
 
-# ``SuperTrend`` was added to :mod:`ta.trend` in later versions.  The test
-# environment may use an earlier release where it is missing.  To keep the
-# rest of the code functional we provide a tiny fallback implementation that
-# simply returns ``1`` for all rows which is sufficient for the scoring logic
-# in the stubbed trading bot.
-try:  # pragma: no cover - optional dependency
-    from ta.trend import SuperTrend
-except Exception:  # pragma: no cover - fallback
-    import pandas as pd
+from . import kernels
 
-    class SuperTrend:  # type: ignore[override]
-        def __init__(self, high: pd.Series, low: pd.Series, close: pd.Series, period: int = 10, multiplier: float = 3.0):
-            self.close = close
 
-        def super_trend_direction(self) -> pd.Series:
-            return pd.Series(1, index=self.close.index)
+def _array(series: pd.Series) -> np.ndarray:
+    return np.asarray(series, dtype=np.float64)
 
 
 def sma(series: pd.Series, window: int) -> pd.Series:
@@ -35,12 +28,12 @@ def ema(series: pd.Series, window: int) -> pd.Series:
 
 
 def atr(df: pd.DataFrame, window: int) -> pd.Series:
-    ind = AverageTrueRange(high=df["high"], low=df["low"], close=df["close"], window=window)
-    return ind.average_true_range()
+    values = kernels.atr(_array(df["high"]), _array(df["low"]), _array(df["close"]), window)
+    return pd.Series(values, index=df.index)
 
 
 def rsi(series: pd.Series, window: int = 14) -> pd.Series:
-    return RSIIndicator(close=series, window=window).rsi()
+    return pd.Series(kernels.rsi(_array(series), window), index=series.index)
 
 
 def macd(
@@ -51,8 +44,8 @@ def macd(
 
 
 def supertrend(df: pd.DataFrame, period: int = 10, multiplier: float = 3.0) -> pd.Series:
-    ind = SuperTrend(high=df["high"], low=df["low"], close=df["close"], period=period, multiplier=multiplier)
-    return ind.super_trend_direction()
+    values = kernels.supertrend(_array(df["high"]), _array(df["low"]), _array(df["close"]), period, multiplier)
+    return pd.Series(values, index=df.index)
 
 
 def obv(close: pd.Series, volume: pd.Series) -> pd.Series:
@@ -65,5 +58,5 @@ def bbands(series: pd.Series, window: int = 20) -> tuple[pd.Series, pd.Series, p
 
 
 def adx(df: pd.DataFrame, window: int = 14) -> pd.Series:
-    ind = ADXIndicator(high=df["high"], low=df["low"], close=df["close"], window=window)
-    return ind.adx()
+    values = kernels.adx(_array(df["high"]), _array(df["low"]), _array(df["close"]), window)
+    return pd.Series(values, index=df.index)
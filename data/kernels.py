@@ -0,0 +1,287 @@
+"""Recurrence kernels for Wilder style indicators.
+
+ATR, ADX, Wilder RSI and SuperTrend are recursive, so they cannot be
+expressed as plain array expressions.  The kernels here work on raw NumPy
+arrays of shape ``(bars,)`` or ``(symbols, bars)``.  When :mod:`numba` is
+installed the recurrences run as compiled loops; otherwise they loop over
+bars while updating every symbol in a single vector operation.
+
+Missing bars are ``NaN`` and leave the recursive state unchanged, so a
+series starting late warms up from its first valid bar.
+"""
+
+from __future__ import annotations
+
+from functools import wraps
+from typing import Callable, Tuple
+
+import numpy as np
+
+try:  # pragma: no cover - optional dependency
+    from numba import njit
+except Exception:  # pragma: no cover - fallback when numba missing
+    njit = None
+
+# Use the compiled loops; tests flip this to exercise the NumPy fallback.
+JIT = njit is not None
+
+
+def _as_2d(x: np.ndarray) -> Tuple[np.ndarray, bool]:
+    arr = np.ascontiguousarray(x, dtype=np.float64)
+    return (arr[None, :], True) if arr.ndim == 1 else (arr, False)
+
+
+def _rowwise(arrays: int) -> Callable[[Callable[..., np.ndarray]], Callable[..., np.ndarray]]:
+    """Let a ``(symbols, bars)`` kernel taking ``arrays`` arrays accept 1-D input."""
+
+    def decorate(func: Callable[..., np.ndarray]) -> Callable[..., np.ndarray]:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            converted = [_as_2d(a) for a in args[:arrays]]
+            out = func(*(a for a, _ in converted), *args[arrays:], **kwargs)
+            return out[0] if converted[0][1] else out
+
+        return wrapper
+
+    return decorate
+
+
+def _shift(x: np.ndarray) -> np.ndarray:
+    """Return ``x`` shifted one bar to the right with a NaN first column."""
+
+    out = np.empty_like(x)
+    out[:, 0] = np.nan
+    out[:, 1:] = x[:, :-1]
+    return out
+
+
+# -- compiled loops ------------------------------------------------------------
+# Written for numba; they are only ever called compiled.
+
+
+def _ewm_loop(x, alpha, min_periods):  # pragma: no cover - compiled
+    out = np.full(x.shape, np.nan)
+    for i in range(x.shape[0]):
+        state = np.nan
+        count = 0
+        for t in range(x.shape[1]):
+            value = x[i, t]
+            if not np.isnan(value):
+                state = value if count == 0 else state + alpha * (value - state)
+                count += 1
+            if count >= min_periods:
+                out[i, t] = state
+    return out
+
+
+def _wilder_loop(x, window):  # pragma: no cover - compiled
+    out = np.full(x.shape, np.nan)
+    for i in range(x.shape[0]):
+        state = 0.0
+        count = 0
+        for t in range(x.shape[1]):
+            value = x[i, t]
+            if np.isnan(value):
+                continue
+            count += 1
+            if count < window:
+                state += value
+                out[i, t] = 0.0
+                continue
+            if count == window:
+                state = (state + value) / window
+            else:
+                state = (state * (window - 1) + value) / window
+            out[i, t] = state
+    return out
+
+
+def _supertrend_loop(basic_upper, basic_lower, close, ready):  # pragma: no cover - compiled
+    out = np.full(close.shape, np.nan)
+    for i in range(close.shape[0]):
+        upper = np.nan
+        lower = np.nan
+        prev_close = np.nan
+        direction = 1.0
+        for t in range(close.shape[1]):
+            c = close[i, t]
+            if ready[i, t]:
+                bu = basic_upper[i, t]
+                bl = basic_lower[i, t]
+                if not np.isnan(upper) and bu >= upper and prev_close <= upper:
+                    bu = upper
+                if not np.isnan(lower) and bl <= lower and prev_close >= lower:
+                    bl = lower
+                if direction < 0 and c > bu:
+                    direction = 1.0
+                elif direction > 0 and c < bl:
+                    direction = -1.0
+                upper = bu
+                lower = bl
+            if not np.isnan(c):
+                prev_close = c
+                out[i, t] = direction
+    return out
+
+
+if njit is not None:  # pragma: no cover - requires numba
+    _ewm_jit = njit(cache=True)(_ewm_loop)
+    _wilder_jit = njit(cache=True)(_wilder_loop)
+    _supertrend_jit = njit(cache=True)(_supertrend_loop)
+
+
+# -- vectorised fallbacks ------------------------------------------------------
+
+
+def _ewm_np(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    state = np.full(x.shape[0], np.nan)
+    count = np.zeros(x.shape[0], dtype=np.int64)
+    for t in range(x.shape[1]):
+        value = x[:, t]
+        valid = ~np.isnan(value)
+        state = np.where(valid, np.where(count == 0, value, state + alpha * (value - state)), state)
+        count += valid
+        out[:, t] = np.where(count >= min_periods, state, np.nan)
+    return out
+
+
+def _wilder_np(x: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    state = np.zeros(x.shape[0])
+    count = np.zeros(x.shape[0], dtype=np.int64)
+    for t in range(x.shape[1]):
+        value = x[:, t]
+        valid = ~np.isnan(value)
+        count += valid
+        warm = valid & (count < window)
+        seed = valid & (count == window)
+        step = valid & (count > window)
+        state = np.where(warm, state + value, state)
+        state = np.where(seed, (state + value) / window, state)
+        state = np.where(step, (state * (window - 1) + value) / window, state)
+        out[:, t] = np.where(valid, np.where(count < window, 0.0, state), np.nan)
+    return out
+
+
+def _supertrend_np(
+    basic_upper: np.ndarray, basic_lower: np.ndarray, close: np.ndarray, ready: np.ndarray
+) -> np.ndarray:
+    n = close.shape[0]
+    upper = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    prev_close = np.full(n, np.nan)
+    direction = np.ones(n)
+    out = np.full(close.shape, np.nan)
+    for t in range(close.shape[1]):
+        r = ready[:, t]
+        bu, bl, c = basic_upper[:, t], basic_lower[:, t], close[:, t]
+        keep_upper = ~np.isnan(upper) & (bu >= upper) & (prev_close <= upper)
+        keep_lower = ~np.isnan(lower) & (bl <= lower) & (prev_close >= lower)
+        new_upper = np.where(keep_upper, upper, bu)
+        new_lower = np.where(keep_lower, lower, bl)
+        flip_up = r & (direction < 0) & (c > new_upper)
+        flip_down = r & (direction > 0) & (c < new_lower)
+        direction = np.where(flip_up, 1.0, np.where(flip_down, -1.0, direction))
+        upper = np.where(r, new_upper, upper)
+        lower = np.where(r, new_lower, lower)
+        prev_close = np.where(np.isnan(c), prev_close, c)
+        out[:, t] = np.where(np.isnan(c), np.nan, direction)
+    return out
+
+
+# -- public kernels ------------------------------------------------------------
+
+
+@_rowwise(1)
+def ewm(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """Exponential average matching ``ewm(alpha=alpha, adjust=False)``.
+
+    Each row starts at its first valid value and NaN inputs leave the state
+    unchanged.
+    """
+
+    if JIT:
+        return _ewm_jit(x, float(alpha), int(min_periods))
+    return _ewm_np(x, alpha, min_periods)
+
+
+@_rowwise(1)
+def wilder(x: np.ndarray, window: int) -> np.ndarray:
+    """Wilder smoothing seeded with the mean of the first ``window`` values.
+
+    Bars before the seed are ``0`` which mirrors ``ta``'s ATR output.
+    """
+
+    if JIT:
+        return _wilder_jit(x, int(window))
+    return _wilder_np(x, window)
+
+
+@_rowwise(3)
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev = _shift(close)
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev)))
+    return np.where(np.isnan(high - low), np.nan, tr)
+
+
+@_rowwise(3)
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    return wilder(true_range(high, low, close), window)
+
+
+@_rowwise(1)
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Wilder RSI matching ``ta.momentum.RSIIndicator``."""
+
+    prev = _shift(close)
+    diff = np.where(np.isnan(prev) & ~np.isnan(close), 0.0, close - prev)
+    up = ewm(np.where(np.isnan(diff), np.nan, np.maximum(diff, 0.0)), 1.0 / window, window)
+    down = ewm(np.where(np.isnan(diff), np.nan, np.maximum(-diff, 0.0)), 1.0 / window, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100.0 - 100.0 / (1.0 + up / down)
+    return np.where(down == 0, 100.0, out)
+
+
+@_rowwise(3)
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Average directional index matching ``ta.trend.ADXIndicator``.
+
+    As in ``ta`` the first bar has no true range or directional movement, so
+    the smoothing starts on the second bar, and bars before the first ADX
+    value are ``0``.
+    """
+
+    prev_close, prev_high, prev_low = _shift(close), _shift(high), _shift(low)
+    missing = np.isnan(high - low)
+    first = np.isnan(prev_close)
+    up = high - prev_high
+    down = prev_low - low
+    plus_dm = np.where(first, np.nan, np.where((up > down) & (up > 0), up, 0.0))
+    minus_dm = np.where(first, np.nan, np.where((down > up) & (down > 0), down, 0.0))
+    tr = np.where(first, np.nan, true_range(high, low, close))
+    ready = np.cumsum(~np.isnan(tr), axis=1) >= window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tr_s = wilder(tr, window)
+        plus_di = np.where(tr_s != 0, 100.0 * wilder(plus_dm, window) / tr_s, 0.0)
+        minus_di = np.where(tr_s != 0, 100.0 * wilder(minus_dm, window) / tr_s, 0.0)
+        total = plus_di + minus_di
+        dx = np.where(total != 0, 100.0 * np.abs(plus_di - minus_di) / total, 0.0)
+    out = wilder(np.where(ready & ~np.isnan(tr), dx, np.nan), window)
+    return np.where(missing, np.nan, np.nan_to_num(out))
+
+
+@_rowwise(3)
+def supertrend(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 10, multiplier: float = 3.0
+) -> np.ndarray:
+    """SuperTrend direction: ``1`` in an uptrend and ``-1`` in a downtrend."""
+
+    atr_ = wilder(true_range(high, low, close), period)
+    ready = ~np.isnan(atr_) & (np.cumsum(~np.isnan(close), axis=1) >= period)
+    mid = (high + low) / 2.0
+    basic_upper = mid + multiplier * atr_
+    basic_lower = mid - multiplier * atr_
+    if JIT:
+        return _supertrend_jit(basic_upper, basic_lower, close, ready)
+    return _supertrend_np(basic_upper, basic_lower, close, ready)
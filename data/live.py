@@ -0,0 +1,395 @@
+"""Streaming market data built from real-time bars.
+
+Instead of polling historical endpoints, :class:`LiveMarketData` subscribes
+to 5 second real-time bars for the universe and aggregates them into 1H and
+daily bars in memory as they arrive.  :meth:`get_bars` then answers from
+memory without a network round-trip; 4H bars are rolled up from the live 1H
+frame exactly like in polling mode.  Indicators of the 1H and daily bars are
+kept by a :class:`~data.streaming.IndicatorEngine` that advances by one bar
+whenever a bucket completes, so those requests do not recompute the history.
+
+Feeds are pluggable: :class:`IBKRRealTimeFeed` wraps ``reqRealTimeBars``
+while :class:`ScriptedBarFeed` replays a fixed script for tests and offline
+runs.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from datetime import datetime, time, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Protocol, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from loguru import logger
+from config import settings
+
+from .bar_cache import merge_bars
+from .columns import DEFAULT_COLUMNS, REGISTRY, add_columns, select
+from .market_data import IBKRMarketData, Stock
+from .rollups import SESSION_CLOSE, SESSION_OPEN, Session, bucket_ends, bucket_labels
+from .streaming import STREAMED_COLUMNS, IndicatorEngine
+
+BAR_SIZES = ("1 hour", "1 day")
+# Timeframes served from the live buckets by the indicator engine.
+STREAMED_TIMEFRAMES = {"1H": "1 hour", "D": "1 day"}
+
+
+@dataclass(frozen=True)
+class Bar:
+    ts: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+    def merge(self, other: "Bar") -> "Bar":
+        """Extend this bar with the later ``other`` bar."""
+
+        return replace(
+            self,
+            high=max(self.high, other.high),
+            low=min(self.low, other.low),
+            close=other.close,
+            volume=self.volume + other.volume,
+        )
+
+
+BarCallback = Callable[[str, Bar], None]
+
+
+def bucket_start(ts: datetime, bar_size: str, tz: ZoneInfo) -> datetime:
+    """Return the UTC label of the ``bar_size`` bucket containing ``ts``.
+
+    Labels follow IBKR's RTH historical bars so live and seeded bars line up:
+    hourly bars start on the hour except the first one which starts at the
+    09:30 open, and daily bars are labelled with the session date.
+    """
+
+    local = ts.astimezone(tz)
+    if bar_size == "1 day":
+        return datetime.combine(local.date(), time(0), tzinfo=timezone.utc)
+    if bar_size != "1 hour":
+        raise ValueError(f"Unsupported bar size: {bar_size}")
+    start = local.replace(minute=0, second=0, microsecond=0)
+    session_open = datetime.combine(local.date(), SESSION_OPEN, tzinfo=tz)
+    if start < session_open <= local:
+        start = session_open
+    return start.astimezone(timezone.utc)
+
+
+def bucket_end(label: datetime, bar_size: str, tz: ZoneInfo) -> datetime:
+    """Return the UTC time at which the bucket labelled ``label`` closes."""
+
+    if bar_size == "1 day":
+        session_date = label.date()
+        return datetime.combine(session_date, SESSION_CLOSE, tzinfo=tz).astimezone(timezone.utc)
+    local = label.astimezone(tz)
+    return (local.replace(minute=0) + timedelta(hours=1)).astimezone(timezone.utc)
+
+
+class BarBuilder:
+    """Aggregate incoming bars of one symbol into ``bar_size`` buckets."""
+
+    def __init__(self, bar_size: str, tz: ZoneInfo) -> None:
+        self.bar_size = bar_size
+        self.tz = tz
+        self.completed: List[Bar] = []
+        self.current: Bar | None = None
+
+    def add(self, bar: Bar) -> Bar | None:
+        """Fold ``bar`` in and return the bucket it completed, if any."""
+
+        label = bucket_start(bar.ts, self.bar_size, self.tz)
+        done = None
+        if self.current is not None and label != self.current.ts:
+            done = self._close()
+        if self.current is None:
+            self.current = replace(bar, ts=label)
+        else:
+            self.current = self.current.merge(bar)
+        return done
+
+    def flush(self, now: datetime) -> Bar | None:
+        """Close the current bucket if its end time has passed at ``now``."""
+
+        if self.current is not None and now >= bucket_end(self.current.ts, self.bar_size, self.tz):
+            return self._close()
+        return None
+
+    def _close(self) -> Bar:
+        done, self.current = self.current, None
+        self.completed.append(done)
+        return done
+
+
+class BarFeed(Protocol):
+    """Source of real-time bars."""
+
+    def subscribe(self, symbols: Sequence[str], callback: BarCallback) -> None: ...
+
+
+@dataclass
+class ScriptedBarFeed:
+    """Replay a fixed list of ``(symbol, bar)`` pairs, e.g. in tests."""
+
+    script: Iterable[Tuple[str, Bar]]
+    _callbacks: List[Tuple[set, BarCallback]] = field(default_factory=list, init=False)
+
+    def subscribe(self, symbols: Sequence[str], callback: BarCallback) -> None:
+        self._callbacks.append((set(symbols), callback))
+
+    def play(self) -> int:
+        """Deliver every scripted bar to the subscribers; return the count."""
+
+        count = 0
+        for symbol, bar in self.script:
+            for symbols, callback in self._callbacks:
+                if symbol in symbols:
+                    callback(symbol, bar)
+            count += 1
+        return count
+
+
+@dataclass
+class IBKRRealTimeFeed:  # pragma: no cover - requires a TWS/Gateway connection
+    """5 second ``reqRealTimeBars`` subscriptions through ``ib_insync``."""
+
+    ib: object
+    _subscriptions: list = field(default_factory=list, init=False)
+
+    def subscribe(self, symbols: Sequence[str], callback: BarCallback) -> None:
+        for symbol in symbols:
+            bars = self.ib.reqRealTimeBars(Stock(symbol, "SMART", "USD"), 5, "TRADES", useRTH=True)
+
+            def on_update(bars, has_new_bar, symbol=symbol):
+                if has_new_bar:
+                    b = bars[-1]
+                    callback(symbol, Bar(b.time, b.open_, b.high, b.low, b.close, float(b.volume)))
+
+            bars.updateEvent += on_update
+            self._subscriptions.append(bars)
+        logger.info("Subscribed to real-time bars", symbols=len(symbols))
+
+
+@dataclass
+class LiveBarStore:
+    """In-memory 1H and daily bars per symbol, seeded from history.
+
+    ``on_close(symbol, bar_size, bar)`` is called for every bucket that
+    completes, as soon as it does.
+    """
+
+    tz: ZoneInfo = field(default_factory=lambda: ZoneInfo(settings.timezone))
+    history: Dict[Tuple[str, str], pd.DataFrame] = field(default_factory=dict)
+    builders: Dict[Tuple[str, str], BarBuilder] = field(default_factory=dict)
+    on_close: Callable[[str, str, Bar], None] | None = None
+
+    def seed(self, symbol: str, bar_size: str, df: pd.DataFrame) -> None:
+        self.history[(symbol, bar_size)] = df
+
+    def has(self, symbol: str, bar_size: str) -> bool:
+        return (symbol, bar_size) in self.builders
+
+    def _builder(self, symbol: str, bar_size: str) -> BarBuilder:
+        key = (symbol, bar_size)
+        if key not in self.builders:
+            self.builders[key] = BarBuilder(bar_size, self.tz)
+        return self.builders[key]
+
+    def on_bar(self, symbol: str, bar: Bar) -> None:
+        """Feed callback folding a real-time bar into every bar size."""
+
+        for bar_size in BAR_SIZES:
+            self._closed(symbol, bar_size, self._builder(symbol, bar_size).add(bar))
+
+    def flush(self, now: datetime) -> None:
+        """Close every bucket that has ended by ``now``."""
+
+        for (symbol, bar_size), builder in list(self.builders.items()):
+            self._closed(symbol, bar_size, builder.flush(now))
+
+    def _closed(self, symbol: str, bar_size: str, bar: Bar | None) -> None:
+        if bar is not None and self.on_close is not None:
+            self.on_close(symbol, bar_size, bar)
+
+    def rows(self, symbol: str, bar_size: str) -> List[Bar]:
+        """Live bars for ``symbol`` including the bucket still in progress."""
+
+        builder = self.builders.get((symbol, bar_size))
+        if builder is None:
+            return []
+        return builder.completed + ([builder.current] if builder.current is not None else [])
+
+    def frame(self, symbol: str, bar_size: str) -> pd.DataFrame:
+        """Seeded history merged with the live bars as an OHLCV frame.
+
+        Completed bars are folded into the history once so repeated calls
+        only rebuild the bucket still in progress.  A seed ending in the
+        partial bar of the first live bucket keeps that bar's open, range and
+        volume so far.
+        """
+
+        key = (symbol, bar_size)
+        builder = self._builder(symbol, bar_size)
+        history = self.history.get(key)
+        if builder.completed or history is None:
+            history = self._merge(history, builder.completed)
+            self.history[key] = history
+            builder.completed = []
+        if builder.current is not None:
+            return self._merge(history, [builder.current])
+        return history.copy()
+
+    @staticmethod
+    def _merge(history: pd.DataFrame | None, bars: List[Bar]) -> pd.DataFrame:
+        live = pd.DataFrame(
+            {
+                "open": [b.open for b in bars],
+                "high": [b.high for b in bars],
+                "low": [b.low for b in bars],
+                "close": [b.close for b in bars],
+                "volume": [b.volume for b in bars],
+            },
+            index=pd.DatetimeIndex([b.ts for b in bars]),
+        )
+        if history is None:
+            return live
+        if len(history) and len(live) and history.index[-1] == live.index[0]:
+            # The seed ends with the partial bar the first live bucket
+            # continues; extend it instead of replacing it.
+            seeded, first = history.iloc[-1], live.index[0]
+            live.loc[first, "open"] = seeded["open"]
+            live.loc[first, "high"] = max(seeded["high"], live.loc[first, "high"])
+            live.loc[first, "low"] = min(seeded["low"], live.loc[first, "low"])
+            live.loc[first, "volume"] = seeded["volume"] + live.loc[first, "volume"]
+        return merge_bars(history, live)
+
+
+def _streamable(columns: Iterable[str]) -> bool:
+    """Whether the engine can serve ``columns``: streamed or needing no inputs."""
+
+    return all(name in STREAMED_COLUMNS or name not in REGISTRY or not REGISTRY[name].deps for name in columns)
+
+
+@dataclass
+class LiveMarketData(IBKRMarketData):
+    """Market data answered from bars streamed into memory.
+
+    :meth:`start` seeds the store with historical bars and subscribes to
+    ``feed``.  Afterwards 1H and daily requests for subscribed symbols never
+    touch the network; other symbols fall back to historical downloads.
+    Requests for subscribed 1H and daily bars that only read
+    :data:`~data.streaming.STREAMED_COLUMNS` (and columns without inputs) are
+    answered from :attr:`indicators`, the bar in progress included.
+    Symbols whose 4H bar closed are collected for :meth:`pop_4h_closes`.
+    """
+
+    feed: BarFeed | None = None
+    store: LiveBarStore = field(default_factory=LiveBarStore)
+    indicators: IndicatorEngine = field(default_factory=IndicatorEngine)
+    _h4_closed: Dict[str, None] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:  # pragma: no cover - network
+        super().__post_init__()
+        if self.feed is None:
+            self.feed = IBKRRealTimeFeed(self.ib)
+
+    def start(self, symbols: Sequence[str], daily_lookback: int = 2, now: datetime | None = None) -> None:
+        """Seed ``symbols`` from history and subscribe to live bars.
+
+        The indicator engine is warmed up from the seeded bars that had
+        closed by ``now``; states restored from a snapshot only replay the
+        bars they have not seen.
+        """
+
+        now = now or datetime.now(timezone.utc)
+        for symbol in symbols:
+            for tf, lookback in (("1H", 0), ("D", daily_lookback)):
+                duration, bar_size = self._raw_request(tf, lookback)
+                try:
+                    df = super()._load(symbol, duration, bar_size)
+                except Exception:
+                    logger.opt(exception=True).error("Live seed failed", symbol=symbol, bar_size=bar_size)
+                    continue
+                self.store.seed(symbol, bar_size, df)
+                done = df.loc[[bucket_end(ts, bar_size, self.store.tz) <= now for ts in df.index]]
+                state = self.indicators.states.get((symbol, tf))
+                resumable = state is not None and state.last_ts is not None
+                if resumable and len(done) and done.index[0] <= state.last_ts:
+                    state.seed(done)  # restored state: bars it has seen are skipped
+                else:
+                    self.indicators.seed(symbol, tf, done)
+        self.store.on_close = self._on_close
+        self.feed.subscribe(symbols, self.store.on_bar)
+
+    def get_bars(
+        self, symbol: str, tf: str, lookback: int, columns: Iterable[str] | None = None
+    ) -> pd.DataFrame:
+        columns = DEFAULT_COLUMNS.get(tf, ()) if columns is None else tuple(columns)
+        state = self.indicators.states.get((symbol, tf))
+        if state is None or not columns or lookback > self.indicators.keep or not _streamable(columns):
+            return super().get_bars(symbol, tf, lookback, columns)
+        df = self.store.frame(symbol, STREAMED_TIMEFRAMES[tf]).tail(lookback).copy()
+        rows = {row["ts"]: row for row in state.rows}
+        for ts, bar in df.iterrows():
+            if ts not in rows:
+                rows[ts] = state.preview(bar["high"], bar["low"], bar["close"], bar["volume"], ts)
+        # Every streamed column is filled so multi-output indicators are never recomputed.
+        for name in STREAMED_COLUMNS:
+            df[name] = [rows[ts][name] for ts in df.index]
+        add_columns(df, columns)
+        return select(df, columns)
+
+    def checkpoint(self) -> dict:
+        """Add the indicator states to the :class:`IBKRMarketData` checkpoint."""
+
+        return {**super().checkpoint(), "indicators": dict(self.indicators.states)}
+
+    def restore(self, state: dict) -> None:
+        super().restore(state)
+        for key, indicator in state.get("indicators", {}).items():
+            self.indicators.states.setdefault(key, indicator)
+
+    def flush(self, now: datetime) -> None:
+        """Close live buckets that ended by ``now`` and drop stale memos."""
+
+        self.store.flush(now)
+        self._memo.clear()
+        self._frames.clear()
+
+    def pop_4h_closes(self) -> List[str]:
+        """Symbols whose 4H bar closed since the last call."""
+
+        closed, self._h4_closed = list(self._h4_closed), {}
+        return closed
+
+    # -- internal helpers -------------------------------------------------
+    def _on_close(self, symbol: str, bar_size: str, bar: Bar) -> None:
+        """Advance the indicators of ``symbol`` by a completed bucket."""
+
+        if bar_size == "1 hour" and self._closes_4h(bar):
+            self._h4_closed[symbol] = None
+        tf = next(tf for tf, size in STREAMED_TIMEFRAMES.items() if size == bar_size)
+        if (symbol, tf) not in self.indicators.states:
+            return
+        ts = pd.Timestamp(bar.ts)
+        # The stored bar includes the seeded part of the first live bucket.
+        row = self.store.frame(symbol, bar_size).loc[ts]
+        self.indicators.update(symbol, tf, {**row, "ts": ts})
+
+    def _closes_4h(self, bar: Bar) -> bool:
+        """Whether the 1H bucket ``bar`` also ends its 4H bucket."""
+
+        session = Session(self.store.tz)
+        label = bucket_labels(np.array([pd.Timestamp(bar.ts).value]), "4 hours", session)
+        end = bucket_end(bar.ts, "1 hour", self.store.tz)
+        return int(bucket_ends(label, "4 hours", session)[0]) == pd.Timestamp(end).value
+
+    def _load(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:
+        if self.store.has(symbol, bar_size) or (symbol, bar_size) in self.store.history:
+            return self.store.frame(symbol, bar_size)
+        return super()._load(symbol, duration, bar_size)
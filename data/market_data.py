@@ -2,12 +2,11 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Protocol
-
-from collections import deque
 import time
+from dataclasses import dataclass, field
+from typing import Iterable, List, Protocol, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 
 from loguru import logger
@@ -17,21 +16,37 @@ try:  # pragma: no cover - requires ib_insync at runtime
     from ib_insync import IB, Stock, util
 except Exception:  # pragma: no cover - fallback when ib_insync missing
     IB = Stock = util = None  # type: ignore
-from .indicators import (
-    bbands,
-    macd,
-    obv,
-    rsi,
-    sma,
-    supertrend,
-)
-from .rollups import rollup_1h_to_4h
+from .bar_cache import BarCache, merge_bars, tail_duration
+from .pacing import PacingScheduler, Priority, prioritised, shared_pacer
+from .columns import DEFAULT_COLUMNS, REGISTRY, add_columns, select
+from .panel import Panel, add_indicators
+from .rollups import RollupEngine, Session, bucket_ends, bucket_labels
+
+# Bucket size of the newest bar of each timeframe, see :meth:`IBKRMarketData.last_closed_bar`.
+BAR_BUCKETS = {"D": "1 day", "4H": "4 hours", "1H": "1 hour"}
+# A regular session rolls up into two 4H bars (09:30-13:00 and 13:00-16:00).
+FOUR_HOUR_BARS_PER_SESSION = 2
+# Sessions of 1H history beyond the slow SMA's warm-up, for lookbacks and the
+# other indicators' warm-up.
+INTRADAY_SPARE_SESSIONS = 30
+
+
+def intraday_duration() -> str:
+    """Duration of the 1H download behind the 1H and 4H timeframes.
+
+    Long enough for the slow SMA to be defined on the recent 4H bars.
+    """
+
+    sessions = -(-settings.sma_slow // FOUR_HOUR_BARS_PER_SESSION) + INTRADAY_SPARE_SESSIONS
+    return f"{sessions} D"
 
 
 class MarketData(Protocol):
     """Abstract market data provider."""
 
-    def get_bars(self, symbol: str, tf: str, lookback: int) -> pd.DataFrame: ...
+    def get_bars(
+        self, symbol: str, tf: str, lookback: int, columns: Iterable[str] | None = None
+    ) -> pd.DataFrame: ...
 
     def get_last_close(self, symbol: str) -> float: ...
 
@@ -49,6 +64,21 @@ class IBKRMarketData:
     implementation remains intentionally small.  The returned frames include
     a collection of commonly used indicators so the scoring modules can
     operate on the data directly.
+
+    Downloaded bars are persisted in a :class:`~data.bar_cache.BarCache` so
+    subsequent requests only fetch the bars missing since the last cached
+    timestamp.  Set ``BAR_CACHE_DIR`` to an empty string to disable it.
+    Entries are kept in memory once read; :meth:`checkpoint` /
+    :meth:`restore` carry the 4H roll-up engines over a restart.
+
+    Within a trading cycle raw frames are additionally memoised in memory by
+    ``(symbol, duration, bar_size)`` so the 1H and 4H timeframes share a
+    single download.  Call :meth:`begin_cycle` at every cycle boundary to
+    drop the memo.
+
+    :meth:`load_panel` computes the indicators of a whole universe in
+    vectorised passes over a :class:`~data.panel.Panel`; while a panel is
+    loaded :meth:`get_bars` serves its symbols from it.
     """
 
     # ``ib_insync`` is an optional dependency.  When it is not installed the
@@ -59,8 +89,15 @@ class IBKRMarketData:
     # builds, etc.) we store ``None`` by default and lazily create the ``IB``
     # client in :meth:`__post_init__` when the real library is available.
     ib: IB | None = None
-    _recent: deque[float] = field(default_factory=lambda: deque(maxlen=6), init=False, repr=False)
-    _history: deque[float] = field(default_factory=deque, init=False, repr=False)
+    cache: BarCache | None = field(default_factory=BarCache.from_settings)
+    pacer: PacingScheduler = field(default_factory=shared_pacer, repr=False)
+    _memo: dict[tuple[str, str, str], pd.DataFrame] = field(default_factory=dict, init=False, repr=False)
+    _memo_hits: int = field(default=0, init=False, repr=False)
+    _memo_misses: int = field(default=0, init=False, repr=False)
+    _panels: dict[str, Panel] = field(default_factory=dict, init=False, repr=False)
+    _rollups: dict[str, RollupEngine] = field(default_factory=dict, init=False, repr=False)
+    _frames: dict[tuple[str, ...], pd.DataFrame] = field(default_factory=dict, init=False, repr=False)
+    _entries: dict[tuple[str, str], dict] = field(default_factory=dict, init=False, repr=False)
 
     def __post_init__(self) -> None:  # pragma: no cover - network
         if IB is None:
@@ -92,8 +129,183 @@ class IBKRMarketData:
     def __exit__(self, exc_type, exc, tb) -> None:
         self.close()
 
+    def begin_cycle(self) -> None:
+        """Invalidate the per-cycle memo of downloaded frames and panels."""
+
+        logger.debug(
+            "Market data cycle reset",
+            memo_hits=self._memo_hits,
+            memo_misses=self._memo_misses,
+            memo_size=len(self._memo),
+        )
+        self._memo.clear()
+        self._frames.clear()
+        self._panels.clear()
+        self._memo_hits = self._memo_misses = 0
+
+    def checkpoint(self) -> dict:
+        """Return the state worth keeping across a restart.
+
+        That is the 4H roll-up engines.  Raw bars are left to the on-disk
+        :class:`~data.bar_cache.BarCache`, which already survives restarts.
+        """
+
+        return {"rollups": dict(self._rollups)}
+
+    def restore(self, state: dict) -> None:
+        """Resume from a :meth:`checkpoint`, keeping anything newer in memory."""
+
+        for symbol, engine in state.get("rollups", {}).items():
+            self._rollups.setdefault(symbol, engine)
+
+    def load_panel(self, symbols: Sequence[str], tf: str, lookback: int) -> Panel | None:
+        """Download ``symbols`` and compute ``tf`` indicators for all at once.
+
+        Symbols whose download fails or whose bars have holes on the common
+        index are logged and left out of the panel so :meth:`get_bars` falls
+        back to the per-symbol path for them.
+        """
+
+        frames = {}
+        for symbol in symbols:
+            try:
+                frames[symbol] = self._raw_bars(symbol, tf, lookback)
+            except Exception:
+                logger.opt(exception=True).error("Panel download failed", symbol=symbol, timeframe=tf)
+        if not frames:
+            return None
+        panel = Panel.from_frames(frames)
+        gapped = panel.gapped()
+        if gapped:
+            logger.debug("Symbols with gaps left out of panel", timeframe=tf, symbols=gapped)
+            frames = {symbol: df for symbol, df in frames.items() if symbol not in gapped}
+            if not frames:
+                return None
+            panel = Panel.from_frames(frames)
+        panel = add_indicators(panel, tf)
+        self._panels[tf] = panel
+        logger.debug("Panel loaded", timeframe=tf, symbols=len(frames), bars=len(panel.index))
+        return panel
+
+    def prefetch(self, requests: Iterable[Tuple[str, str, int]]) -> None:
+        """Warm the cycle memo with the bars behind ``(symbol, tf, lookback)``.
+
+        IBKR serves one contract per request so the downloads are simply
+        issued in turn; providers able to batch override :meth:`_prefetch_keys`.
+        """
+
+        keys = []
+        for symbol, tf, lookback in requests:
+            key = (symbol, *self._raw_request(tf, lookback))
+            if key not in self._memo and key not in keys:
+                keys.append(key)
+        if keys:
+            self._prefetch_keys(keys)
+
     # -- internal helpers -------------------------------------------------
+    def _prefetch_keys(self, keys: List[Tuple[str, str, str]]) -> None:
+        for key in keys:
+            try:
+                self._download(*key)
+            except Exception:
+                logger.opt(exception=True).error("Prefetch failed", symbol=key[0], bar_size=key[2])
+
     def _download(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:
+        """Return raw bars for ``symbol`` memoised for the current cycle.
+
+        Callers receive a copy so adding indicator columns never mutates the
+        shared frame.
+        """
+
+        key = (symbol, duration, bar_size)
+        df = self._memo.get(key)
+        if df is None:
+            self._memo_misses += 1
+            df = self._memo[key] = self._load(symbol, duration, bar_size)
+        else:
+            self._memo_hits += 1
+            logger.debug("Serving bars from cycle memo", symbol=symbol, duration=duration, bar_size=bar_size)
+        return df.copy()
+
+    def _rollup_4h(self, symbol: str) -> pd.DataFrame:
+        """Return 4H bars derived from the memoised 1H download.
+
+        The roll-up engine of each symbol outlives the cycle, so only the 1H
+        bars of the last 4H bucket onwards are aggregated again.
+        """
+
+        duration = intraday_duration()
+        key = (symbol, duration, "4 hours")
+        df = self._memo.get(key)
+        if df is None:
+            df_1h = self._download(symbol, duration, "1 hour")
+            if df_1h.empty:
+                raise ValueError("No data to roll up")
+            engine = self._rollups.setdefault(symbol, RollupEngine("4 hours"))
+            engine.update(df_1h)
+            engine.trim(pd.DatetimeIndex(df_1h.index).asi8[0])
+            df = self._memo[key] = engine.frame()
+        return df.copy()
+
+    def _load(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:
+        """Return bars for ``symbol`` consulting the on-disk cache first.
+
+        A cache entry covering ``duration`` is served directly while it is
+        fresh; otherwise only the missing tail is fetched and merged into it.
+        The merged frame is trimmed to the row count of the original full
+        download so indicator warm-up matches an uncached request.
+        """
+
+        if self.cache is None:
+            return self._fetch(symbol, duration, bar_size)
+        entry, fetch = self._cache_plan(symbol, duration, bar_size)
+        if fetch is None:
+            return entry["bars"].copy()
+        return self._cache_merge(symbol, duration, bar_size, entry, self._fetch(symbol, fetch, bar_size))
+
+    def _cache_plan(self, symbol: str, duration: str, bar_size: str) -> tuple[dict | None, str | None]:
+        """Return the usable cache entry and the duration still to fetch.
+
+        The entry is ``None`` when a full download of ``duration`` is needed;
+        the duration is ``None`` when the entry is fresh enough to serve.
+        """
+
+        entry = self._cache_entry(symbol, bar_size)
+        if entry is None or entry["bars"].empty or not self.cache.covers(entry, duration):
+            return None, duration
+        if self.cache.is_fresh(entry):
+            logger.debug("Serving bars from cache", symbol=symbol, bar_size=bar_size)
+            return entry, None
+        return entry, tail_duration(entry["bars"].index[-1])
+
+    def _cache_entry(self, symbol: str, bar_size: str) -> dict | None:
+        """Return the cache entry of ``symbol``, read from disk only once."""
+
+        key = (symbol, bar_size)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self.cache.load(symbol, bar_size)
+            if entry is not None:
+                self._entries[key] = entry
+        return entry
+
+    def _cache_merge(
+        self, symbol: str, duration: str, bar_size: str, entry: dict | None, fetched: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Merge ``fetched`` bars into the cache ``entry`` and persist them."""
+
+        if entry is None:
+            df, rows = fetched, len(fetched)
+        else:
+            duration, rows = entry["duration"], entry["rows"]
+            df = merge_bars(entry["bars"], fetched).tail(rows)
+        if not df.empty:
+            self._entries[(symbol, bar_size)] = self.cache.store(symbol, bar_size, df, duration, rows)
+        return df.copy()
+
+    def _fetch(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:
+        """Request bars from IBKR, returning a UTC indexed OHLCV frame."""
+
         self._throttle()
         logger.debug("Downloading bars", symbol=symbol, duration=duration, bar_size=bar_size)
         contract = Stock(symbol, "SMART", "USD")
@@ -105,124 +317,90 @@ class IBKRMarketData:
             whatToShow="TRADES",
             useRTH=True,
         )
+        return self._to_frame(bars)
+
+    @staticmethod
+    def _to_frame(bars) -> pd.DataFrame:
+        """Convert ``ib_insync`` bars to a UTC indexed OHLCV frame."""
+
         df = util.df(bars)
         df = df.rename(columns=str.lower)
+        df.index = pd.to_datetime(df["date"], utc=True)
         df = df[["open", "high", "low", "close", "volume"]]
         return df.dropna()
 
     def _throttle(self) -> None:
-        """Pause to respect IBKR historical data pacing limits.
+        """Wait for the shared pacer to admit one historical data request.
 
         IBKR allows up to 6 historical data requests within any 2 second
         window and 60 requests within 10 minutes.  Requests beyond these
         thresholds trigger a pacing violation resulting in a blocked
-        connection.  This helper tracks recent request timestamps and sleeps
-        as necessary to stay within the documented limits.
+        connection.  The process-wide :class:`~data.pacing.PacingScheduler`
+        enforces both limits and serves exit management before reference
+        data and entry scans.
         """
 
-        now = time.monotonic()
-
-        # Trim old timestamps from the short (2s) window
-        while self._recent and now - self._recent[0] > 2:
-            self._recent.popleft()
+        self.pacer.acquire()
 
-        # Trim old timestamps from the long (10m) window
-        while self._history and now - self._history[0] > 600:
-            self._history.popleft()
+    @staticmethod
+    def _raw_request(tf: str, lookback: int) -> tuple[str, str]:
+        """Return the ``(duration, bar_size)`` download backing timeframe ``tf``."""
 
-        # Determine required sleep to satisfy both limits
-        sleep_for = 0.0
-        if len(self._recent) >= 6:
-            sleep_for = max(sleep_for, 2 - (now - self._recent[0]))
-        if len(self._history) >= 60:
-            sleep_for = max(sleep_for, 600 - (now - self._history[0]))
+        if tf == "D":
+            return f"{lookback + settings.sma_slow} D", "1 day"
+        if tf in {"1H", "4H"}:
+            return intraday_duration(), "1 hour"
+        logger.debug("Unsupported timeframe", timeframe=tf)
+        raise NotImplementedError
 
-        if sleep_for > 0:
-            logger.debug("Throttling IBKR request", sleep=sleep_for)
-            time.sleep(sleep_for)
-            now = time.monotonic()
+    def _raw_bars(self, symbol: str, tf: str, lookback: int) -> pd.DataFrame:
+        """Return the OHLCV bars underlying timeframe ``tf``."""
 
-        # Record timestamp for this request
-        self._recent.append(now)
-        self._history.append(now)
+        if tf == "4H":
+            return self._rollup_4h(symbol)
+        return self._download(symbol, *self._raw_request(tf, lookback))
 
-    def get_bars(self, symbol: str, tf: str, lookback: int) -> pd.DataFrame:
+    def get_bars(
+        self, symbol: str, tf: str, lookback: int, columns: Iterable[str] | None = None
+    ) -> pd.DataFrame:
         """Fetch price bars and compute indicators for ``symbol``.
 
-        Parameters mirror those of the previous stub implementation so the
-        rest of the application remains unchanged.
+        ``columns`` names the indicator columns the caller reads; only those
+        and their dependencies are computed.  Omitting it returns the full
+        default set of ``tf``.  Computed columns are kept for the rest of the
+        cycle so later calls for the same bars only add what is missing.
         """
 
         logger.debug("Fetching bars", symbol=symbol, timeframe=tf, lookback=lookback)
-        if tf == "D":
-            df = self._download(symbol, f"{lookback + settings.sma_slow} D", "1 day")
-            df["sma50"] = sma(df["close"], settings.sma_fast)
-            df["sma200"] = sma(df["close"], settings.sma_slow)
-            df["supertrend"] = supertrend(
-                df,
-                period=settings.supertrend_period,
-                multiplier=settings.supertrend_mult,
-            )
-            df["rsi"] = rsi(df["close"], window=settings.rsi_window)
-            macd_line, macd_signal, macd_hist = macd(
-                df["close"],
-                fast=settings.macd_fast,
-                slow=settings.macd_slow,
-                signal=settings.macd_signal,
-            )
-            df["macd_line"] = macd_line
-            df["macd_signal"] = macd_signal
-            df["macd_hist"] = macd_hist
-            df["avg_vol"] = df["volume"].rolling(settings.sma_exit).mean()
-            df["session_vol"] = df["volume"]
-            df["obv_slope"] = obv(df["close"], df["volume"]).diff()
-            lband, _, hband = bbands(df["close"], window=settings.sma_exit)
-            df["bb_pos"] = (df["close"] - lband) / (hband - lband)
-            df["pullback"] = False
-            df["extended"] = False
-            df["gap_up"] = False
-            return df.tail(lookback)
-        if tf == "1H":
-            df = self._download(symbol, "60 D", "1 hour")
-            df["supertrend"] = supertrend(
-                df,
-                period=settings.supertrend_period,
-                multiplier=settings.supertrend_mult,
-            )
-            macd_line, macd_signal, _ = macd(
-                df["close"],
-                fast=settings.macd_fast,
-                slow=settings.macd_slow,
-                signal=settings.macd_signal,
-            )
-            df["macd_line"] = macd_line
-            df["macd_signal"] = macd_signal
-            return df.tail(lookback)
-        if tf == "4H":
-            df_1h = self._download(symbol, "60 D", "1 hour")
-            df = rollup_1h_to_4h(df_1h)
-            df["supertrend"] = supertrend(
-                df,
-                period=settings.supertrend_period,
-                multiplier=settings.supertrend_mult,
-            )
-            df["rsi"] = rsi(df["close"], window=settings.rsi_window)
-            macd_line, macd_signal, _ = macd(
-                df["close"],
-                fast=settings.macd_fast,
-                slow=settings.macd_slow,
-                signal=settings.macd_signal,
-            )
-            df["macd_line"] = macd_line
-            df["macd_signal"] = macd_signal
-            df["sma20"] = sma(df["close"], settings.sma_exit)
-            df["bearish_pattern"] = False
-            return df.tail(lookback)
-        logger.debug("Unsupported timeframe", timeframe=tf)
-        raise NotImplementedError
+        columns = DEFAULT_COLUMNS.get(tf, ()) if columns is None else tuple(columns)
+        panel = self._panels.get(tf)
+        # Columns the panel does not compute are only available per symbol.
+        if panel is not None and symbol in panel and all(c in panel.data for c in columns if c in REGISTRY):
+            return select(panel.frame(symbol), columns).tail(lookback)
+        key = (symbol, tf, *self._raw_request(tf, lookback))
+        df = self._frames.get(key)
+        if df is None:
+            df = self._frames[key] = self._raw_bars(symbol, tf, lookback)
+        add_columns(df, columns)
+        return select(df, columns).tail(lookback)
+
+    def last_closed_bar(self, symbol: str, tf: str, now: float | None = None) -> int:
+        """UTC ns label of the newest ``tf`` bar of ``symbol`` closed by ``now``.
+
+        Polled bars only change when a bucket of the session grid closes, so
+        the grid answers without a request: a caller can tell whether
+        ``get_bars`` could return anything new before downloading it.
+        """
+
+        now_ns = int((time.time() if now is None else now) * 1e9)
+        bucket, session = BAR_BUCKETS[tf], Session()
+        label = bucket_labels(np.array([now_ns]), bucket, session)
+        if bucket_ends(label, bucket, session)[0] > now_ns:
+            label = bucket_labels(label - 1, bucket, session)
+        return int(label[0])
 
     def get_last_close(self, symbol: str) -> float:
-        df = self.get_bars(symbol, "D", 1)
+        df = self.get_bars(symbol, "D", 1, columns=())
         return float(df["close"].iloc[-1])
 
     def get_vix(self) -> float:
@@ -233,7 +411,8 @@ class IBKRMarketData:
         window keeps the request lightweight.
         """
 
-        df = self._download("VIX", "5 D", "1 day")
+        with prioritised(Priority.REFERENCE):
+            df = self._download("VIX", "5 D", "1 day")
         return float(df["close"].iloc[-1])
 
     def get_reference_symbol(self) -> str:
@@ -254,7 +433,8 @@ class YFinanceMarketData(IBKRMarketData):
     :class:`IBKRMarketData` but sources the raw OHLCV data from the public
     Yahoo Finance API via the :mod:`yfinance` package.  No network connection
     is established at initialisation time which keeps the class lightweight
-    and easy to stub in tests.
+    and easy to stub in tests.  :meth:`prefetch` downloads many tickers with a
+    single grouped request and splits the result per symbol.
     """
 
     def __post_init__(self) -> None:  # pragma: no cover - trivial
@@ -263,28 +443,82 @@ class YFinanceMarketData(IBKRMarketData):
         pass
 
     # -- internal helpers -------------------------------------------------
-    def _download(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:
+    def _fetch(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:
         """Download historical bars using :mod:`yfinance`.
 
-        Parameters mirror the signature of :meth:`IBKRMarketData._download` to
+        Parameters mirror the signature of :meth:`IBKRMarketData._fetch` to
         keep the rest of the application unchanged.  The ``duration`` string is
         converted to the ``period`` parameter expected by ``yfinance`` and the
         ``bar_size`` is mapped to the corresponding ``interval``.
         """
 
-        logger.debug("Downloading bars", symbol=symbol, duration=duration, bar_size=bar_size)
+        return self._fetch_many([symbol], duration, bar_size)[symbol]
+
+    def _fetch_many(self, symbols: Sequence[str], duration: str, bar_size: str) -> dict[str, pd.DataFrame]:
+        """Download ``symbols`` in one grouped ``yf.download`` call.
+
+        Symbols missing from the response map to empty frames.
+        """
+
+        logger.debug("Downloading bars", symbols=len(symbols), duration=duration, bar_size=bar_size)
         import yfinance as yf  # Imported lazily to keep dependency optional
 
         period = duration.lower().replace(" ", "")  # e.g. "5 D" -> "5d"
         interval_map = {"1 day": "1d", "1 hour": "1h"}
         interval = interval_map.get(bar_size, "1d")
-        df = yf.download(symbol, period=period, interval=interval, progress=False)
-        df = df.rename(columns=str.lower)
-        df = df[["open", "high", "low", "close", "volume"]]
-        return df.dropna()
+        raw = yf.download(
+            list(symbols), period=period, interval=interval, group_by="ticker", progress=False, threads=True
+        )
+        frames = {}
+        for symbol in symbols:
+            if raw.empty or (
+                isinstance(raw.columns, pd.MultiIndex) and symbol not in raw.columns.get_level_values(0)
+            ):
+                frames[symbol] = pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
+                continue
+            if isinstance(raw.columns, pd.MultiIndex):
+                df = raw[symbol]
+            else:
+                df = raw
+            df = df.rename(columns=str.lower)
+            df.index = pd.to_datetime(df.index, utc=True)
+            frames[symbol] = df[["open", "high", "low", "close", "volume"]].dropna()
+        return frames
+
+    def _prefetch_keys(self, keys: List[Tuple[str, str, str]]) -> None:
+        """Fetch every key needing network access with one call per group.
+
+        Keys are grouped by the duration still to fetch - the full duration
+        for symbols without a usable cache entry and the missing tail for the
+        others - and by bar size.
+        """
+
+        groups: dict[tuple[str, str], list] = {}
+        for symbol, duration, bar_size in keys:
+            if self.cache is None:
+                entry, fetch = None, duration
+            else:
+                entry, fetch = self._cache_plan(symbol, duration, bar_size)
+            if fetch is None:
+                self._memo[(symbol, duration, bar_size)] = entry["bars"].copy()
+                continue
+            groups.setdefault((fetch, bar_size), []).append((symbol, duration, entry))
+        for (fetch, bar_size), members in groups.items():
+            try:
+                frames = self._fetch_many([m[0] for m in members], fetch, bar_size)
+            except Exception:
+                logger.opt(exception=True).error("Bulk download failed", symbols=len(members), bar_size=bar_size)
+                continue
+            for symbol, duration, entry in members:
+                df = frames[symbol]
+                if self.cache is not None:
+                    df = self._cache_merge(symbol, duration, bar_size, entry, df)
+                self._memo[(symbol, duration, bar_size)] = df
+                self._memo_misses += 1
 
     def get_vix(self) -> float:
         """Return the latest VIX value using the ``^VIX`` ticker."""
 
-        df = self._download("^VIX", "5 D", "1 day")
+        with prioritised(Priority.REFERENCE):
+            df = self._download("^VIX", "5 D", "1 day")
         return float(df["close"].iloc[-1])
@@ -0,0 +1,221 @@
+"""Process-wide pacing of IBKR historical data requests.
+
+IBKR allows 6 historical data requests within any 2 second window and 60
+within 10 minutes.  :class:`PacingScheduler` enforces both limits with one
+token bucket per window and hands out tokens by priority, so exit and stop
+management is never queued behind a scan of idle entry candidates.  Every
+historical request in the process goes through the shared :data:`pacer`.
+
+The priority of a request is taken from the :func:`prioritised` context
+which works for threads and asyncio tasks alike::
+
+    with prioritised(Priority.EXIT):
+        bars = market_data.get_bars(symbol, "1H", 2)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Callable, Dict, Iterator, Sequence, Tuple
+
+from loguru import logger
+
+# ``(requests, seconds)`` limits documented by IBKR.
+IBKR_LIMITS: Tuple[Tuple[int, float], ...] = ((6, 2.0), (60, 600.0))
+
+
+class Priority(IntEnum):
+    """Request classes, lower values are served first."""
+
+    EXIT = 0
+    REFERENCE = 1
+    ENTRY = 2
+
+
+_priority: ContextVar[Priority] = ContextVar("pacing_priority", default=Priority.ENTRY)
+
+
+@contextmanager
+def prioritised(priority: Priority) -> Iterator[None]:
+    """Run the enclosed data requests with ``priority``."""
+
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+class TokenBucket:
+    """Bucket of ``capacity`` tokens where a spent token returns after ``window``.
+
+    A classic bucket refilling at ``capacity / window`` would let
+    ``2 * capacity`` requests through in one window after an idle period;
+    returning each token exactly one window after use keeps the bucket
+    equivalent to IBKR's sliding-window limit.
+    """
+
+    def __init__(self, capacity: int, window: float) -> None:
+        self.capacity = capacity
+        self.window = window
+        self.spent: deque[float] = deque()
+
+    def _refill(self, now: float) -> None:
+        while self.spent and now - self.spent[0] >= self.window:
+            self.spent.popleft()
+
+    def tokens(self, now: float) -> int:
+        self._refill(now)
+        return self.capacity - len(self.spent)
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available at ``now``."""
+
+        if self.tokens(now) > 0:
+            return 0.0
+        return self.spent[0] + self.window - now
+
+    def take(self, now: float) -> None:
+        self.spent.append(now)
+
+
+class PacingScheduler:
+    """Priority aware gate in front of every historical data request.
+
+    Waiting requests form a priority queue; only the head of the queue may
+    take tokens, so a newly arrived exit request overtakes entry requests
+    that are already waiting.  :meth:`stats` reports the current queue depth
+    and the wait times per priority class.
+    """
+
+    def __init__(
+        self,
+        limits: Sequence[Tuple[int, float]] = IBKR_LIMITS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.buckets = [TokenBucket(capacity, window) for capacity, window in limits]
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._queue: list[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._served: Dict[Priority, int] = {p: 0 for p in Priority}
+        self._waited: Dict[Priority, float] = {p: 0.0 for p in Priority}
+        self._max_wait: Dict[Priority, float] = {p: 0.0 for p in Priority}
+
+    # -- public API ---------------------------------------------------------
+    def acquire(self, priority: Priority | None = None) -> float:
+        """Block until a request may be sent and return the seconds waited."""
+
+        priority = current_priority() if priority is None else priority
+        start = self.clock()
+        with self._cond:
+            ticket = self._enqueue(priority)
+            try:
+                while True:
+                    delay = self._delay(ticket)
+                    if delay is not None and delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                self._grant()
+            except BaseException:
+                self._remove(ticket)
+                raise
+        return self._record(priority, start)
+
+    async def acquire_async(self, priority: Priority | None = None) -> float:
+        """Asynchronous :meth:`acquire` that never blocks the event loop."""
+
+        priority = current_priority() if priority is None else priority
+        start = self.clock()
+        with self._cond:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._cond:
+                    delay = self._delay(ticket)
+                    if delay is not None and delay <= 0:
+                        self._grant()
+                        break
+                # Another waiter is ahead of us; poll until it has been served.
+                await asyncio.sleep(0.05 if delay is None else delay)
+        except BaseException:
+            with self._cond:
+                self._remove(ticket)
+            raise
+        return self._record(priority, start)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return queue depth, request counts and wait times per priority."""
+
+        with self._cond:
+            depth = {p: 0 for p in Priority}
+            for prio, _ in self._queue:
+                depth[Priority(prio)] += 1
+            return {
+                p.name: {
+                    "queued": depth[p],
+                    "served": self._served[p],
+                    "avg_wait": self._waited[p] / self._served[p] if self._served[p] else 0.0,
+                    "max_wait": self._max_wait[p],
+                }
+                for p in Priority
+            }
+
+    # -- internal helpers -----------------------------------------------------
+    def _enqueue(self, priority: Priority) -> Tuple[int, int]:
+        ticket = (int(priority), next(self._seq))
+        heapq.heappush(self._queue, ticket)
+        self._cond.notify_all()
+        return ticket
+
+    def _remove(self, ticket: Tuple[int, int]) -> None:
+        if ticket in self._queue:
+            self._queue.remove(ticket)
+            heapq.heapify(self._queue)
+            self._cond.notify_all()
+
+    def _delay(self, ticket: Tuple[int, int]) -> float | None:
+        """Seconds until ``ticket`` may go, ``None`` if it is not at the head."""
+
+        if self._queue[0] != ticket:
+            return None
+        now = self.clock()
+        return max(bucket.wait_time(now) for bucket in self.buckets)
+
+    def _grant(self) -> None:
+        heapq.heappop(self._queue)
+        now = self.clock()
+        for bucket in self.buckets:
+            bucket.take(now)
+        self._cond.notify_all()
+
+    def _record(self, priority: Priority, start: float) -> float:
+        waited = self.clock() - start
+        with self._cond:
+            self._served[priority] += 1
+            self._waited[priority] += waited
+            self._max_wait[priority] = max(self._max_wait[priority], waited)
+        if waited > 0.01:
+            logger.debug("Paced historical request", priority=priority.name, waited=round(waited, 3))
+        return waited
+
+
+pacer = PacingScheduler()
+
+
+def shared_pacer() -> PacingScheduler:
+    """Return the process-wide :class:`PacingScheduler`."""
+
+    return pacer
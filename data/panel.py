@@ -0,0 +1,173 @@
+"""Vectorised indicators across the whole universe.
+
+OHLCV data for every symbol is laid out as aligned 2-D NumPy arrays of shape
+``(symbols, bars)``.  The indicator functions below operate along the bar
+axis for all symbols at once: window statistics use cumulative sums and the
+recursive indicators (EMA, Wilder smoothing, SuperTrend) come from
+:mod:`data.kernels`.  Missing bars are ``NaN``; a symbol whose history
+starts later than the panel is warmed up from its first valid bar.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+
+from .kernels import _shift, adx, ewm, rsi, supertrend
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+def _rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    """Rolling sum along the bar axis, NaN unless all ``window`` values exist."""
+
+    valid = ~np.isnan(x)
+    pad = np.zeros((x.shape[0], 1))
+    total = np.concatenate([pad, np.cumsum(np.where(valid, x, 0.0), axis=1)], axis=1)
+    count = np.concatenate([pad, np.cumsum(valid, axis=1)], axis=1)
+    out = np.full(x.shape, np.nan)
+    if window <= x.shape[1]:
+        win_total = total[:, window:] - total[:, :-window]
+        win_count = count[:, window:] - count[:, :-window]
+        out[:, window - 1 :] = np.where(win_count == window, win_total, np.nan)
+    return out
+
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    return _rolling_sum(x, window) / window
+
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    return ewm(x, 2.0 / (span + 1.0), span)
+
+
+def macd(
+    close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    line = ema(close, fast) - ema(close, slow)
+    sig = ema(line, signal)
+    return line, sig, line - sig
+
+
+def bbands(close: np.ndarray, window: int = 20, dev: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    mean = sma(close, window)
+    var = np.maximum(_rolling_sum(close * close, window) / window - mean * mean, 0.0)
+    std = np.sqrt(var)
+    return mean - dev * std, mean, mean + dev * std
+
+
+def obv(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    signed = np.where(close >= _shift(close), volume, -volume)
+    return np.cumsum(np.nan_to_num(signed), axis=1)
+
+
+@dataclass
+class Panel:
+    """OHLCV bars of many symbols aligned on a common index.
+
+    Attributes:
+        symbols: Row labels.
+        index: Bar timestamps shared by all rows.
+        data: Mapping of field/indicator name to a ``(symbols, bars)`` array.
+    """
+
+    symbols: Sequence[str]
+    index: pd.Index
+    data: Dict[str, np.ndarray] = field(default_factory=dict)
+    _rows: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    @classmethod
+    def from_frames(cls, frames: Mapping[str, pd.DataFrame]) -> "Panel":
+        """Align per-symbol OHLCV frames on the union of their indices."""
+
+        symbols = list(frames)
+        index = frames[symbols[0]].index
+        for sym in symbols[1:]:
+            index = index.union(frames[sym].index)
+        data = {
+            name: np.vstack([frames[sym][name].reindex(index).to_numpy(dtype=float) for sym in symbols])
+            for name in FIELDS
+        }
+        return cls(symbols, index, data)
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, Mapping[str, np.ndarray]]) -> "Panel":
+        """Align per-symbol ``ts`` and OHLCV arrays on the union of their timestamps."""
+
+        ts = np.unique(np.concatenate([np.asarray(a["ts"]) for a in arrays.values()] or [np.empty(0, np.int64)]))
+        data = {name: np.full((len(arrays), len(ts)), np.nan) for name in FIELDS}
+        for row, a in enumerate(arrays.values()):
+            pos = np.searchsorted(ts, a["ts"])
+            for name in FIELDS:
+                data[name][row, pos] = a[name]
+        return cls(list(arrays), pd.to_datetime(ts, utc=True), data)
+
+    def row(self, symbol: str) -> int:
+        return self._rows[symbol]
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """Return ``symbol``'s bars and indicator columns as a DataFrame."""
+
+        i = self.row(symbol)
+        df = pd.DataFrame({name: arr[i] for name, arr in self.data.items()}, index=self.index)
+        return df[~np.isnan(self.data["close"][i])]
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._rows
+
+    def gapped(self) -> List[str]:
+        """Symbols missing bars between their first and last one.
+
+        Their indicators would be computed across the ``NaN`` holes left by
+        the alignment and differ from those of the symbol's own bars.
+        """
+
+        valid = ~np.isnan(self.data["close"])
+        first = valid.argmax(axis=1)
+        last = valid.shape[1] - valid[:, ::-1].argmax(axis=1)
+        count = valid.sum(axis=1)
+        return [sym for sym, n, span in zip(self.symbols, count, last - first) if n and n != span]
+
+
+def add_indicators(panel: Panel, tf: str) -> Panel:
+    """Populate ``panel`` with the indicator columns produced by ``get_bars``."""
+
+    d = panel.data
+    high, low, close, volume = d["high"], d["low"], d["close"], d["volume"]
+    d["supertrend"] = supertrend(
+        high, low, close, period=settings.supertrend_period, multiplier=settings.supertrend_mult
+    )
+    macd_line, macd_signal, macd_hist = macd(
+        close, fast=settings.macd_fast, slow=settings.macd_slow, signal=settings.macd_signal
+    )
+    d["macd_line"] = macd_line
+    d["macd_signal"] = macd_signal
+    if tf == "1H":
+        return panel
+    d["rsi"] = rsi(close, window=settings.rsi_window)
+    if tf == "4H":
+        d["sma20"] = sma(close, settings.sma_exit)
+        d["bearish_pattern"] = np.zeros(close.shape, dtype=bool)
+        return panel
+    d["sma50"] = sma(close, settings.sma_fast)
+    d["sma200"] = sma(close, settings.sma_slow)
+    d["adx"] = adx(high, low, close, 14)
+    d["macd_hist"] = macd_hist
+    d["avg_vol"] = sma(volume, settings.sma_exit)
+    d["session_vol"] = volume
+    obv_ = obv(close, volume)
+    d["obv_slope"] = obv_ - _shift(obv_)
+    lband, _, hband = bbands(close, window=settings.sma_exit)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d["bb_pos"] = (close - lband) / (hband - lband)
+    for name in ("pullback", "extended", "gap_up"):
+        d[name] = np.zeros(close.shape, dtype=bool)
+    return panel
@@ -1,9 +1,241 @@
-"""Timeframe roll-up helpers."""
+"""Session-aware timeframe roll-ups.
+
+Source bars are grouped into target buckets by a label computed for every
+bar in one vectorised pass; OHLCV values are then reduced per bucket with
+``numpy`` ``reduceat``.  Intraday buckets follow a grid anchored at the top of
+the opening hour and are cut at the session open and close, so no bucket
+straddles the open, the close or an overnight gap::
+
+    1 hour    09:30-10:00, 10:00-11:00, ..., 15:00-16:00
+    4 hours   09:30-13:00, 13:00-16:00
+
+Daily and weekly buckets are labelled with the (Monday) session date at UTC
+midnight like IBKR's daily bars.  :class:`RollupEngine` keeps the source bars
+of the last, possibly incomplete bucket so appending new bars only reduces
+that bucket again.
+"""
 
 from __future__ import annotations
 
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, time, timezone
+from typing import Dict, List
+from zoneinfo import ZoneInfo
+
+import numpy as np
 import pandas as pd
 
+from config import settings
+
+SESSION_OPEN = time(9, 30)
+SESSION_CLOSE = time(16)
+FIELDS = ("open", "high", "low", "close", "volume")
+CALENDAR = ("1 day", "1 week")
+
+_NS = 10**9
+_HOUR = 3_600 * _NS
+_DAY = 24 * _HOUR
+_UNITS = {"sec": _NS, "secs": _NS, "min": 60 * _NS, "mins": 60 * _NS, "hour": _HOUR, "hours": _HOUR}
+
+
+def _ns(t: time) -> int:
+    return (t.hour * 3_600 + t.minute * 60 + t.second) * _NS
+
+
+def bar_span(bar_size: str) -> int:
+    """Length of an intraday IBKR bar size such as ``"4 hours"`` in ns."""
+
+    match = re.fullmatch(r"(\d+)\s+(\w+)", bar_size.strip())
+    if not match or match.group(2) not in _UNITS:
+        raise ValueError(f"Unsupported bar size: {bar_size}")
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+@dataclass(frozen=True)
+class Session:
+    """Regular trading hours of an exchange."""
+
+    tz: ZoneInfo = field(default_factory=lambda: ZoneInfo(settings.timezone))
+    open: time = SESSION_OPEN
+    close: time = SESSION_CLOSE
+
+    def utc_offsets(self, ts: np.ndarray) -> np.ndarray:
+        """UTC offset in ns at every timestamp of ``ts`` (UTC ns).
+
+        Offsets only change on the hour, so they are looked up once per
+        distinct hour rather than per bar.
+        """
+
+        hours, inverse = np.unique(ts // _HOUR, return_inverse=True)
+        offsets = [
+            self.tz.utcoffset(datetime.fromtimestamp(int(h) * 3_600, timezone.utc)).total_seconds() for h in hours
+        ]
+        return (np.asarray(offsets, dtype=np.int64) * _NS)[inverse]
+
+
+def bucket_labels(ts: np.ndarray, target: str, session: Session, dated: bool = False) -> np.ndarray:
+    """Return the UTC ns label of the ``target`` bucket of every timestamp.
+
+    ``dated`` marks daily source bars whose timestamps are session dates at
+    UTC midnight rather than instants.
+    """
+
+    ts = np.asarray(ts, dtype=np.int64)
+    offsets = np.zeros_like(ts) if dated else session.utc_offsets(ts)
+    local = ts + offsets
+    day = local // _DAY
+    if target == "1 day":
+        return day * _DAY
+    if target == "1 week":
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday.
+        return ((day + 3) // 7 * 7 - 3) * _DAY
+    if dated:
+        raise ValueError(f"Cannot roll daily bars up to {target}")
+    span = bar_span(target)
+    tod = local - day * _DAY
+    open_, close = _ns(session.open), _ns(session.close)
+    origin = open_ // _HOUR * _HOUR
+    segment = np.where(tod < open_, 0, np.where(tod < close, open_, close))
+    grid = origin + (tod - origin) // span * span
+    return day * _DAY + np.maximum(grid, segment) - offsets
+
+
+def bucket_ends(labels: np.ndarray, target: str, session: Session) -> np.ndarray:
+    """Return the UTC ns time at which each ``target`` bucket in ``labels`` closes.
+
+    Daily labels are session dates at UTC midnight and close at the session
+    close; intraday buckets close where the next one starts.
+    """
+
+    labels = np.asarray(labels, dtype=np.int64)
+    if target == "1 day":
+        close = labels + _ns(session.close)
+        return close - session.utc_offsets(close)
+    if target in CALENDAR:
+        raise ValueError(f"Unsupported bucket: {target}")
+    span = bar_span(target)
+    offsets = session.utc_offsets(labels)
+    local = labels + offsets
+    day = local // _DAY
+    tod = local - day * _DAY
+    open_, close = _ns(session.open), _ns(session.close)
+    origin = open_ // _HOUR * _HOUR
+    end = origin + ((tod - origin) // span + 1) * span
+    end = np.where(tod < open_, np.minimum(end, open_), np.where(tod < close, np.minimum(end, close), end))
+    return day * _DAY + end - offsets
+
+
+def _reduce(labels: np.ndarray, columns: Dict[str, np.ndarray]) -> tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Aggregate consecutive rows sharing a label; return bucket starts and bars."""
+
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    ends = np.r_[starts[1:], len(labels)] - 1
+    bars = {
+        "open": columns["open"][starts],
+        "high": np.maximum.reduceat(columns["high"], starts),
+        "low": np.minimum.reduceat(columns["low"], starts),
+        "close": columns["close"][ends],
+        "volume": np.add.reduceat(columns["volume"], starts),
+    }
+    return starts, bars
+
+
+class RollupEngine:
+    """Incrementally roll ``source`` bars up to ``target`` buckets.
+
+    Bars passed to :meth:`append` must be sorted.  Bars older than the last
+    bucket are ignored and a bar repeating a timestamp of the last bucket
+    replaces it, so re-sending a revised in-progress source bar is safe.
+    """
+
+    def __init__(self, target: str, source: str = "1 hour", session: Session | None = None) -> None:
+        self.target = target
+        self.dated = source in CALENDAR
+        self.session = session or Session()
+        self._labels: List[np.ndarray] = []
+        self._bars: Dict[str, List[np.ndarray]] = {name: [] for name in FIELDS}
+        self._tail_ts = np.empty(0, dtype=np.int64)
+        self._tail: Dict[str, np.ndarray] = {name: np.empty(0) for name in FIELDS}
+
+    def __len__(self) -> int:
+        return sum(len(x) for x in self._labels) + (len(self._tail_ts) > 0)
+
+    def append(self, ts: np.ndarray, **columns: np.ndarray) -> int:
+        """Fold source bars in; return the number of buckets completed."""
+
+        ts = np.asarray(ts, dtype=np.int64)
+        columns = {name: np.asarray(columns[name], dtype=np.float64) for name in FIELDS}
+        if len(self._tail_ts):
+            new = ts >= self._tail_ts[0]
+            ts, columns = ts[new], {k: v[new] for k, v in columns.items()}
+            if not len(ts):
+                return 0
+            old = self._tail_ts < ts[0]
+            ts = np.concatenate([self._tail_ts[old], ts])
+            columns = {k: np.concatenate([self._tail[k][old], v]) for k, v in columns.items()}
+        if not len(ts):
+            return 0
+        labels = bucket_labels(ts, self.target, self.session, self.dated)
+        starts, bars = _reduce(labels, columns)
+        last = starts[-1]
+        self._labels.append(labels[starts[:-1]])
+        for name in FIELDS:
+            self._bars[name].append(bars[name][:-1])
+        self._tail_ts = ts[last:]
+        self._tail = {k: v[last:] for k, v in columns.items()}
+        return len(starts) - 1
+
+    def update(self, df: pd.DataFrame) -> int:
+        """:meth:`append` the rows of a UTC indexed OHLCV frame."""
+
+        ts = pd.DatetimeIndex(df.index).asi8
+        return self.append(ts, **{name: df[name].to_numpy(dtype=np.float64) for name in FIELDS})
+
+    def trim(self, before: int) -> None:
+        """Forget completed buckets labelled before ``before`` (UTC ns)."""
+
+        labels = self._compact()
+        keep = labels >= before
+        self._labels = [labels[keep]]
+        self._bars = {name: [self._bars[name][0][keep]] for name in FIELDS}
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Labels (``ts``) and OHLCV of every bucket including the last one."""
+
+        labels = self._compact()
+        out = {"ts": labels, **{name: self._bars[name][0] for name in FIELDS}}
+        if len(self._tail_ts):
+            tail_labels = bucket_labels(self._tail_ts[:1], self.target, self.session, self.dated)
+            _, tail = _reduce(np.repeat(tail_labels, len(self._tail_ts)), self._tail)
+            out["ts"] = np.r_[labels, tail_labels]
+            for name in FIELDS:
+                out[name] = np.r_[out[name], tail[name]]
+        return out
+
+    def frame(self) -> pd.DataFrame:
+        arrays = self.arrays()
+        index = pd.to_datetime(arrays.pop("ts"), utc=True)
+        return pd.DataFrame(arrays, index=index)
+
+    def _compact(self) -> np.ndarray:
+        """Merge the completed chunks into single arrays and return the labels."""
+
+        if len(self._labels) != 1:
+            self._labels = [np.concatenate(self._labels or [np.empty(0, dtype=np.int64)])]
+            self._bars = {name: [np.concatenate(chunks or [np.empty(0)])] for name, chunks in self._bars.items()}
+        return self._labels[0]
+
+
+def rollup(df: pd.DataFrame, target: str, source: str = "1 hour", session: Session | None = None) -> pd.DataFrame:
+    """Roll the ``source`` bars in ``df`` up to ``target`` bars."""
+
+    if df.empty:
+        raise ValueError("No data to roll up")
+    engine = RollupEngine(target, source, session)
+    engine.update(df)
+    return engine.frame()
+
 
 def rollup_1h_to_4h(df_1h: pd.DataFrame) -> pd.DataFrame:
     """Roll up 1H bars to 4H bars using session-aware boundaries.
@@ -13,18 +245,7 @@ def rollup_1h_to_4h(df_1h: pd.DataFrame) -> pd.DataFrame:
             ``open``, ``high``, ``low``, ``close``, ``volume``.
 
     Returns:
-        4H resampled DataFrame.
+        4H DataFrame labelled with the bucket start.
     """
 
-    if df_1h.empty:
-        raise ValueError("No data to roll up")
-    df = df_1h.resample("4H", label="right", closed="right").agg(
-        {
-            "open": "first",
-            "high": "max",
-            "low": "min",
-            "close": "last",
-            "volume": "sum",
-        }
-    )
-    return df.dropna()
+    return rollup(df_1h, "4 hours")
@@ -0,0 +1,369 @@
+"""Incremental indicator engine.
+
+The batch helpers in :mod:`data.indicators` recompute every indicator across
+the full history whenever a frame is requested.  The classes below keep the
+running state of each indicator instead (rolling sums, EMA values, Wilder
+smoothing, SuperTrend bands and the OBV accumulator) so a new bar is folded
+in with a constant amount of work.
+
+The update rules mirror the conventions of the batch functions - ``ta``'s
+``min_periods`` handling, Wilder's seeding of ATR and RSI and the sign rule
+used by :func:`data.indicators.obv` - so an :class:`IndicatorState` seeded
+from history reproduces the values computed by
+:meth:`data.market_data.IBKRMarketData.get_bars`.  :func:`compare_with_batch`
+reports the differences for a given frame.
+"""
+
+from __future__ import annotations
+
+import copy
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Tuple
+
+from config import settings
+
+NAN = float("nan")
+
+# Indicator columns of an :class:`IndicatorState` row.
+STREAMED_COLUMNS = (
+    "sma20",
+    "sma50",
+    "sma200",
+    "rsi",
+    "macd_line",
+    "macd_signal",
+    "macd_hist",
+    "supertrend",
+    "avg_vol",
+    "session_vol",
+    "obv_slope",
+    "bb_pos",
+)
+
+
+class RollingWindow:
+    """Rolling mean and population standard deviation over ``window`` values."""
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.values: deque[float] = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def update(self, value: float) -> None:
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+        if len(self.values) > self.window:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.window
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.window if self.ready else NAN
+
+    @property
+    def std(self) -> float:
+        if not self.ready:
+            return NAN
+        mean = self.total / self.window
+        return math.sqrt(max(self.total_sq / self.window - mean * mean, 0.0))
+
+
+class EMA:
+    """Exponential moving average matching ``ewm(adjust=False)``.
+
+    The recursion starts at the first value; the output is reported as NaN
+    until ``min_periods`` values have been seen.
+    """
+
+    def __init__(self, alpha: float, min_periods: int) -> None:
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.state = NAN
+        self.count = 0
+
+    @classmethod
+    def from_span(cls, span: int) -> "EMA":
+        return cls(2.0 / (span + 1.0), span)
+
+    def update(self, value: float) -> float:
+        if math.isnan(value):
+            return self.value
+        self.count += 1
+        if self.count == 1:
+            self.state = value
+        else:
+            self.state += self.alpha * (value - self.state)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.state if self.count >= self.min_periods else NAN
+
+
+class WilderRSI:
+    """Relative strength index using Wilder smoothing as done by ``ta``."""
+
+    def __init__(self, window: int) -> None:
+        self.up = EMA(1.0 / window, window)
+        self.down = EMA(1.0 / window, window)
+        self.prev: float | None = None
+
+    def update(self, close: float) -> float:
+        diff = 0.0 if self.prev is None else close - self.prev
+        self.prev = close
+        up = self.up.update(max(diff, 0.0))
+        down = self.down.update(max(-diff, 0.0))
+        if math.isnan(down):
+            return NAN
+        if down == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + up / down)
+
+
+class MACDState:
+    """MACD line, signal and histogram."""
+
+    def __init__(self, fast: int, slow: int, signal: int) -> None:
+        self.fast = EMA.from_span(fast)
+        self.slow = EMA.from_span(slow)
+        self.signal = EMA.from_span(signal)
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        line = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(line)
+        return line, signal, line - signal
+
+
+class WilderATR:
+    """Average true range seeded with the mean of the first ``window`` ranges."""
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self.prev_close: float | None = None
+        self.count = 0
+        self.value = 0.0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.count += 1
+        if self.count < self.window:
+            self.value += tr
+            return 0.0
+        if self.count == self.window:
+            self.value = (self.value + tr) / self.window
+        else:
+            self.value = (self.value * (self.window - 1) + tr) / self.window
+        return self.value
+
+
+class SuperTrendState:
+    """SuperTrend direction (``1`` up, ``-1`` down) with ratcheting bands."""
+
+    def __init__(self, period: int, multiplier: float) -> None:
+        self.atr = WilderATR(period)
+        self.multiplier = multiplier
+        self.upper = NAN
+        self.lower = NAN
+        self.prev_close = NAN
+        self.direction = 1
+
+    def update(self, high: float, low: float, close: float) -> int:
+        atr = self.atr.update(high, low, close)
+        if self.atr.count >= self.atr.window:
+            mid = (high + low) / 2.0
+            upper = mid + self.multiplier * atr
+            lower = mid - self.multiplier * atr
+            if not math.isnan(self.upper) and upper >= self.upper and self.prev_close <= self.upper:
+                upper = self.upper
+            if not math.isnan(self.lower) and lower <= self.lower and self.prev_close >= self.lower:
+                lower = self.lower
+            if self.direction < 0 and close > upper:
+                self.direction = 1
+            elif self.direction > 0 and close < lower:
+                self.direction = -1
+            self.upper, self.lower = upper, lower
+        self.prev_close = close
+        return self.direction
+
+
+class OBVState:
+    """On-balance volume accumulator following :func:`data.indicators.obv`."""
+
+    def __init__(self) -> None:
+        self.prev: float | None = None
+        self.value = 0.0
+
+    def update(self, close: float, volume: float) -> float:
+        signed = volume if self.prev is not None and close >= self.prev else -volume
+        self.prev = close
+        self.value += signed
+        return signed
+
+
+@dataclass
+class IndicatorState:
+    """Running indicator state for a single symbol and timeframe.
+
+    Every call to :meth:`update` advances all indicators by one completed bar
+    in constant time and returns a row with the same column names used by
+    :meth:`data.market_data.IBKRMarketData.get_bars`.  The most recent
+    ``keep`` rows are retained in :attr:`rows` so scoring code can look at
+    the latest and previous values.
+    """
+
+    keep: int = 2
+    rows: deque[Dict[str, Any]] = field(init=False)
+    last_ts: Any = None
+
+    def __post_init__(self) -> None:
+        self.rows = deque(maxlen=self.keep)
+        self._sma_fast = RollingWindow(settings.sma_fast)
+        self._sma_slow = RollingWindow(settings.sma_slow)
+        self._sma_exit = RollingWindow(settings.sma_exit)
+        self._avg_vol = RollingWindow(settings.sma_exit)
+        self._rsi = WilderRSI(settings.rsi_window)
+        self._macd = MACDState(settings.macd_fast, settings.macd_slow, settings.macd_signal)
+        self._supertrend = SuperTrendState(settings.supertrend_period, settings.supertrend_mult)
+        self._obv = OBVState()
+
+    def update(
+        self, high: float, low: float, close: float, volume: float, ts: Any = None
+    ) -> Dict[str, Any]:
+        """Fold one completed bar into the state and return its indicator row.
+
+        Bars with a timestamp not after :attr:`last_ts` are ignored so a feed
+        may safely be replayed.
+        """
+
+        if ts is not None and self.last_ts is not None and ts <= self.last_ts:
+            return self.rows[-1]
+        self._sma_fast.update(close)
+        self._sma_slow.update(close)
+        self._sma_exit.update(close)
+        self._avg_vol.update(volume)
+        macd_line, macd_signal, macd_hist = self._macd.update(close)
+        mid, std = self._sma_exit.mean, self._sma_exit.std
+        width = 4.0 * std
+        row = {
+            "ts": ts,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
+            "sma20": mid,
+            "sma50": self._sma_fast.mean,
+            "sma200": self._sma_slow.mean,
+            "rsi": self._rsi.update(close),
+            "macd_line": macd_line,
+            "macd_signal": macd_signal,
+            "macd_hist": macd_hist,
+            "supertrend": self._supertrend.update(high, low, close),
+            "avg_vol": self._avg_vol.mean,
+            "session_vol": volume,
+            "obv_slope": self._obv.update(close, volume),
+            "bb_pos": (close - (mid - 2.0 * std)) / width if width else NAN,
+        }
+        self.rows.append(row)
+        self.last_ts = ts if ts is not None else self.last_ts
+        return row
+
+    def seed(self, df: Any) -> "IndicatorState":
+        """Replay the OHLCV history in ``df`` to warm up the state."""
+
+        index = getattr(df, "index", None)
+        stamps: Iterable[Any] = index if index is not None else [None] * len(df)
+        for ts, high, low, close, volume in zip(stamps, df["high"], df["low"], df["close"], df["volume"]):
+            self.update(float(high), float(low), float(close), float(volume), ts)
+        return self
+
+    def preview(self, high: float, low: float, close: float, volume: float, ts: Any = None) -> Dict[str, Any]:
+        """Row of a bar still in progress, leaving the state untouched."""
+
+        return copy.deepcopy(self).update(high, low, close, volume, ts)
+
+    @property
+    def latest(self) -> Dict[str, Any]:
+        return self.rows[-1]
+
+
+@dataclass
+class IndicatorEngine:
+    """Collection of :class:`IndicatorState` objects keyed by symbol/timeframe."""
+
+    keep: int = 2
+    states: Dict[Tuple[str, str], IndicatorState] = field(default_factory=dict)
+
+    def state(self, symbol: str, tf: str) -> IndicatorState:
+        key = (symbol, tf)
+        if key not in self.states:
+            self.states[key] = IndicatorState(keep=self.keep)
+        return self.states[key]
+
+    def seed(self, symbol: str, tf: str, df: Any) -> IndicatorState:
+        """Reset the state for ``symbol``/``tf`` and warm it up from ``df``."""
+
+        self.states[(symbol, tf)] = IndicatorState(keep=self.keep).seed(df)
+        return self.states[(symbol, tf)]
+
+    def update(self, symbol: str, tf: str, bar: Dict[str, Any]) -> Dict[str, Any]:
+        """Advance ``symbol``/``tf`` by the completed ``bar`` mapping."""
+
+        return self.state(symbol, tf).update(
+            float(bar["high"]),
+            float(bar["low"]),
+            float(bar["close"]),
+            float(bar["volume"]),
+            bar.get("ts"),
+        )
+
+
+def compare_with_batch(df: Any) -> Dict[str, float]:
+    """Return the max absolute difference per column versus the batch helpers.
+
+    ``df`` must be a real :class:`pandas.DataFrame` with OHLCV columns.  Rows
+    where either side is NaN are ignored.
+    """
+
+    import numpy as np
+
+    from .indicators import bbands, macd, obv, rsi, sma, supertrend
+
+    state = IndicatorState(keep=len(df))
+    state.seed(df)
+    streamed = {col: np.array([row[col] for row in state.rows], dtype=float) for col in state.rows[0] if col != "ts"}
+
+    macd_line, macd_signal, macd_hist = macd(
+        df["close"], fast=settings.macd_fast, slow=settings.macd_slow, signal=settings.macd_signal
+    )
+    lband, _, hband = bbands(df["close"], window=settings.sma_exit)
+    batch = {
+        "sma20": sma(df["close"], settings.sma_exit),
+        "sma50": sma(df["close"], settings.sma_fast),
+        "sma200": sma(df["close"], settings.sma_slow),
+        "rsi": rsi(df["close"], window=settings.rsi_window),
+        "macd_line": macd_line,
+        "macd_signal": macd_signal,
+        "macd_hist": macd_hist,
+        "supertrend": supertrend(df, period=settings.supertrend_period, multiplier=settings.supertrend_mult),
+        "avg_vol": df["volume"].rolling(settings.sma_exit).mean(),
+        "obv_slope": obv(df["close"], df["volume"]).diff(),
+        "bb_pos": (df["close"] - lband) / (hband - lband),
+    }
+    diffs: Dict[str, float] = {}
+    for col, expected in batch.items():
+        delta = np.abs(streamed[col] - np.asarray(expected, dtype=float))
+        delta = delta[~np.isnan(delta)]
+        diffs[col] = float(delta.max()) if delta.size else 0.0
+    return diffs
@@ -10,7 +10,7 @@ orders and query account equity.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Dict
 
 from loguru import logger
 from tenacity import retry, stop_after_attempt, wait_fixed
@@ -41,14 +41,19 @@ class Broker:
     def get_balance(self) -> float:  # pragma: no cover - simple
         raise NotImplementedError
 
+    def get_positions(self) -> Dict[str, int]:  # pragma: no cover - simple
+        """Return the shares held per symbol."""
+
+        raise NotImplementedError
+
 
 class IBKRBroker(Broker):
     """Tiny wrapper around ``ib_insync.IB``.
 
     The broker lazily connects on instantiation using credentials from
     :mod:`config.settings`.  Only the functionality required by the bot is
-    implemented: placing simple market/limit orders and fetching the account's
-    net liquidation value for position sizing.
+    implemented: placing simple market/limit orders, fetching the account's
+    net liquidation value for position sizing and its positions.
     """
 
     ib: IB = field(default_factory=IB)  # type: ignore[misc]
@@ -89,3 +94,12 @@ class IBKRBroker(Broker):
                 except ValueError:
                     continue
         return 0.0
+
+    def get_positions(self) -> Dict[str, int]:  # pragma: no cover - network
+        held: Dict[str, int] = {}
+        for pos in self.ib.positions():
+            if getattr(self, "account_id", None) and pos.account != self.account_id:
+                continue
+            held[pos.contract.symbol] = held.get(pos.contract.symbol, 0) + int(pos.position)
+        logger.debug("Retrieved positions", count=len(held))
+        return {symbol: qty for symbol, qty in held.items() if qty}
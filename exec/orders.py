@@ -17,6 +17,24 @@ class BracketOrder:
     pt2: Order
 
 
+@dataclass(frozen=True)
+class BracketParams:
+    """Stop and profit targets of a bracket as fractions of the entry price."""
+
+    stop_pct: float = 0.05
+    pt1_pct: float = 0.02
+    pt2_pct: float = 0.05
+
+    def prices(self, entry_price):
+        """Return ``(stop, pt1, pt2)`` for a scalar or array entry price."""
+
+        return entry_price * (1 - self.stop_pct), entry_price * (1 + self.pt1_pct), entry_price * (1 + self.pt2_pct)
+
+
+# Bracket placed by :class:`main.TradingBot`; half the quantity exits at ``pt1``.
+BRACKET = BracketParams()
+
+
 def build_bracket(symbol: str, qty: int, entry_price: float, stop_price: float, pt1: float, pt2: float) -> BracketOrder:
     """Create a simple bracket order."""
     entry = Order(symbol=symbol, qty=qty, side="BUY", price=entry_price)
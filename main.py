@@ -8,58 +8,399 @@ tracked by :class:`TradingBot`.
 
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
+from pathlib import Path
 from time import sleep
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Any, Callable, Dict, Sequence, Tuple
+from zoneinfo import ZoneInfo
 
 from loguru import logger
 
 from scheduler import Scheduler
 from universe import load_universe
 from data.market_data import MarketData, IBKRMarketData
+from data.async_market_data import AsyncIBKRMarketData, run_async
+from data.live import LiveMarketData
+from data.pacing import Priority, prioritised
 from exec.broker import Broker, Order, IBKRBroker
-from exec.orders import build_bracket
+from exec.orders import BRACKET, build_bracket
 from exec.state import PositionState, next_state
-from scoring.entry_scoring import compute_entry_score
-from scoring.exit_scoring import compute_exit_score
+from scoring.batch import last_rows
+from scoring.entry_scoring import (
+    COLUMNS as ENTRY_COLUMNS,
+    DEFAULTS as ENTRY_DEFAULTS,
+    ENTRY_THRESHOLD,
+    compute_entry_score,
+    compute_entry_scores,
+)
+from scoring.exit_scoring import (
+    COLUMNS as EXIT_COLUMNS,
+    DEFAULTS as EXIT_DEFAULTS,
+    EXIT_THRESHOLD,
+    compute_exit_score,
+    compute_exit_scores,
+)
+from scoring.context import MarketContext, MarketSnapshot
+from scoring.earnings import EarningsCalendar
+from scoring.sentiment import FileNewsProvider, NewsCache
+from storage.snapshot import load_snapshot, save_snapshot, snapshot_path
 from config import settings
 
 
+def _now() -> datetime:
+    return datetime.now(ZoneInfo(settings.timezone))
+
+
+# Technical score below which even positive news cannot lift a symbol to an entry.
+NEWS_PRE_THRESHOLD = ENTRY_THRESHOLD - settings.news_sent_pos_bonus
+# ``(tf, lookback)`` bars read by entry and exit scoring.
+ENTRY_BARS = (("D", 2), ("4H", 2))
+EXIT_BARS = (("4H", 2), ("D", 1), ("1H", 2))
+# Position states in which the bot believes it holds shares.
+HOLDING = {PositionState.FILLED, PositionState.MANAGED, PositionState.SCALE_OUT}
+
+
 @dataclass
 class TradingBot:
-    """Coordinator that pulls data, evaluates signals and places orders."""
+    """Coordinator that pulls data, evaluates signals and places orders.
+
+    Entry and exit scores are memoised by the timestamp of the last closed
+    bar of every timeframe they read (``last_closed_bar`` of the market data
+    provider, which needs no download) plus, for entries, the regime and
+    sentiment.  A symbol whose inputs did not change and whose score stayed
+    below the threshold is neither fetched nor scored again;
+    :attr:`memo_hits` and :attr:`memo_misses` count how often.
+
+    With a :attr:`news` cache, :meth:`screen_news` looks up the news
+    sentiment of the cycle's entry candidates in one batch and entry scoring
+    then reads it from memory.
+
+    With an :attr:`earnings` calendar and ``EARNINGS_POLICY=BLOCK_NEW``,
+    symbols inside their earnings blackout are not entered.
+    """
 
     market_data: MarketData
     broker: Broker
     regime: str = "TR"
+    context: MarketContext | None = None
+    news: NewsCache | None = None
+    earnings: EarningsCalendar | None = None
     positions: Dict[str, PositionState] = field(default_factory=dict)
     position_sizes: Dict[str, int] = field(default_factory=dict)
+    scores: Dict[str, Dict[str, float]] = field(default_factory=dict)
     portfolio_pct: float = settings.portfolio_pct
+    clock: Callable[[], datetime] = _now
+    memo_hits: int = 0
+    memo_misses: int = 0
+    _score_keys: Dict[Tuple[str, str], Tuple[Any, ...]] = field(default_factory=dict, init=False, repr=False)
+    _exit_scores: Dict[str, float] = field(default_factory=dict, init=False, repr=False)
+
+    def checkpoint(self) -> Dict[str, Any]:
+        """Return the per-symbol state worth keeping across a restart."""
+
+        return {
+            "positions": {symbol: state.name for symbol, state in self.positions.items()},
+            "position_sizes": dict(self.position_sizes),
+            "scores": {symbol: dict(scores) for symbol, scores in self.scores.items()},
+            "score_keys": dict(self._score_keys),
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Load state produced by :meth:`checkpoint`."""
+
+        self.positions.update(
+            {symbol: PositionState[name] for symbol, name in state.get("positions", {}).items()}
+        )
+        self.position_sizes.update(state.get("position_sizes", {}))
+        for symbol, scores in state.get("scores", {}).items():
+            self.scores.setdefault(symbol, {}).update(scores)
+        self._score_keys.update(state.get("score_keys", {}))
+
+    def reconcile_positions(self) -> None:
+        """Align the position book with the broker's actual holdings.
+
+        A restored book may be out of date: symbols the broker no longer
+        holds are forgotten so they may be entered again, and holdings the
+        book does not know about are managed from now on with the broker's
+        share count.
+        """
+
+        held = self.broker.get_positions()
+        for symbol in list(self.positions):
+            if self.positions[symbol] in HOLDING and not held.get(symbol):
+                logger.info("Dropping position the broker does not hold", symbol=symbol)
+                self.positions.pop(symbol)
+                self.position_sizes.pop(symbol, None)
+        for symbol, qty in held.items():
+            if self.positions.get(symbol) not in HOLDING:
+                logger.info("Adopting broker position", symbol=symbol, qty=qty)
+                self.positions[symbol] = PositionState.MANAGED
+            self.position_sizes[symbol] = qty
+
+    def begin_cycle(self, symbols: Sequence[str] = ()) -> MarketSnapshot:
+        """Reset cycle-scoped caches before the universe is evaluated.
+
+        Providers with a ``prefetch`` method download the bars of ``symbols``
+        in bulk first, those of open positions ahead of and at a higher
+        pacing priority than the entry candidates.  Symbols whose memoised
+        score is still current are skipped.  With ``PANEL_MODE`` enabled the
+        daily and 4H indicators are then computed up front in a single
+        vectorised pass.
 
-    def run_cycle(self, symbol: str) -> None:
+        Returns the market snapshot to pass to :meth:`run_cycle` for every
+        symbol of the cycle.
+        """
+
+        logger.debug("Score memo stats", hits=self.memo_hits, misses=self.memo_misses)
+        self.memo_hits = self.memo_misses = 0
+        self._exit_scores.clear()
+        begin = getattr(self.market_data, "begin_cycle", None)
+        if begin is not None:
+            begin()
+        market = self.snapshot()
+        prefetch = getattr(self.market_data, "prefetch", None)
+        pending = self._pending(symbols, market)
+        if prefetch is not None and pending:
+            # Exit bars first so open positions never queue behind entry downloads.
+            managed = self._managed(pending)
+            entries = [s for s in pending if s not in managed]
+            for batch, priority in ((managed, Priority.EXIT), (entries, Priority.ENTRY)):
+                with prioritised(priority):
+                    prefetch([req for symbol in batch for req in self.bar_requests(symbol)])
+        self._load_panels(pending)
+        return market
+
+    def snapshot(self) -> MarketSnapshot:
+        """Market wide inputs, from :attr:`context` when one is configured."""
+
+        if self.context is None:
+            return MarketSnapshot(regime=self.regime, fg=50)
+        with prioritised(Priority.REFERENCE):
+            snapshot = self.context.snapshot()
+        logger.debug("Market snapshot", regime=snapshot.regime, vix=snapshot.vix, fg=snapshot.fg)
+        return snapshot
+
+    def bar_requests(self, symbol: str) -> list[tuple[str, str, int]]:
+        """Return the ``(symbol, tf, lookback)`` bars :meth:`run_cycle` will read."""
+
+        state = self.positions.get(symbol, PositionState.INIT)
+        if state is PositionState.INIT:
+            if self._blocked(symbol):
+                return []
+            return [(symbol, tf, lookback) for tf, lookback in ENTRY_BARS]
+        if state in {PositionState.FILLED, PositionState.MANAGED}:
+            return [(symbol, tf, lookback) for tf, lookback in EXIT_BARS]
+        return []
+
+    async def run_cycle_async(self, symbols: Sequence[str], market: MarketSnapshot | None = None) -> None:
+        """Evaluate ``symbols`` after fetching their bars concurrently.
+
+        Providers exposing ``prefetch_async`` download every bar the cycle
+        needs at once; the per-symbol evaluation then runs from memory.
+        """
+
+        market = market or self.snapshot()
+        pending = self._pending(symbols, market)
+        prefetch = getattr(self.market_data, "prefetch_async", None)
+        if prefetch is not None:
+            managed = self._managed(pending)
+
+            async def fetch(batch: Sequence[str], priority: Priority) -> None:
+                with prioritised(priority):
+                    await prefetch([req for symbol in batch for req in self.bar_requests(symbol)])
+
+            await asyncio.gather(
+                fetch(managed, Priority.EXIT),
+                fetch([s for s in pending if s not in managed], Priority.ENTRY),
+            )
+        self._load_panels(pending)
+        await self.screen_news(symbols, market)
+        self.score_exits(symbols)
+        for symbol in symbols:
+            try:
+                self.run_cycle(symbol, market)
+            except Exception:
+                logger.opt(exception=True).error("Error processing symbol", symbol=symbol)
+
+    def run_cycle(self, symbol: str, market: MarketSnapshot | None = None) -> None:
         """Run one evaluation cycle for ``symbol``.
 
         The method checks whether a new position should be opened or an
         existing one should be closed based on scoring modules.  It
-        maintains a simple state machine per symbol.
+        maintains a simple state machine per symbol.  ``market`` is the
+        snapshot returned by :meth:`begin_cycle`; without it one is taken
+        for this call alone.
         """
 
         state = self.positions.get(symbol, PositionState.INIT)
         logger.debug("Run cycle", symbol=symbol, state=state)
         if state is PositionState.INIT:
-            self._attempt_entry(symbol)
+            self._attempt_entry(symbol, market or self.snapshot())
         elif state in {PositionState.FILLED, PositionState.MANAGED}:
-            self._check_exit(symbol)
+            with prioritised(Priority.EXIT):
+                self._check_exit(symbol)
+
+    async def screen_news(self, symbols: Sequence[str], market: MarketSnapshot) -> list[str]:
+        """Fetch the news sentiment of the entry candidates among ``symbols``.
+
+        The technical entry score of every symbol awaiting an entry is
+        computed in one vectorised pass; those reaching
+        :data:`NEWS_PRE_THRESHOLD` are looked up in a single batch.  Returns
+        the candidates.
+        """
+
+        if self.news is None:
+            return []
+        daily, h4, pending = [], [], []
+        for symbol in symbols:
+            if self.positions.get(symbol, PositionState.INIT) is not PositionState.INIT:
+                continue
+            if self._blocked(symbol):
+                continue
+            try:
+                if self._unchanged(symbol, "entry", market) is not None:
+                    continue
+                d = self.market_data.get_bars(symbol, "D", 2, columns=ENTRY_COLUMNS["D"])
+                h = self.market_data.get_bars(symbol, "4H", 2, columns=ENTRY_COLUMNS["4H"])
+            except Exception:
+                logger.opt(exception=True).error("Error screening symbol", symbol=symbol)
+                continue
+            daily.append(d)
+            h4.append(h)
+            pending.append(symbol)
+        if not pending:
+            return []
+        scores, _ = compute_entry_scores(
+            last_rows(daily, ("close",) + ENTRY_COLUMNS["D"], ENTRY_DEFAULTS),
+            last_rows(h4, ENTRY_COLUMNS["4H"], ENTRY_DEFAULTS),
+            market.regime,
+            market.sentiment,
+        )
+        candidates = [symbol for symbol, score in zip(pending, scores) if score >= NEWS_PRE_THRESHOLD]
+        logger.debug("News screening", screened=len(pending), candidates=len(candidates))
+        if candidates:
+            await self.news.refresh(candidates)
+        return candidates
+
+    def score_exits(self, symbols: Sequence[str]) -> Dict[str, float]:
+        """Compute the exit score of the open positions among ``symbols``.
+
+        Every position whose memoised score is not current is scored in one
+        vectorised pass; :meth:`run_cycle` then reads the result instead of
+        scoring the symbol on its own.  Returns the scores by symbol.
+        """
+
+        h4, d1, h1, pending = [], [], [], []
+        for symbol in self._managed(symbols):
+            try:
+                if self._unchanged(symbol, "exit") is not None:
+                    continue
+                h = self.market_data.get_bars(symbol, "4H", 2, columns=EXIT_COLUMNS["4H"])
+                d = self.market_data.get_bars(symbol, "D", 1, columns=EXIT_COLUMNS["D"])
+                h_1 = self.market_data.get_bars(symbol, "1H", 2, columns=EXIT_COLUMNS["1H"])
+            except Exception:
+                logger.opt(exception=True).error("Error scoring exit", symbol=symbol)
+                continue
+            h4.append(h)
+            d1.append(d)
+            h1.append(h_1)
+            pending.append(symbol)
+        if not pending:
+            return {}
+        comps = compute_exit_scores(
+            last_rows(h4, ("close",) + EXIT_COLUMNS["4H"], EXIT_DEFAULTS),
+            last_rows(d1, ("close", "volume") + EXIT_COLUMNS["D"], EXIT_DEFAULTS),
+            last_rows(h1, EXIT_COLUMNS["1H"], EXIT_DEFAULTS),
+        )
+        scores = {symbol: float(total) for symbol, total in zip(pending, comps["total"])}
+        logger.debug("Exit scoring", scored=len(pending), exits=sum(v >= EXIT_THRESHOLD for v in scores.values()))
+        self._exit_scores.update(scores)
+        return scores
 
     # -- internal helpers -------------------------------------------------
 
-    def _attempt_entry(self, symbol: str) -> None:
-        daily = self.market_data.get_bars(symbol, "D", 2)
-        h4 = self.market_data.get_bars(symbol, "4H", 2)
-        score, _ = compute_entry_score(daily, h4, self.regime, {"fg": 50})
+    def _managed(self, symbols: Sequence[str]) -> list[str]:
+        """The ``symbols`` :meth:`run_cycle` checks for an exit."""
+
+        return [s for s in symbols if self.positions.get(s) in {PositionState.FILLED, PositionState.MANAGED}]
+
+    def _pending(self, symbols: Sequence[str], market: MarketSnapshot) -> list[str]:
+        """The ``symbols`` whose bars :meth:`run_cycle` will actually read."""
+
+        pending = []
+        for symbol in symbols:
+            state = self.positions.get(symbol, PositionState.INIT)
+            kind = "entry" if state is PositionState.INIT else "exit"
+            if self._unchanged(symbol, kind, market) is None:
+                pending.append(symbol)
+        return pending
+
+    def _blocked(self, symbol: str) -> bool:
+        """Whether the earnings policy forbids entering ``symbol`` now."""
+
+        if self.earnings is None:
+            return False
+        return self.earnings.blocks_entry(symbol, self.clock())
+
+    def _sentiment(self, symbol: str, market: MarketSnapshot) -> Dict[str, Any]:
+        """Market sentiment plus the cached news sentiment of ``symbol``."""
+
+        news = self.news.get(symbol) if self.news is not None else None
+        return market.sentiment if news is None else {**market.sentiment, "news": news}
+
+    def _load_panels(self, symbols: Sequence[str]) -> None:
+        load_panel = getattr(self.market_data, "load_panel", None)
+        if settings.panel_mode and load_panel is not None and symbols:
+            for tf in ("D", "4H"):
+                load_panel(symbols, tf, 2)
+
+    def _score_key(self, symbol: str, kind: str, market: MarketSnapshot | None = None) -> Tuple[Any, ...] | None:
+        """Return what the ``kind`` score of ``symbol`` depends on, if known."""
+
+        last_closed_bar = getattr(self.market_data, "last_closed_bar", None)
+        if last_closed_bar is None:
+            return None
+        if kind == "entry":
+            bars = tuple(last_closed_bar(symbol, tf) for tf, _ in ENTRY_BARS)
+            return bars + (market.regime, tuple(sorted(self._sentiment(symbol, market).items())))
+        return tuple(last_closed_bar(symbol, tf) for tf, _ in EXIT_BARS)
+
+    def _unchanged(self, symbol: str, kind: str, market: MarketSnapshot | None = None) -> float | None:
+        """Return the memoised ``kind`` score when it is below threshold and current."""
+
+        score = self.scores.get(symbol, {}).get(kind)
+        threshold = ENTRY_THRESHOLD if kind == "entry" else EXIT_THRESHOLD
+        if score is None or score >= threshold or (symbol, kind) not in self._score_keys:
+            return None
+        key = self._score_key(symbol, kind, market)
+        return score if key is not None and self._score_keys[(symbol, kind)] == key else None
+
+    def _remember(self, symbol: str, kind: str, score: float, key: Tuple[Any, ...] | None) -> None:
+        self.scores.setdefault(symbol, {})[kind] = score
+        if key is None:
+            self._score_keys.pop((symbol, kind), None)
+        else:
+            self._score_keys[(symbol, kind)] = key
+
+    def _attempt_entry(self, symbol: str, market: MarketSnapshot) -> None:
+        if self._blocked(symbol):
+            logger.debug("Entry blocked by earnings blackout", symbol=symbol)
+            return
+        score = self._unchanged(symbol, "entry", market)
+        if score is not None:
+            self.memo_hits += 1
+            logger.debug("Entry inputs unchanged", symbol=symbol, score=score)
+            return
+        self.memo_misses += 1
+        key = self._score_key(symbol, "entry", market)
+        daily = self.market_data.get_bars(symbol, "D", 2, columns=ENTRY_COLUMNS["D"])
+        h4 = self.market_data.get_bars(symbol, "4H", 2, columns=ENTRY_COLUMNS["4H"])
+        score, _ = compute_entry_score(daily, h4, market.regime, self._sentiment(symbol, market))
         logger.debug("Entry score computed", symbol=symbol, score=score)
-        if score < 90:
+        self._remember(symbol, "entry", score, key)
+        if score < ENTRY_THRESHOLD:
             logger.debug("Entry score below threshold", symbol=symbol)
             return
         if symbol in self.positions and self.positions[symbol] is not PositionState.EXITED:
@@ -75,14 +416,8 @@ class TradingBot:
         if qty <= 0:
             logger.debug("Quantity not positive", symbol=symbol)
             return
-        bracket = build_bracket(
-            symbol,
-            qty=qty,
-            entry_price=price,
-            stop_price=price * 0.95,
-            pt1=price * 1.02,
-            pt2=price * 1.05,
-        )
+        stop, pt1, pt2 = BRACKET.prices(price)
+        bracket = build_bracket(symbol, qty=qty, entry_price=price, stop_price=stop, pt1=pt1, pt2=pt2)
         logger.debug(
             "Placing bracket orders",
             symbol=symbol,
@@ -97,15 +432,25 @@ class TradingBot:
         self.position_sizes[symbol] = qty
 
     def _check_exit(self, symbol: str) -> None:
-        h4 = self.market_data.get_bars(symbol, "4H", 2)
-        d1 = self.market_data.get_bars(symbol, "D", 1)
-        h1 = self.market_data.get_bars(symbol, "1H", 2)
-        comp = compute_exit_score(h4, d1, h1)
-        logger.debug("Exit score computed", symbol=symbol, score=comp.total)
-        if comp.total < 15:
+        score = self._unchanged(symbol, "exit")
+        if score is not None:
+            self.memo_hits += 1
+            logger.debug("Exit inputs unchanged", symbol=symbol, score=score)
+            return
+        self.memo_misses += 1
+        key = self._score_key(symbol, "exit")
+        score = self._exit_scores.pop(symbol, None)
+        if score is None:
+            h4 = self.market_data.get_bars(symbol, "4H", 2, columns=EXIT_COLUMNS["4H"])
+            d1 = self.market_data.get_bars(symbol, "D", 1, columns=EXIT_COLUMNS["D"])
+            h1 = self.market_data.get_bars(symbol, "1H", 2, columns=EXIT_COLUMNS["1H"])
+            score = compute_exit_score(h4, d1, h1).total
+        logger.debug("Exit score computed", symbol=symbol, score=score)
+        self._remember(symbol, "exit", score, key)
+        if score < EXIT_THRESHOLD:
             logger.debug("Exit score below threshold", symbol=symbol)
             return
-        price = float(d1["close"].iloc[-1])
+        price = float(self.market_data.get_bars(symbol, "D", 1, columns=EXIT_COLUMNS["D"])["close"].iloc[-1])
         qty = self.position_sizes.get(symbol, 0)
         logger.debug("Exit sizing", symbol=symbol, price=price, qty=qty)
         if qty <= 0:
@@ -123,22 +468,62 @@ def main() -> None:  # pragma: no cover - runtime entry
     universe = load_universe()
     logger.info("Loaded universe", count=len(universe))
 
-    market_data = IBKRMarketData()
+    if settings.live_bars:
+        market_data = LiveMarketData()
+    else:
+        market_data = AsyncIBKRMarketData() if settings.async_fetch else IBKRMarketData()
     broker = IBKRBroker()
-    bot = TradingBot(market_data, broker)
+    news = NewsCache(FileNewsProvider(Path(settings.news_file))) if settings.news_file else None
+    earnings = EarningsCalendar.load(settings.earnings_file) if settings.earnings_file else None
+    bot = TradingBot(market_data, broker, context=MarketContext(market_data), news=news, earnings=earnings)
+    warm_start = snapshot_path()
+    if warm_start is not None:
+        load_snapshot(bot, warm_start)
+    # Never trade on a book that disagrees with the broker, restored or not.
+    bot.reconcile_positions()
+    if settings.live_bars:
+        # Bars come from the bar cache; restored indicators only replay the gap.
+        market_data.start(universe)
+
+    def cycle(symbols: Sequence[str]) -> None:
+        if settings.async_fetch:
+            market = bot.begin_cycle()
+            run_async(bot.run_cycle_async(symbols, market))
+        else:
+            market = bot.begin_cycle(symbols)
+            run_async(bot.screen_news(symbols, market))
+            bot.score_exits(symbols)
+            for symbol in symbols:
+                try:
+                    bot.run_cycle(symbol, market)
+                except Exception:
+                    logger.opt(exception=True).error("Error processing symbol", symbol=symbol)
+        if warm_start is not None:
+            try:
+                save_snapshot(bot, warm_start)
+            except Exception:
+                logger.opt(exception=True).error("Saving warm-start snapshot failed")
 
     while True:
         now = datetime.now(tz=scheduler.tz)
         logger.debug("Main loop tick", time=str(now))
+        if settings.live_bars:
+            market_data.flush(now)
+        # Session 4H bars close at 13:00 and 16:00, off the primary boundaries.
+        closed = market_data.pop_4h_closes() if settings.live_bars else []
         if scheduler.should_run_primary(now):
             logger.info("Running cycle", time=str(now))
-            for symbol in universe:
-                try:
-                    bot.run_cycle(symbol)
-                except Exception:
-                    logger.opt(exception=True).error("Error processing symbol", symbol=symbol)
+            cycle(universe)
+        elif closed:
+            logger.info("Running cycle for closed 4H bars", time=str(now), symbols=len(closed))
+            cycle([symbol for symbol in universe if symbol in closed])
         else:
             logger.debug("Primary cycle skipped", time=str(now))
+        if settings.live_bars:
+            # Bars stream in while we wait; tick often so a 4H close is acted
+            # on within seconds.
+            market_data.ib.sleep(settings.live_tick_sec)
+            continue
         next_run = scheduler.next_run(now)
         logger.debug("Sleeping", until=str(next_run))
         sleep((next_run - now).total_seconds())
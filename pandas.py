@@ -174,6 +174,9 @@ if "DataFrame" not in globals():
                 return self
             return DataFrame(new_data)
 
+        def copy(self) -> "DataFrame":
+            return DataFrame(self._data, columns=self.columns)
+
         def tail(self, n: int) -> "DataFrame":
             if n <= 0:
                 return DataFrame({col: [] for col in self.columns}, columns=self.columns)
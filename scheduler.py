@@ -36,16 +36,18 @@ class Scheduler:
     def should_run_primary(self, now: datetime) -> bool:
         """Return True if the primary 4H tasks should run at ``now``.
 
-        The method ensures that each 4H boundary triggers at most once.
+        The method ensures that each 4H boundary triggers at most once, even
+        when the caller ticks several times within the boundary minute.
         """
 
         if not self.is_primary_time(now):
             logger.debug("Primary time check failed", time=str(now))
             return False
-        if self.last_primary and now <= self.last_primary:
+        boundary = now.replace(second=0, microsecond=0)
+        if self.last_primary and boundary <= self.last_primary:
             logger.debug("Already ran for", time=str(now))
             return False
-        self.last_primary = now
+        self.last_primary = boundary
         logger.debug("Primary task scheduled", time=str(now))
         return True
 
@@ -0,0 +1,54 @@
+"""Column tables feeding the batch scoring functions.
+
+The batch scorers read the latest and previous bar of every symbol from a
+*table*: a mapping of column name to an array of shape ``(symbols, 2)``
+holding the previous bar in column ``0`` and the latest in column ``1``.
+The last two bars of a :class:`~data.panel.Panel` already have that layout
+(``panel.data[name][:, -2:]``); :func:`last_rows` builds one from per-symbol
+frames.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def last_rows(
+    frames: Sequence[pd.DataFrame], columns: Iterable[str], defaults: Mapping[str, Any] | None = None
+) -> Dict[str, np.ndarray]:
+    """Return the table of the last two rows of every frame.
+
+    A frame with a single row uses it as both bars.  Columns missing from a
+    frame take their value from ``defaults`` (``NaN`` when absent).
+    """
+
+    defaults = defaults or {}
+    table: Dict[str, np.ndarray] = {}
+    for name in columns:
+        out = np.full((len(frames), 2), np.nan)
+        for i, df in enumerate(frames):
+            if name in df.columns and len(df):
+                values = np.asarray(df[name], dtype=np.float64)[-2:]
+                out[i] = values[0], values[-1]
+            else:
+                out[i] = defaults.get(name, np.nan)
+        table[name] = out
+    return table
+
+
+def column(table: Mapping[str, np.ndarray], name: str, default: float, n: int) -> np.ndarray:
+    """Return ``table[name]`` or a ``(n, 2)`` array of ``default``."""
+
+    values = table.get(name)
+    if values is None:
+        return np.full((n, 2), float(default))
+    return np.asarray(values, dtype=np.float64)
+
+
+def rows(table: Mapping[str, np.ndarray]) -> int:
+    """Number of symbols in ``table``."""
+
+    return len(next(iter(table.values()))) if table else 0
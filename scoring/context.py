@@ -0,0 +1,147 @@
+"""Market wide inputs shared by every symbol of a cycle.
+
+The reference symbol's bars, the VIX, the Fear & Greed index and the regime
+derived from them are the same for the whole universe.  :class:`MarketContext`
+fetches each of them at most once per TTL and hands the scoring code an
+immutable :class:`MarketSnapshot` at the start of every cycle, so global
+inputs cost O(1) per cycle instead of O(universe).
+
+Market data items (reference bars and VIX) are refreshed synchronously at
+the snapshot taken at the start of a cycle: the provider's memos are not
+thread safe and an ``ib_insync`` client must stay on the thread that owns
+the event loop.  Once the Fear & Greed index has a value, going stale does
+not block the cycle; the stale value keeps being served while a background
+thread, running in a copy of the caller's context, refreshes it.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+
+from loguru import logger
+from config import settings
+
+from .regime import COLUMNS as REGIME_COLUMNS, detect_regime
+from .sentiment import get_fear_greed
+
+# Rows of reference bars needed by :func:`detect_regime`'s SMA50 slope.
+REFERENCE_LOOKBACK = 20
+DEFAULT_REGIME = "TR"
+
+
+@dataclass(frozen=True, eq=False)
+class MarketSnapshot:
+    """Market inputs as of the start of a cycle."""
+
+    reference_bars: Optional[pd.DataFrame] = None
+    vix: Optional[float] = None
+    fg: Optional[int] = None
+    regime: str = DEFAULT_REGIME
+
+    @property
+    def sentiment(self) -> Dict[str, Any]:
+        """Market part of the ``sentiment`` argument of the entry score."""
+
+        return {"fg": self.fg}
+
+
+@dataclass
+class _Item:
+    loader: Callable[[], Any]
+    ttl: float
+    background: bool
+    value: Any = None
+    fetched: Optional[float] = None
+    refreshing: bool = False
+
+
+@dataclass
+class MarketContext:
+    """TTL cache of the market wide inputs.
+
+    Attributes:
+        market_data: Provider of the reference bars and the VIX.
+        fear_greed: Callable returning the Fear & Greed index.
+    """
+
+    market_data: Any
+    fear_greed: Callable[[], int] = get_fear_greed
+    clock: Callable[[], float] = time.monotonic
+    _items: Dict[str, _Item] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._items = {
+            "reference_bars": _Item(self._load_reference_bars, settings.context_bars_ttl_min * 60.0, False),
+            "vix": _Item(self.market_data.get_vix, settings.context_vix_ttl_min * 60.0, False),
+            "fg": _Item(self.fear_greed, settings.context_fg_ttl_min * 60.0, True),
+        }
+
+    def snapshot(self) -> MarketSnapshot:
+        """Return the current inputs, loading missing or stale ones first."""
+
+        for name in self._items:
+            self._ensure(name)
+        bars = self._items["reference_bars"].value
+        vix = self._items["vix"].value
+        return MarketSnapshot(bars, vix, self._items["fg"].value, self._regime(bars, vix))
+
+    def invalidate(self, name: str | None = None) -> None:
+        """Force ``name`` (or every item) to be reloaded on the next snapshot."""
+
+        with self._lock:
+            for key, item in self._items.items():
+                if name is None or key == name:
+                    item.fetched = None
+
+    # -- internal helpers -------------------------------------------------
+    def _ensure(self, name: str) -> None:
+        item = self._items[name]
+        now = self.clock()
+        with self._lock:
+            if item.fetched is not None and now - item.fetched < item.ttl:
+                return
+            if item.refreshing:
+                return
+            stale = item.fetched is not None
+            item.refreshing = stale and item.background
+        if item.refreshing:
+            logger.debug("Refreshing market context in background", item=name)
+            context = contextvars.copy_context()
+            threading.Thread(target=context.run, args=(self._refresh, name), daemon=True).start()
+        else:
+            self._refresh(name)
+
+    def _refresh(self, name: str) -> None:
+        item = self._items[name]
+        try:
+            value = item.loader()
+        except Exception:
+            logger.opt(exception=True).error("Market context refresh failed", item=name)
+            value = None
+        with self._lock:
+            if value is not None:
+                item.value = value
+                item.fetched = self.clock()
+            item.refreshing = False
+        logger.debug("Market context refreshed", item=name, ok=value is not None)
+
+    def _load_reference_bars(self) -> pd.DataFrame:
+        symbol = self.market_data.get_reference_symbol()
+        return self.market_data.get_bars(symbol, "4H", REFERENCE_LOOKBACK, columns=REGIME_COLUMNS)
+
+    @staticmethod
+    def _regime(bars: Optional[pd.DataFrame], vix: Optional[float]) -> str:
+        if bars is None or vix is None or not len(bars):
+            return DEFAULT_REGIME
+        try:
+            return detect_regime(bars, vix)
+        except Exception:
+            logger.opt(exception=True).error("Regime detection failed")
+            return DEFAULT_REGIME
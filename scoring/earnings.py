@@ -1,9 +1,35 @@
-"""Earnings schedule stubs."""
+"""Earnings schedule and blackout checks.
+
+:class:`EarningsCalendar` bulk-loads a table of ``(symbol, report date)``
+rows once - from a CSV or Parquet file or the ``earnings_calendar`` database
+table - and keeps every symbol's report dates sorted.  Whether a symbol is
+inside its blackout window (``EARNINGS_BLACKOUT_BEFORE_D`` calendar days
+before a report through ``EARNINGS_BLACKOUT_AFTER_D`` days after it) is then
+a bisect lookup, and :meth:`EarningsCalendar.blackout` answers it for a
+whole universe with a single ``searchsorted``.
+"""
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Protocol
+import csv
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Protocol, Sequence, Tuple
+
+import numpy as np
+
+from loguru import logger
+from config import settings
+
+_EPOCH = date(1970, 1, 1)
+_NS_PER_DAY = 86_400 * 10**9
+# Symbols and days share one sorted int64 key: ``code << 32 | day``.
+_SHIFT = 32
+_DAY_OFFSET = 1 << 31
+
+When = date | datetime | int | np.ndarray
 
 
 class EarningsProvider(Protocol):
@@ -15,3 +41,143 @@ class StubEarningsProvider:
 
     def next_earnings(self, symbol: str) -> datetime | None:  # pragma: no cover - trivial
         return None
+
+
+def _day(value: date | datetime | str) -> int:
+    """Days since the epoch of a date, datetime or ISO date string."""
+
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - _EPOCH).days
+
+
+def _days(when: When) -> np.ndarray | int:
+    """Days since the epoch of ``when``.
+
+    Datetimes count by their own (local) date; integers and arrays are UTC
+    nanosecond timestamps such as bar labels.
+    """
+
+    if isinstance(when, (date, datetime)):
+        return _day(when)
+    return np.asarray(when, dtype=np.int64) // _NS_PER_DAY
+
+
+@dataclass
+class EarningsCalendar:
+    """Sorted earnings dates of many symbols.
+
+    Attributes:
+        before: Calendar days before a report the blackout starts.
+        after: Calendar days after a report the blackout lasts.
+    """
+
+    before: int = field(default_factory=lambda: settings.earnings_blackout_before_d)
+    after: int = field(default_factory=lambda: settings.earnings_blackout_after_d)
+    _dates: Dict[str, List[int]] = field(default_factory=dict, init=False, repr=False)
+    _codes: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _keys: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64), init=False, repr=False)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, date | datetime | str]], **kwargs) -> "EarningsCalendar":
+        """Build a calendar from ``(symbol, report date)`` pairs."""
+
+        calendar = cls(**kwargs)
+        dates: Dict[str, set] = {}
+        for symbol, when in rows:
+            dates.setdefault(symbol, set()).add(_day(when))
+        calendar._dates = {symbol: sorted(days) for symbol, days in dates.items()}
+        calendar._codes = {symbol: code for code, symbol in enumerate(calendar._dates)}
+        keys = [
+            (code << _SHIFT) | (day + _DAY_OFFSET)
+            for symbol, code in calendar._codes.items()
+            for day in calendar._dates[symbol]
+        ]
+        calendar._keys = np.asarray(keys, dtype=np.int64)
+        logger.debug("Earnings calendar loaded", symbols=len(calendar._dates), dates=len(keys))
+        return calendar
+
+    @classmethod
+    def from_csv(cls, path: Path, **kwargs) -> "EarningsCalendar":
+        """Load a CSV file with ``symbol`` and ``date`` columns."""
+
+        with Path(path).open(newline="", encoding="utf-8") as fh:
+            return cls.from_rows(((row["symbol"], row["date"]) for row in csv.DictReader(fh)), **kwargs)
+
+    @classmethod
+    def from_parquet(cls, path: Path, **kwargs) -> "EarningsCalendar":  # pragma: no cover - needs pyarrow
+        """Load a Parquet file with ``symbol`` and ``date`` columns."""
+
+        import pandas as pd
+
+        df = pd.read_parquet(path, columns=["symbol", "date"])
+        return cls.from_rows(zip(df["symbol"], pd.to_datetime(df["date"]).dt.date), **kwargs)
+
+    @classmethod
+    def from_db(cls, url: str, **kwargs) -> "EarningsCalendar":  # pragma: no cover - needs SQLAlchemy
+        """Load the ``earnings_calendar`` table of the database at ``url``."""
+
+        from sqlalchemy import create_engine, text
+
+        engine = create_engine(url, future=True)
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT symbol, report_date FROM earnings_calendar")).all()
+        return cls.from_rows(((symbol, when) for symbol, when in rows), **kwargs)
+
+    @classmethod
+    def load(cls, source: str, **kwargs) -> "EarningsCalendar":
+        """Load ``source``: a database URL or a ``.csv``/``.parquet`` path."""
+
+        if "://" in source:
+            return cls.from_db(source, **kwargs)
+        path = Path(source)
+        if path.suffix == ".parquet":
+            return cls.from_parquet(path, **kwargs)
+        return cls.from_csv(path, **kwargs)
+
+    def next_earnings(self, symbol: str, after: date | datetime | None = None) -> datetime | None:
+        """Return the first report of ``symbol`` on or after ``after`` (today)."""
+
+        dates = self._dates.get(symbol, [])
+        day = _day(after or datetime.now(timezone.utc))
+        i = bisect_left(dates, day)
+        if i == len(dates):
+            return None
+        return datetime.combine(_EPOCH + timedelta(days=dates[i]), time(0), tzinfo=timezone.utc)
+
+    def in_blackout(self, symbol: str, when: date | datetime | int) -> bool:
+        """Return whether ``when`` falls in ``symbol``'s blackout window."""
+
+        dates = self._dates.get(symbol)
+        if not dates:
+            return False
+        day = int(_days(when))
+        i = bisect_left(dates, day - self.after)
+        return i < len(dates) and dates[i] <= day + self.before
+
+    def blackout(self, symbols: Sequence[str], when: When) -> np.ndarray:
+        """Vectorised :meth:`in_blackout` for ``symbols``.
+
+        ``when`` is one time for all symbols, an array with one per symbol or
+        a ``(symbols, times)`` array; the result has the shape of the latter.
+        """
+
+        codes = np.array([self._codes.get(s, -1) for s in symbols], dtype=np.int64)
+        day = np.asarray(_days(when))
+        codes = codes.reshape(codes.shape + (1,) * max(day.ndim - 1, 0))
+        shape = np.broadcast_shapes(codes.shape, day.shape)
+        codes = np.broadcast_to(codes, shape)
+        if not len(self._keys):
+            return np.zeros(shape, dtype=bool)
+        day = np.broadcast_to(day, shape) + _DAY_OFFSET
+        base = np.maximum(codes, 0) << _SHIFT
+        i = np.searchsorted(self._keys, base | (day - self.after))
+        found = self._keys[np.minimum(i, len(self._keys) - 1)]
+        return (codes >= 0) & (i < len(self._keys)) & (found <= (base | (day + self.before)))
+
+    def blocks_entry(self, symbol: str, when: date | datetime | int) -> bool:
+        """Whether ``EARNINGS_POLICY`` forbids opening ``symbol`` at ``when``."""
+
+        return settings.earnings_policy == "BLOCK_NEW" and self.in_blackout(symbol, when)
@@ -3,12 +3,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Mapping, Tuple
 
+import numpy as np
 import pandas as pd
 
 from config import settings
 
+from .batch import column, last_rows, rows
+from .rules import Rule, RuleSet, columns, latest
+
+# Score at or above which a symbol is entered.
+ENTRY_THRESHOLD = 90
 
 @dataclass
 class EntryComponents:
@@ -20,31 +26,136 @@ class EntryComponents:
     notes: Dict[str, Any] = field(default_factory=dict)
 
 
+# Indicator columns read per timeframe, see :mod:`data.columns`.
+COLUMNS = {
+    "D": (
+        "sma50",
+        "sma200",
+        "supertrend",
+        "rsi",
+        "macd_line",
+        "macd_signal",
+        "macd_hist",
+        "avg_vol",
+        "session_vol",
+        "obv_slope",
+        "pullback",
+        "bb_pos",
+        "extended",
+        "gap_up",
+    ),
+    "4H": ("supertrend", "rsi"),
+}
+
+# Values ``compute_entry_score`` assumes for columns a frame does not have.
+DEFAULTS = {
+    "supertrend": 1,
+    "rsi": 0,
+    "macd_line": 0,
+    "macd_signal": 0,
+    "macd_hist": 0,
+    "avg_vol": 0,
+    "session_vol": 0,
+    "obv_slope": 0,
+    "pullback": False,
+    "bb_pos": 0,
+    "extended": False,
+    "gap_up": False,
+}
+
 REGIME_MULT = {
     "TR": {"trend": 1.15, "momentum": 1.10, "volume": 1.0, "setup": 0.90},
     "RG": {"trend": 0.85, "momentum": 0.95, "volume": 1.0, "setup": 1.20},
     "RO": {"trend": 0.90, "momentum": 0.85, "volume": 0.90, "setup": 0.80},
 }
 
+# Rule table behind :func:`compute_entry_score` and :func:`compute_entry_scores`.
+RULES = RuleSet(
+    [
+        Rule("close_gt_sma200", "trend", 12, "D.close > D.sma200"),
+        Rule("close_gt_sma50", "trend", 10, "D.close > D.sma50"),
+        Rule("sma50_gt_sma200", "trend", 10, "D.sma50 > D.sma200"),
+        Rule("d1_supertrend_up", "trend", 8, "D.supertrend > 0"),
+        Rule("h4_supertrend_up", "trend", 5, "H4.supertrend > 0"),
+        Rule("rsi_55_70", "momentum", 10, "55 <= D.rsi <= 70"),
+        Rule("rsi_overbought", "penalties", -5, "D.rsi > 75"),
+        Rule("macd_above_signal", "momentum", 8, "D.macd_line > D.macd_signal"),
+        Rule("macd_hist_rising", "momentum", 6, "D.macd_hist > 0 and D.macd_hist > prev(D.macd_hist)"),
+        Rule("h4_rsi_rising", "momentum", 6, "H4.rsi > 55 and H4.rsi > prev(H4.rsi)"),
+        Rule("liquid", "volume", 5, "D.avg_vol >= 1_000_000"),
+        Rule("volume_surge", "volume", 6, "D.session_vol >= 1.2 * D.avg_vol > 0"),
+        Rule("obv_rising", "volume", 4, "D.obv_slope > 0"),
+        Rule("pullback", "setup", 6, "D.pullback"),
+        Rule("upper_band_half", "setup", 4, "D.bb_pos >= 0.5"),
+        Rule("extended", "penalties", -6, "D.extended"),
+        Rule("gap_up", "penalties", -3, "D.gap_up"),
+    ],
+    multipliers=REGIME_MULT,
+    defaults=DEFAULTS,
+    default_regime="TR",
+)
+COMPONENTS = ("trend", "momentum", "volume", "setup", "penalties")
+_COMPILED = RULES.compile()
+_READS = columns(RULES)
+
+
+def _apply_sentiment(
+    score: np.ndarray, daily_rsi: np.ndarray, sentiment: Mapping[str, Any], regime: str
+) -> np.ndarray:
+    """Fear & greed and news adjustments; ``fg`` and ``news`` may be per symbol."""
 
-def _apply_sentiment(score: float, daily_rsi: float, sentiment: Dict[str, Any], regime: str) -> float:
     fg = sentiment.get("fg")
-    news = sentiment.get("news", "neutral")
+    news = np.asarray(sentiment.get("news", "neutral"))
+    blocked = np.zeros(score.shape, dtype=bool)
 
     if fg is not None:
-        if fg < settings.sentiment_fg_block:
-            return 0.0
-        if 25 <= fg <= 45:
-            score -= 5
-        if fg > 80 and daily_rsi > settings.sentiment_overheat_rsi:
-            score -= 5
-    if news == "pos":
-        score += settings.news_sent_pos_bonus
-    elif news == "neg":
-        if regime == "RO":
-            return 0.0
-        score -= settings.news_sent_neg_penalty
-    return score
+        fg = np.asarray(fg, dtype=np.float64)  # NaN marks a missing reading
+        blocked |= fg < settings.sentiment_fg_block
+        score = np.where((fg >= 25) & (fg <= 45), score - 5, score)
+        score = np.where((fg > 80) & (daily_rsi > settings.sentiment_overheat_rsi), score - 5, score)
+    score = np.where(news == "pos", score + settings.news_sent_pos_bonus, score)
+    if regime == "RO":
+        blocked |= news == "neg"
+    else:
+        score = np.where(news == "neg", score - settings.news_sent_neg_penalty, score)
+    return np.where(blocked, 0.0, score)
+
+
+def combine(
+    components: Mapping[str, np.ndarray], daily_rsi: np.ndarray, regime: str, sentiment: Mapping[str, Any]
+) -> np.ndarray:
+    """Final entry scores from regime scaled component points."""
+
+    c = components
+    score = np.minimum(100.0, c["trend"] + c["momentum"] + c["volume"] + c["setup"])
+    score = np.maximum(0.0, score + c["penalties"])
+    score = _apply_sentiment(score, daily_rsi, sentiment, regime)
+    return np.clip(score, 0.0, 100.0)
+
+
+def compute_entry_scores(
+    daily: Mapping[str, np.ndarray], h4: Mapping[str, np.ndarray], regime: str, sentiment: Mapping[str, Any]
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Compute the entry score of many symbols at once.
+
+    The points come from the compiled :data:`RULES`; :func:`compute_entry_score`
+    is this function applied to one symbol.
+
+    Args:
+        daily: Table of the previous and latest daily bars, see
+            :mod:`scoring.batch`.
+        h4: Table of the previous and latest 4H bars.
+        regime: Regime label from :func:`regime.detect_regime`.
+        sentiment: ``fg`` and ``news`` as scalars or per-symbol arrays.
+
+    Returns:
+        Tuple of final scores and a mapping of every numeric
+        :class:`EntryComponents` field to its array.
+    """
+
+    components = latest(_COMPILED.evaluate({"D": daily, "H4": h4}, regime))
+    rsi = column(daily, "rsi", DEFAULTS["rsi"], rows(daily))[:, -1]
+    return combine(components, rsi, regime, sentiment), components
 
 
 def compute_entry_score(
@@ -52,6 +163,9 @@ def compute_entry_score(
 ) -> Tuple[float, EntryComponents]:
     """Compute the final entry score.
 
+    Evaluates the compiled :data:`RULES` on the last two rows of each frame,
+    exactly like :func:`compute_entry_scores` does for a single symbol.
+
     Args:
         daily: Daily timeframe data (must contain latest and previous row).
         h4: 4H timeframe data (latest and previous row).
@@ -62,71 +176,7 @@ def compute_entry_score(
         Tuple of final score and component breakdown.
     """
 
-    comp = EntryComponents()
-    d0 = daily.iloc[-1]
-    d1 = daily.iloc[-2] if len(daily) > 1 else d0
-    h0 = h4.iloc[-1]
-    h1 = h4.iloc[-2] if len(h4) > 1 else h0
-
-    # Trend
-    if d0["close"] > d0["sma200"]:
-        comp.trend += 12
-    if d0["close"] > d0["sma50"]:
-        comp.trend += 10
-    if d0["sma50"] > d0["sma200"]:
-        comp.trend += 10
-    if d0.get("supertrend", 1) > 0:
-        comp.trend += 8
-    if h0.get("supertrend", 1) > 0:
-        comp.trend += 5
-
-    # Momentum
-    rsi = d0.get("rsi", 0)
-    if 55 <= rsi <= 70:
-        comp.momentum += 10
-    if rsi > 75:
-        comp.penalties -= 5
-    if d0.get("macd_line", 0) > d0.get("macd_signal", 0):
-        comp.momentum += 8
-    if d0.get("macd_hist", 0) > 0 and d0.get("macd_hist", 0) > d1.get("macd_hist", 0):
-        comp.momentum += 6
-    if h0.get("rsi", 0) > 55 and h0.get("rsi", 0) > h1.get("rsi", 0):
-        comp.momentum += 6
-
-    # Volume
-    avg_vol = d0.get("avg_vol", 0)
-    vol = d0.get("session_vol", 0)
-    if avg_vol >= 1_000_000:
-        comp.volume += 5
-    if vol >= 1.2 * avg_vol > 0:
-        comp.volume += 6
-    if d0.get("obv_slope", 0) > 0:
-        comp.volume += 4
-
-    # Setup / Location
-    if d0.get("pullback", False):
-        comp.setup += 6
-    if d0.get("bb_pos", 0) >= 0.5:
-        comp.setup += 4
-
-    # Penalties
-    if d0.get("extended", False):
-        comp.penalties -= 6
-    if d0.get("gap_up", False):
-        comp.penalties -= 3
-
-    # Apply regime multipliers
-    mult = REGIME_MULT.get(regime, REGIME_MULT["TR"])
-    comp.trend *= mult["trend"]
-    comp.momentum *= mult["momentum"]
-    comp.volume *= mult["volume"]
-    comp.setup *= mult["setup"]
-
-    score = comp.trend + comp.momentum + comp.volume + comp.setup
-    score = min(100.0, score)
-    score += comp.penalties
-    score = max(0.0, score)
-
-    score = _apply_sentiment(score, rsi, sentiment, regime)
-    score = max(0.0, min(100.0, score))
-    return score, comp
+    scores, components = compute_entry_scores(
+        last_rows([daily], _READS["D"], DEFAULTS), last_rows([h4], _READS["H4"], DEFAULTS), regime, sentiment
+    )
+    return float(scores[0]), EntryComponents(**{name: float(values[0]) for name, values in components.items()})
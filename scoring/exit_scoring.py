@@ -2,10 +2,41 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from typing import Mapping
 
+import numpy as np
 import pandas as pd
 
+from .batch import last_rows
+from .rules import Rule, RuleSet, columns
+
+# Score at or above which a position is closed.
+EXIT_THRESHOLD = 15
+
+# Indicator columns read per timeframe, see :mod:`data.columns`.
+COLUMNS = {
+    "4H": ("supertrend", "macd_line", "macd_signal", "sma20", "rsi", "bearish_pattern"),
+    "D": ("sma50", "avg_vol", "trendline_break"),
+    "1H": ("supertrend", "macd_line", "macd_signal"),
+}
+
+
+# Values ``compute_exit_score`` assumes for columns a frame does not have.
+DEFAULTS = {
+    "supertrend": 1,
+    "macd_line": 0,
+    "macd_signal": 0,
+    "close": 0,
+    "sma20": 0,
+    "rsi": 100,
+    "bearish_pattern": False,
+    "sma50": 0,
+    "volume": 0,
+    "avg_vol": 0,
+    "trendline_break": False,
+}
+
 
 @dataclass
 class ExitComponents:
@@ -21,52 +52,68 @@ class ExitComponents:
     total: int = 0
 
 
+# Rule table behind :func:`compute_exit_score` and :func:`compute_exit_scores`.
+RULES = RuleSet(
+    [
+        Rule("h4_supertrend_flip", "h4_supertrend_flip", 3, "H4.supertrend < 0 and prev(H4.supertrend) > 0"),
+        Rule(
+            "h4_macd_cross",
+            "h4_macd_cross",
+            2,
+            "H4.macd_line < H4.macd_signal and prev(H4.macd_line) >= prev(H4.macd_signal)",
+        ),
+        Rule("h4_close_lt_20sma", "h4_close_lt_20sma", 1, "H4.close < H4.sma20"),
+        Rule("h4_rsi_lt_50", "h4_rsi_lt_50", 1, "H4.rsi < 50 and prev(H4.rsi) >= 50"),
+        Rule("h4_bearish_pattern", "h4_bearish_pattern", 1, "H4.bearish_pattern"),
+        Rule("d1_close_lt_50sma", "d1_close_lt_50sma", 2, "D.close < D.sma50"),
+        Rule("d1_vol_spike", "d1_vol_spike", 2, "D.volume > 1.5 * D.avg_vol > 0"),
+        Rule("d1_trendline_break", "d1_trendline_break", 2, "D.trendline_break"),
+        Rule(
+            "h1_accel_confirmation",
+            "h1_accel_confirmation",
+            1,
+            "H1.supertrend < 0 and prev(H1.supertrend) > 0"
+            " and H1.macd_line < H1.macd_signal and prev(H1.macd_line) >= prev(H1.macd_signal)",
+        ),
+    ],
+    defaults=DEFAULTS,
+)
+_COMPILED = RULES.compile()
+_READS = columns(RULES)
+
+# One record per position with every :class:`ExitComponents` field.
+EXIT_DTYPE = np.dtype([(f.name, np.int64) for f in fields(ExitComponents)])
+
+
+def compute_exit_scores(
+    h4: Mapping[str, np.ndarray], d1: Mapping[str, np.ndarray], h1: Mapping[str, np.ndarray]
+) -> np.ndarray:
+    """Compute the exit score of many positions at once.
+
+    Takes tables of the previous and latest bars (see :mod:`scoring.batch`);
+    only the latest daily bar is read.  The points come from the compiled
+    :data:`RULES`.  A position whose 1H table repeats a single bar gets no 1H
+    confirmation.
+
+    Returns:
+        Structured array of :data:`EXIT_DTYPE`, one record per position.
+    """
+
+    points = _COMPILED.evaluate({"H4": h4, "D": d1, "H1": h1})
+    out = np.zeros(len(points["h4_supertrend_flip"]), dtype=EXIT_DTYPE)
+    for name, values in points.items():
+        out[name] = values[:, -1]
+    out["total"] = sum(out[name] for name in points)
+    return out
+
+
 def compute_exit_score(h4: pd.DataFrame, d1: pd.DataFrame, h1: pd.DataFrame) -> ExitComponents:
-    """Compute exit score using multi-timeframe signals."""
-
-    comp = ExitComponents()
-
-    h0 = h4.iloc[-1]
-    h1_prev = h4.iloc[-2] if len(h4) > 1 else h0
-
-    if h0.get("supertrend", 1) < 0 and h1_prev.get("supertrend", 1) > 0:
-        comp.h4_supertrend_flip = 3
-    if h0.get("macd_line", 0) < h0.get("macd_signal", 0) and h1_prev.get("macd_line", 0) >= h1_prev.get("macd_signal", 0):
-        comp.h4_macd_cross = 2
-    if h0.get("close", 0) < h0.get("sma20", 0):
-        comp.h4_close_lt_20sma = 1
-    if h0.get("rsi", 100) < 50 and h1_prev.get("rsi", 100) >= 50:
-        comp.h4_rsi_lt_50 = 1
-    if h0.get("bearish_pattern", False):
-        comp.h4_bearish_pattern = 1
-
-    d0 = d1.iloc[-1]
-    if d0.get("close", 0) < d0.get("sma50", 0):
-        comp.d1_close_lt_50sma = 2
-    if d0.get("volume", 0) > 1.5 * d0.get("avg_vol", 0) > 0:
-        comp.d1_vol_spike = 2
-    if d0.get("trendline_break", False):
-        comp.d1_trendline_break = 2
-
-    if len(h1) >= 2:
-        h1_curr = h1.iloc[-1]
-        h1_prev = h1.iloc[-2]
-        st_flip = h1_curr.get("supertrend", 1) < 0 and h1_prev.get("supertrend", 1) > 0
-        macd_cross = h1_curr.get("macd_line", 0) < h1_curr.get("macd_signal", 0) and h1_prev.get(
-            "macd_line", 0
-        ) >= h1_prev.get("macd_signal", 0)
-        if st_flip and macd_cross:
-            comp.h1_accel_confirmation = 1
-
-    comp.total = (
-        comp.h4_supertrend_flip
-        + comp.h4_macd_cross
-        + comp.h4_close_lt_20sma
-        + comp.h4_rsi_lt_50
-        + comp.h4_bearish_pattern
-        + comp.d1_close_lt_50sma
-        + comp.d1_vol_spike
-        + comp.d1_trendline_break
-        + comp.h1_accel_confirmation
-    )
-    return comp
+    """Compute exit score using multi-timeframe signals.
+
+    :func:`compute_exit_scores` applied to the last rows of one position's
+    frames, so the compiled :data:`RULES` are the only definition of a signal.
+    """
+
+    tables = {"H4": h4, "D": d1, "H1": h1}
+    out = compute_exit_scores(*(last_rows([tables[tf]], _READS[tf], DEFAULTS) for tf in ("H4", "D", "H1")))
+    return ExitComponents(**{name: int(out[name][0]) for name in EXIT_DTYPE.names})
@@ -4,11 +4,16 @@ from __future__ import annotations
 
 from typing import Literal
 
+import numpy as np
 import pandas as pd
 
 from config import settings
 
 
+# Indicator columns read from the SPY 4H bars, see :mod:`data.columns`.
+COLUMNS = ("sma50", "sma200", "adx")
+
+
 def detect_regime(spy_df_4h: pd.DataFrame, vix: float) -> Literal["TR", "RG", "RO"]:
     """Detect market regime using SPY 4H data and VIX.
 
@@ -46,3 +51,24 @@ def detect_regime(spy_df_4h: pd.DataFrame, vix: float) -> Literal["TR", "RG", "R
         return "RG"
 
     return "TR"
+
+
+def detect_regimes(
+    close: np.ndarray, sma50: np.ndarray, sma200: np.ndarray, adx: np.ndarray, vix: np.ndarray
+) -> np.ndarray:
+    """Vectorised :func:`detect_regime` over a series of 4H bars.
+
+    Element ``t`` is the regime :func:`detect_regime` returns for the bars up
+    to ``t`` and ``vix[t]``.
+    """
+
+    close, sma50, sma200, adx, vix = (np.asarray(x, dtype=np.float64) for x in (close, sma50, sma200, adx, vix))
+    risk_off = (close < sma200) | (vix >= settings.regime_vix_ro)
+    trending = (close > sma50) & (sma50 > sma200) & (adx >= settings.adx_trend) & (vix < settings.regime_vix_tr)
+    earlier = np.full(sma50.shape, np.nan)
+    earlier[19:] = sma50[:-19]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.abs(sma50 - earlier) / (20 * earlier)
+    slope[:19] = 1.0
+    ranging = (slope < 0.0005) & (adx < settings.adx_trend) & (vix >= 18) & (vix < settings.regime_vix_ro)
+    return np.where(risk_off, "RO", np.where(trending, "TR", np.where(ranging, "RG", "TR")))
@@ -0,0 +1,239 @@
+"""Declarative scoring rules compiled to NumPy evaluators.
+
+A :class:`RuleSet` is a table of :class:`Rule` rows - a condition over
+indicator columns, the points it is worth and the component it adds to -
+plus per-regime component multipliers and the values assumed for missing
+columns.  Conditions are Python expressions over ``<timeframe>.<column>``::
+
+    D.close > D.sma200
+    55 <= D.rsi <= 70
+    H4.rsi > 55 and H4.rsi > prev(H4.rsi)
+    D.pullback
+
+``prev(...)`` reads the bar before the latest and a bare column is tested
+for truthiness.  :meth:`RuleSet.compile` turns every condition into a tree
+of array operations once.  The compiled rules evaluate column arrays of
+shape ``(..., bars)``: the tables of :mod:`scoring.batch` give one score per
+symbol, whole :class:`~data.panel.Panel` arrays one per symbol and bar.
+Because conditions and weights are kept apart, :meth:`CompiledRules.components`
+can re-score already evaluated conditions for many weight vectors at once.
+"""
+
+from __future__ import annotations
+
+import ast
+import csv
+import operator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# Column arrays per timeframe, e.g. ``{"D": {"close": array}}``.
+Tables = Mapping[str, Mapping[str, np.ndarray]]
+Evaluator = Callable[["_Env"], np.ndarray]
+
+_COMPARE = {
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+_ARITH = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+
+@dataclass(frozen=True)
+class Rule:
+    """``weight`` points added to ``component`` where ``condition`` holds."""
+
+    name: str
+    component: str
+    weight: float
+    condition: str
+
+
+class _Env:
+    """Column lookup for one evaluation, reading latest and previous bars."""
+
+    def __init__(self, tables: Tables, defaults: Mapping[str, Any]) -> None:
+        self.tables = tables
+        self.defaults = defaults
+        self.shape = next(np.shape(v) for t in tables.values() for v in t.values())
+
+    def column(self, tf: str, name: str, prev: bool) -> np.ndarray:
+        values = self.tables.get(tf, {}).get(name)
+        if values is None:
+            if name not in self.defaults:
+                raise KeyError(f"{tf}.{name}")
+            values = np.full(self.shape, float(self.defaults[name]))
+        values = np.asarray(values, dtype=np.float64)
+        return values[..., :-1] if prev else values[..., 1:]
+
+
+def _truth(x: np.ndarray) -> np.ndarray:
+    """Python truthiness per element; ``NaN`` is true like ``bool(nan)``."""
+
+    return x if x.dtype == bool else np.asarray(x).astype(bool)
+
+
+def _compile(node: ast.AST, prev: bool = False) -> Evaluator:
+    if isinstance(node, ast.Expression):
+        return _compile(node.body, prev)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, bool)):
+        value = float(node.value)
+        return lambda env: value
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        tf, name = node.value.id, node.attr
+        return lambda env: env.column(tf, name, prev)
+    if isinstance(node, ast.Call) and getattr(node.func, "id", None) == "prev" and len(node.args) == 1:
+        if prev:
+            raise ValueError("prev() cannot be nested")
+        return _compile(node.args[0], prev=True)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        inner = _compile(node.operand, prev)
+        return lambda env: ~_truth(inner(env))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        inner = _compile(node.operand, prev)
+        return lambda env: -inner(env)
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITH:
+        op = _ARITH[type(node.op)]
+        left, right = _compile(node.left, prev), _compile(node.right, prev)
+        return lambda env: op(left(env), right(env))
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(v, prev) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return lambda env: combine.reduce([_truth(np.asarray(p(env))) for p in parts])
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+        operands = [_compile(node.left, prev)] + [_compile(c, prev) for c in node.comparators]
+        ops = [_COMPARE[type(op)] for op in node.ops]
+
+        def compare(env: _Env) -> np.ndarray:
+            values = [o(env) for o in operands]
+            result = ops[0](values[0], values[1])
+            for i in range(1, len(ops)):
+                result = result & ops[i](values[i], values[i + 1])
+            return np.asarray(result)
+
+        return compare
+    raise ValueError(f"Unsupported rule expression: {ast.dump(node)}")
+
+
+def compile_condition(condition: str) -> Evaluator:
+    """Compile one rule condition into an array evaluator."""
+
+    return _compile(ast.parse(condition, mode="eval"))
+
+
+@dataclass
+class RuleSet:
+    """Rule table with regime multipliers and column defaults.
+
+    Attributes:
+        rules: Rows of the table, evaluated in order.
+        multipliers: Regime label to component multipliers; components not
+            listed keep their raw points.
+        defaults: Values assumed for columns a table lacks.
+        default_regime: Multipliers used for unknown regimes.
+    """
+
+    rules: Sequence[Rule]
+    multipliers: Mapping[str, Mapping[str, float]] = field(default_factory=dict)
+    defaults: Mapping[str, Any] = field(default_factory=dict)
+    default_regime: str | None = None
+
+    @classmethod
+    def from_csv(cls, path: Path, **kwargs) -> "RuleSet":
+        """Read rules from a CSV file with ``name,component,weight,condition`` columns."""
+
+        with Path(path).open(newline="", encoding="utf-8") as fh:
+            rules = [
+                Rule(row["name"], row["component"], float(row["weight"]), row["condition"])
+                for row in csv.DictReader(fh)
+            ]
+        return cls(rules, **kwargs)
+
+    def with_weights(self, weights: Mapping[str, float]) -> "RuleSet":
+        """Copy of the rule set with the named rules re-weighted."""
+
+        rules = [Rule(r.name, r.component, weights.get(r.name, r.weight), r.condition) for r in self.rules]
+        return RuleSet(rules, self.multipliers, self.defaults, self.default_regime)
+
+    def compile(self) -> "CompiledRules":
+        return CompiledRules(self)
+
+
+class CompiledRules:
+    """A :class:`RuleSet` with every condition compiled."""
+
+    def __init__(self, rule_set: RuleSet) -> None:
+        self.rule_set = rule_set
+        self.names: List[str] = [r.name for r in rule_set.rules]
+        self.weights = np.array([r.weight for r in rule_set.rules], dtype=np.float64)
+        self.component_names: List[str] = list(dict.fromkeys(r.component for r in rule_set.rules))
+        self._members: Dict[str, np.ndarray] = {
+            c: np.array([r.component == c for r in rule_set.rules]) for c in self.component_names
+        }
+        self._conditions = [compile_condition(r.condition) for r in rule_set.rules]
+
+    def conditions(self, tables: Tables) -> np.ndarray:
+        """Boolean array ``(rules, ..., bars - 1)`` of where each rule holds."""
+
+        env = _Env(tables, self.rule_set.defaults)
+        out_shape = env.shape[:-1] + (env.shape[-1] - 1,)
+        return np.stack([np.broadcast_to(_truth(np.asarray(c(env))), out_shape) for c in self._conditions])
+
+    def multiplier(self, regime: str | None, component: str) -> float:
+        table = self.rule_set.multipliers
+        mult = table.get(regime) if regime is not None else None
+        if mult is None and self.rule_set.default_regime is not None:
+            mult = table[self.rule_set.default_regime]
+        return float((mult or {}).get(component, 1.0))
+
+    def components(
+        self, fired: np.ndarray, regime: str | None = None, weights: np.ndarray | None = None
+    ) -> Dict[str, np.ndarray]:
+        """Points per component from :meth:`conditions` output.
+
+        ``weights`` defaults to the rule weights; an array of shape
+        ``(sets, rules)`` scores every weight set at once and prepends a
+        ``sets`` axis to the result.
+        """
+
+        weights = self.weights if weights is None else np.asarray(weights, dtype=np.float64)
+        out = {}
+        for name, members in self._members.items():
+            points = np.tensordot(weights[..., members], fired[members], axes=1)
+            mult = self.multiplier(regime, name)
+            out[name] = points * mult if mult != 1.0 else points
+        return out
+
+    def evaluate(self, tables: Tables, regime: str | None = None) -> Dict[str, np.ndarray]:
+        """Points per component of every row of ``tables``."""
+
+        return self.components(self.conditions(tables), regime)
+
+    def points(self, tables: Tables) -> Dict[str, np.ndarray]:
+        """Points of every individual rule, unscaled by regime."""
+
+        fired = self.conditions(tables)
+        return {name: w * f for name, w, f in zip(self.names, self.weights, fired)}
+
+
+def latest(values: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Drop the trailing bar axis of single-bar results."""
+
+    return {k: v[..., -1] for k, v in values.items()}
+
+
+def columns(rule_set: RuleSet) -> Dict[str, Tuple[str, ...]]:
+    """Columns each timeframe's conditions read."""
+
+    out: Dict[str, Dict[str, None]] = {}
+    for rule in rule_set.rules:
+        for node in ast.walk(ast.parse(rule.condition, mode="eval")):
+            if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+                out.setdefault(node.value.id, {})[node.attr] = None
+    return {tf: tuple(cols) for tf, cols in out.items()}
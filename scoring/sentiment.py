@@ -1,10 +1,25 @@
-"""Sentiment stubs."""
+"""Sentiment stubs and the cached news sentiment provider.
+
+News sentiment is looked up through a :class:`NewsProvider`, which answers a
+whole candidate list in one batched async request.  :class:`NewsCache` keeps
+the answers for ``NEWS_TTL_MIN`` minutes in a bounded LRU so the entry
+scoring reads them from memory.  :class:`FileNewsProvider` reads a local JSON
+file and stands in for a real feed in tests and offline runs.
+"""
 
 from __future__ import annotations
 
-from typing import Literal
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Literal, Optional, Protocol, Sequence, Tuple
 
 from loguru import logger
+from config import settings
+
+News = Literal["pos", "neg", "neutral"]
 
 
 def get_fear_greed() -> int:
@@ -18,7 +33,7 @@ def get_fear_greed() -> int:
     return 50
 
 
-def get_news_sentiment(symbol: str) -> Literal["pos", "neg", "neutral"]:
+def get_news_sentiment(symbol: str) -> News:
     """Return ticker specific news sentiment.
 
     Always returns ``"neutral"`` in this stub implementation.
@@ -26,3 +41,95 @@ def get_news_sentiment(symbol: str) -> Literal["pos", "neg", "neutral"]:
 
     logger.debug("Fetching news sentiment", symbol=symbol)
     return "neutral"
+
+
+class NewsProvider(Protocol):
+    """Source of ticker news sentiment."""
+
+    async def fetch(self, symbols: Sequence[str]) -> Dict[str, News]: ...
+
+
+@dataclass
+class StubNewsProvider:
+    """Provider answering every symbol with :func:`get_news_sentiment`."""
+
+    async def fetch(self, symbols: Sequence[str]) -> Dict[str, News]:
+        return {symbol: get_news_sentiment(symbol) for symbol in symbols}
+
+
+@dataclass
+class FileNewsProvider:
+    """Provider reading ``{"SYMBOL": "pos" | "neg" | "neutral"}`` from a JSON file.
+
+    The file is re-read on every batch so it can be edited while the bot
+    runs; symbols it does not list are neutral.
+    """
+
+    path: Path
+    requests: int = field(default=0, init=False)
+
+    async def fetch(self, symbols: Sequence[str]) -> Dict[str, News]:
+        self.requests += 1
+        try:
+            data = json.loads(Path(self.path).read_text())
+        except (OSError, ValueError):
+            logger.opt(exception=True).warning("Unreadable news sentiment file", path=str(self.path))
+            data = {}
+        return {symbol: data.get(symbol, "neutral") for symbol in symbols}
+
+
+@dataclass
+class NewsCache:
+    """TTL and LRU bounded cache in front of a :class:`NewsProvider`.
+
+    Attributes:
+        provider: Batched news source.
+        ttl: Seconds an answer stays valid.
+        maxsize: Maximum number of symbols kept; the least recently used
+            ones are evicted first.
+        hits: Symbols :meth:`refresh` answered from memory.
+        misses: Symbols :meth:`refresh` had to request.
+    """
+
+    provider: NewsProvider
+    ttl: float = field(default_factory=lambda: settings.news_ttl_min * 60.0)
+    maxsize: int = field(default_factory=lambda: settings.news_cache_size)
+    clock: Callable[[], float] = time.monotonic
+    hits: int = 0
+    misses: int = 0
+    _entries: "OrderedDict[str, Tuple[News, float]]" = field(default_factory=OrderedDict, init=False, repr=False)
+
+    def get(self, symbol: str) -> Optional[News]:
+        """Return the cached sentiment of ``symbol`` without any request."""
+
+        entry = self._entries.get(symbol)
+        if entry is None or self.clock() - entry[1] >= self.ttl:
+            return None
+        self._entries.move_to_end(symbol)
+        return entry[0]
+
+    async def refresh(self, symbols: Sequence[str]) -> Dict[str, News]:
+        """Fetch the missing or expired ``symbols`` in one batch.
+
+        Returns the sentiment of every symbol of ``symbols`` known
+        afterwards.  A failed batch is logged and leaves the cache unchanged.
+        """
+
+        now = self.clock()
+        wanted = list(dict.fromkeys(symbols))
+        stale = [s for s in wanted if s not in self._entries or now - self._entries[s][1] >= self.ttl]
+        self.hits += len(wanted) - len(stale)
+        self.misses += len(stale)
+        if stale:
+            try:
+                fetched = await self.provider.fetch(stale)
+            except Exception:
+                logger.opt(exception=True).error("News sentiment batch failed", symbols=len(stale))
+                fetched = {}
+            for symbol, news in fetched.items():
+                self._entries[symbol] = (news, now)
+                self._entries.move_to_end(symbol)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            logger.debug("News sentiment fetched", requested=len(stale), received=len(fetched))
+        return {s: self._entries[s][0] for s in wanted if s in self._entries}
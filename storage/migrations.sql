@@ -21,3 +21,11 @@ CREATE TABLE IF NOT EXISTS order_log (
     price REAL NOT NULL,
     timestamp DATETIME NOT NULL
 );
+
+CREATE TABLE IF NOT EXISTS earnings_calendar (
+    id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    report_date DATE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_earnings_calendar_symbol_date ON earnings_calendar (symbol, report_date);
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Float, Integer, String
+from sqlalchemy import Column, Date, DateTime, Float, Index, Integer, String
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -37,3 +37,12 @@ class OrderLog(Base):
     side = Column(String, nullable=False)
     price = Column(Float, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class EarningsDate(Base):
+    __tablename__ = "earnings_calendar"
+    __table_args__ = (Index("ix_earnings_calendar_symbol_date", "symbol", "report_date"),)
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    report_date = Column(Date, nullable=False)
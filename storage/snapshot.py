@@ -0,0 +1,86 @@
+"""Warm-start snapshots of the bot's in-memory state.
+
+After every cycle the bot writes one compressed pickle holding the engine
+state of its market data provider - the 4H roll-up engines and, for live
+data, the streaming indicator states - together with its positions and
+latest scores.  Raw bars are not included: the on-disk bar cache already
+keeps them.  On startup the snapshot is loaded back so indicators resume
+from where they stopped instead of replaying the history.  Restored
+positions are only a starting point; the bot reconciles them with the
+broker before trading.
+"""
+
+from __future__ import annotations
+
+import gzip
+import pickle
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict
+
+from loguru import logger
+from config import settings
+
+VERSION = 2
+
+
+@dataclass
+class Snapshot:
+    created: float = field(default_factory=time.time)
+    bot: Dict[str, Any] = field(default_factory=dict)
+    market_data: Dict[str, Any] = field(default_factory=dict)
+    version: int = VERSION
+
+
+def snapshot_path() -> Path | None:
+    """Configured snapshot file, ``None`` when warm starts are disabled."""
+
+    return Path(settings.warm_start_file) if settings.warm_start_file else None
+
+
+def save_snapshot(bot: Any, path: Path) -> Snapshot:
+    """Checkpoint ``bot`` and its market data provider to ``path``.
+
+    The file is replaced atomically so a crash while writing leaves the
+    previous snapshot intact.
+    """
+
+    checkpoint = getattr(bot.market_data, "checkpoint", None)
+    snap = Snapshot(bot=bot.checkpoint(), market_data=checkpoint() if checkpoint is not None else {})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with gzip.open(tmp, "wb", compresslevel=1) as fh:
+        pickle.dump(snap, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(path)
+    logger.debug("Warm-start snapshot saved", path=str(path), bytes=path.stat().st_size)
+    return snap
+
+
+def load_snapshot(bot: Any, path: Path, max_age_sec: float | None = None) -> bool:
+    """Restore ``bot`` from the snapshot at ``path``.
+
+    Missing, unreadable, outdated or older than ``max_age_sec`` snapshots
+    are ignored.  Returns ``True`` when state was restored.
+    """
+
+    if max_age_sec is None:
+        max_age_sec = settings.warm_start_max_age_h * 3600.0
+    if not path.exists():
+        return False
+    try:
+        with gzip.open(path, "rb") as fh:
+            snap = pickle.load(fh)
+    except Exception:
+        logger.opt(exception=True).warning("Discarding unreadable warm-start snapshot", path=str(path))
+        return False
+    age = time.time() - snap.created
+    if getattr(snap, "version", None) != VERSION or age > max_age_sec:
+        logger.info("Ignoring stale warm-start snapshot", path=str(path), age_h=round(age / 3600, 1))
+        return False
+    bot.restore(snap.bot)
+    restore = getattr(bot.market_data, "restore", None)
+    if restore is not None:
+        restore(snap.market_data)
+    logger.info("Warm start from snapshot", path=str(path), age_min=round(age / 60, 1))
+    return True
@@ -1,7 +1,89 @@
+import os
+import subprocess
 import sys
 import pathlib
+import textwrap
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
 
 # Ensure the local pandas stub is imported before any test runs.
 sys.modules.pop("pandas", None)
-sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
-import pandas as pd  # noqa: F401
+sys.path.insert(0, str(ROOT))
+import pandas as pd  # noqa: F401, E402
+
+# Exit status of a child interpreter that found no real pandas package.
+_NO_PANDAS = 77
+
+# Helpers defined for every ``real_pandas`` script.
+_HELPERS = """
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data.columnar import ColumnarBarStore
+from data.rollups import Session, rollup
+
+HOURS = ["09:30", "10:00", "11:00", "12:00", "13:00", "14:00", "15:00"]
+
+
+def synthetic_store(path, symbols, start, end, seed=0):
+    \"\"\"Random-walk ``1 hour`` and ``1 day`` bars of ``symbols`` on every weekday.\"\"\"
+
+    store, session = ColumnarBarStore(Path(path)), Session()
+    rng = np.random.default_rng(seed)
+    stamps = [f"{day.date()} {hour}" for day in pd.bdate_range(start, end) for hour in HOURS]
+    ts = pd.DatetimeIndex(stamps).tz_localize("America/New_York").tz_convert("UTC").asi8
+    for symbol in symbols:
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0004, 0.006, len(ts))))
+        if symbol == "VIX":
+            close = np.full(len(ts), 15.0)
+        open_ = np.r_[close[0], close[:-1]]
+        bars = {
+            "open": open_,
+            "high": np.maximum(open_, close) * 1.002,
+            "low": np.minimum(open_, close) * 0.998,
+            "close": close,
+            "volume": rng.integers(100_000, 1_000_000, len(ts)).astype(float),
+        }
+        store.write_arrays(symbol, "1 hour", ts, **bars)
+        daily = rollup(pd.DataFrame(bars, index=pd.to_datetime(ts, utc=True)), "1 day", "1 hour", session)
+        store.write_arrays(symbol, "1 day", daily.index.asi8, **{c: daily[c].to_numpy() for c in daily.columns})
+    return store
+"""
+
+
+@pytest.fixture
+def real_pandas(tmp_path_factory):
+    """Run a script in a child interpreter where ``pandas`` is the real package.
+
+    The stub shadows pandas for the whole test session, so code built on the
+    full pandas API (rollups, indicator columns, panels) is exercised in a
+    fresh process instead.  Scripts may call ``synthetic_store(path, symbols,
+    start, end)``; they fail the test by raising and return their output.
+    The test is skipped when pandas is not installed.
+    """
+
+    def run(script: str) -> str:
+        env = {k: v for k, v in os.environ.items() if k != "PYTEST_CURRENT_TEST"}
+        # The repository goes last on the path so the installed pandas wins over the stub.
+        preamble = (
+            f"import sys\nsys.path.append({str(ROOT)!r})\nimport pandas\n"
+            f"if not hasattr(pandas, 'to_datetime'):\n    sys.exit({_NO_PANDAS})\n"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-c", preamble + _HELPERS + textwrap.dedent(script)],
+            cwd=tmp_path_factory.mktemp("real_pandas"),
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+        if proc.returncode == _NO_PANDAS:
+            pytest.skip("pandas is not installed")
+        assert proc.returncode == 0, proc.stderr
+        return proc.stdout
+
+    return run
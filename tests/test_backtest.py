@@ -0,0 +1,120 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from backtest.engine import SimulatedBroker, cycle_times
+from backtest.metrics import cagr, max_drawdown
+from data.columnar import ColumnarBarStore
+from data.rollups import Session
+from exec.broker import Order
+
+NY = ZoneInfo("America/New_York")
+
+
+def hourly(store, symbol, lows, highs):
+    """Store one session of 1H bars (10:00-15:00) with the given ranges."""
+
+    ts = np.array([datetime(2024, 1, 2, h, tzinfo=NY).timestamp() * 10**9 for h in range(10, 16)], dtype=np.int64)
+    lows, highs = np.asarray(lows, dtype=float), np.asarray(highs, dtype=float)
+    mid = (lows + highs) / 2
+    store.write_arrays(symbol, "1 hour", ts, open=mid, high=highs, low=lows, close=mid, volume=np.ones(len(ts)))
+    return ts
+
+
+def test_bracket_fills_entry_then_stop(tmp_path):
+    store = ColumnarBarStore(tmp_path)
+    ts = hourly(store, "AAA", [99, 97, 100, 94, 90, 90], [101, 99, 102, 96, 92, 92])
+    broker = SimulatedBroker(store, cash=10_000.0, session=Session(tz=NY), now=int(ts[0]))
+    broker.place_order(Order("AAA", 10, "BUY", 98.0))
+    broker.place_order(Order("AAA", 10, "SELL", 110.0))
+    broker.place_order(Order("AAA", 10, "SELL", 95.0))
+    # Stop at 95 is below the first bar but inactive until the entry fills.
+    broker.advance(int(ts[2]))
+    assert broker.positions == {"AAA": 10}
+    assert broker.cash == 10_000.0 - 980.0
+    broker.advance(int(ts[-1]) + 3_600 * 10**9)
+    assert broker.positions == {} and broker.working == {}
+    (trade,) = broker.trades
+    # The 13:00 bar opens at 95 and trades through the stop.
+    assert (trade.entry_price, trade.exit_price) == (98.0, 95.0)
+    assert trade.pnl == -30.0
+    assert broker.get_balance() == 10_000.0 - 30.0
+    assert broker.metrics.trades == 1 and broker.metrics.equity == 10_000.0 - 30.0
+
+
+def test_stop_and_target_in_same_bar(tmp_path):
+    store = ColumnarBarStore(tmp_path)
+    ts = hourly(store, "AAA", [99, 97, 94, 94, 94, 94], [101, 99, 103, 103, 103, 103])
+    broker = SimulatedBroker(store, cash=10_000.0, session=Session(tz=NY), now=int(ts[0]))
+    broker.place_order(Order("AAA", 10, "BUY", 98.0))
+    broker.place_order(Order("AAA", 10, "SELL", 95.0))
+    broker.place_order(Order("AAA", 5, "SELL", 102.0))
+    broker.place_order(Order("AAA", 5, "SELL", 110.0))
+    # The 12:00 bar trades through both the stop and pt1; the stop wins.
+    broker.advance(int(ts[-1]) + 3_600 * 10**9)
+    (trade,) = broker.trades
+    assert trade.exit_price == 95.0 and trade.qty == 10
+    assert broker.positions == {} and broker.working == {}
+    assert broker.cash == 10_000.0 - 30.0
+
+
+def test_unfilled_entry_expires_with_its_bracket(tmp_path):
+    store = ColumnarBarStore(tmp_path)
+    ts = hourly(store, "AAA", [100] * 6, [101] * 6)
+    broker = SimulatedBroker(store, session=Session(tz=NY), now=int(ts[0]))
+    broker.entry_expiry = broker.entry_expiry / 24
+    broker.place_order(Order("AAA", 10, "BUY", 90.0))
+    broker.place_order(Order("AAA", 10, "SELL", 80.0))
+    broker.advance(int(ts[-1]) + 3_600 * 10**9)
+    assert broker.working == {} and broker.trades == []
+
+
+def test_cycle_times_skip_weekends():
+    times = cycle_times(date(2024, 1, 5), date(2024, 1, 8), NY)
+    assert {t.date() for t in times} == {date(2024, 1, 5), date(2024, 1, 8)}
+    assert len(times) == 8
+
+
+def test_equity_metrics():
+    equity = [100.0, 120.0, 90.0, 110.0, 121.0]
+    assert abs(max_drawdown(equity) - 0.25) < 1e-12
+    assert abs(cagr(equity, 2.0) - 0.1) < 1e-12
+    assert cagr([100.0], 1.0) == 0.0
+
+
+def test_run_backtest_end_to_end(real_pandas, tmp_path):
+    real_pandas(
+        f"""
+        from datetime import date
+        from backtest.engine import run_backtest
+
+        store = synthetic_store({str(tmp_path)!r}, ["SPY", "AAA", "BBB", "VIX"], "2022-01-03", "2023-06-30")
+        result = run_backtest(store, ["AAA", "BBB"], date(2022, 11, 1), date(2023, 6, 30))
+        assert len(result.times) == len(result.equity) == 4 * len(pd.bdate_range("2022-11-01", "2023-06-30"))
+        assert result.trades == len(result.trade_log) == result.metrics.trades > 0
+        assert all(t.entry_time < t.exit_time for t in result.trade_log)
+        # Every closed trade is booked once: flat at the end, cash is the PnL.
+        pnl = sum(t.pnl for t in result.trade_log)
+        assert abs(result.metrics.equity - (100_000.0 + pnl)) < 1e-6
+        """
+    )
+
+
+def test_run_backtest_surfaces_symbol_errors(real_pandas, tmp_path):
+    real_pandas(
+        f"""
+        from datetime import date
+        from backtest.engine import run_backtest
+
+        store = synthetic_store({str(tmp_path)!r}, ["SPY", "AAA", "VIX"], "2023-01-02", "2023-03-31")
+        try:
+            run_backtest(store, ["AAA", "NOPE"], date(2023, 3, 1), date(2023, 3, 31))
+        except Exception:
+            pass
+        else:
+            raise AssertionError("a failing symbol must abort the backtest")
+        result = run_backtest(store, ["AAA", "NOPE"], date(2023, 3, 1), date(2023, 3, 31), skip_errors=True)
+        assert result.errors == len(result.times) > 0
+        """
+    )
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config import overridden
+from data.bar_cache import BarCache, duration_days, tail_duration
+
+
+def test_duration_days_scales_sessions_to_calendar_days():
+    assert duration_days("10 D") == 14.0
+    assert duration_days("2 W") == 2 * duration_days("1 w") == 14.0
+    assert duration_days("1 Y") == 365.0
+    with pytest.raises(ValueError):
+        duration_days("ten days")
+
+
+def test_tail_duration_covers_gap_plus_last_bar():
+    now = datetime(2024, 3, 5, 12, tzinfo=timezone.utc)
+    assert tail_duration(now - timedelta(days=2, hours=12), now) == "4 D"
+    assert tail_duration(now, now) == "1 D"
+    assert tail_duration(datetime(2024, 3, 4, 12), now) == "2 D"  # naive times are UTC
+
+
+def test_store_load_and_freshness(tmp_path):
+    cache = BarCache(tmp_path / "bars", ttl_sec=60)
+    assert cache.load("AAPL", "1 day") is None
+    entry = cache.store("AAPL", "1 day", {"close": [1.0]}, "200 D", 200)
+    assert cache.load("AAPL", "1 day") == entry
+    assert cache.path("AAPL", "1 day").name == "AAPL_1day.pkl"
+    assert cache.covers(entry, "150 D") and not cache.covers(entry, "1 Y")
+    assert cache.is_fresh(entry)
+    assert not BarCache(tmp_path / "bars").is_fresh(entry)
+
+    cache.path("AAPL", "1 day").write_bytes(b"garbage")
+    assert cache.load("AAPL", "1 day") is None
+
+
+def test_from_settings_disabled_by_empty_dir():
+    with overridden(bar_cache_dir=""):
+        assert BarCache.from_settings() is None
+    with overridden(bar_cache_dir="somewhere", bar_cache_ttl_min=2):
+        cache = BarCache.from_settings()
+    assert (str(cache.root), cache.ttl_sec) == ("somewhere", 120)
+
+
+def test_merge_bars_prefers_fresh_rows(real_pandas):
+    real_pandas(
+        """
+        from data.bar_cache import merge_bars
+
+        index = pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"])
+        cached = pd.DataFrame({"close": [1.0, 2.0, 3.0]}, index=index)
+        fresh = pd.DataFrame({"close": [3.5, 4.0]}, index=pd.to_datetime(["2024-01-03", "2024-01-04"]))
+        merged = merge_bars(cached, fresh)
+        assert merged["close"].tolist() == [1.0, 2.0, 3.5, 4.0]
+        assert merged.index.is_monotonic_increasing
+        """
+    )
+
+
+def test_full_download_then_tail_merge_and_trim(real_pandas, tmp_path):
+    real_pandas(
+        f"""
+        from data.bar_cache import BarCache, duration_days
+        from data.market_data import IBKRMarketData
+
+        days = pd.bdate_range(end=pd.Timestamp.now(tz="UTC").normalize(), periods=40)
+        bars = pd.DataFrame({{"close": np.arange(40.0), "volume": 1.0}}, index=days)
+
+        class Offline(IBKRMarketData):
+            def __post_init__(self):
+                self.requests = []
+
+            def _fetch(self, symbol, duration, bar_size):
+                self.requests.append(duration)
+                if duration == "30 D":
+                    return bars.iloc[:30]  # full download, a few sessions ago
+                # The tail refreshes the last cached bar too.
+                return bars.iloc[29:].assign(close=lambda df: df["close"] + 0.5)
+
+        root = Path({str(tmp_path)!r})
+        first = Offline(cache=BarCache(root))
+        assert len(first._load("AAPL", "30 D", "1 day")) == 30
+        assert first.requests == ["30 D"]
+
+        # A restart finds the entry on disk and only asks for the missing tail.
+        second = Offline(cache=BarCache(root))
+        df = second._load("AAPL", "30 D", "1 day")
+        assert len(second.requests) == 1 and second.requests[0] != "30 D"
+        assert duration_days(second.requests[0]) >= (days[-1] - days[29]).days
+        assert len(df) == 30  # trimmed to the rows of the full download
+        assert df.index[0] == days[10] and df.index[-1] == days[-1]
+        assert df["close"].iloc[-1] == 39.5 and df.loc[days[28], "close"] == 28.0
+        assert BarCache(root).load("AAPL", "1 day")["bars"].equals(df)
+
+        # Within the TTL the entry is served without a request; a longer duration refetches.
+        third = Offline(cache=BarCache(root, ttl_sec=600))
+        assert third._load("AAPL", "30 D", "1 day").equals(df) and third.requests == []
+        third._load("AAPL", "60 D", "1 day")
+        assert third.requests == ["60 D"]
+        """
+    )
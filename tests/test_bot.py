@@ -1,10 +1,16 @@
 import sys, pathlib; sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
+import asyncio
+import json
+
 import pandas as pd
 
 from main import TradingBot
+from scoring.context import MarketSnapshot
+from scoring.sentiment import FileNewsProvider, NewsCache
 from exec.broker import Broker, Order
 from exec.state import PositionState
+from data.pacing import Priority, current_priority
 
 
 class FakeMarketData:
@@ -12,7 +18,7 @@ class FakeMarketData:
         self.calls = []
         self.exit_ready = False
 
-    def get_bars(self, symbol: str, tf: str, lookback: int) -> pd.DataFrame:
+    def get_bars(self, symbol: str, tf: str, lookback: int, columns=None) -> pd.DataFrame:
         self.calls.append((symbol, tf, lookback))
         if tf == "D" and lookback == 2:
             data = {
@@ -109,3 +115,113 @@ def test_bot_entry_and_exit_cycle():
 
     bot.run_cycle("AAPL")
     assert len(broker.orders) == 5
+
+
+def test_run_cycle_async_prefetches_needed_bars():
+    md = FakeMarketData()
+    requested = []
+
+    async def prefetch_async(requests):
+        requested.extend(requests)
+
+    md.prefetch_async = prefetch_async
+    bot = TradingBot(md, MockBroker())
+    bot.positions["MSFT"] = PositionState.MANAGED
+    asyncio.run(bot.run_cycle_async(["AAPL", "MSFT"]))
+    assert ("AAPL", "D", 2) in requested and ("AAPL", "4H", 2) in requested
+    assert ("MSFT", "1H", 2) in requested
+    assert bot.positions["AAPL"] == PositionState.FILLED
+
+
+def test_begin_cycle_prefetches_exit_bars_first():
+    md = FakeMarketData()
+    batches = []
+    md.prefetch = lambda requests: batches.append((current_priority(), [r[0] for r in requests]))
+    bot = TradingBot(md, MockBroker())
+    bot.positions["MSFT"] = PositionState.MANAGED
+    bot.begin_cycle(["AAPL", "MSFT", "NVDA"])
+    assert batches == [
+        (Priority.EXIT, ["MSFT", "MSFT", "MSFT"]),
+        (Priority.ENTRY, ["AAPL", "AAPL", "NVDA", "NVDA"]),
+    ]
+
+
+def test_unchanged_inputs_skip_scoring():
+    md = FakeMarketData()
+    md.bar_time = 1
+    md.last_closed_bar = lambda symbol, tf: md.bar_time
+    prefetched = []
+    md.prefetch = prefetched.extend
+    bot = TradingBot(md, MockBroker())
+    bot.positions["AAPL"] = PositionState.MANAGED
+    bot.position_sizes["AAPL"] = 9
+
+    market = bot.begin_cycle()
+    bot.run_cycle("AAPL", market)
+    assert (bot.memo_hits, bot.memo_misses) == (0, 1)
+    assert bot.scores["AAPL"]["exit"] < 15
+
+    calls = len(md.calls)
+    prefetched.clear()
+    market = bot.begin_cycle(["AAPL"])
+    assert prefetched == []  # the last closed bars did not move: nothing to download
+    bot.run_cycle("AAPL", market)
+    assert len(md.calls) == calls
+    assert (bot.memo_hits, bot.memo_misses) == (1, 0)
+
+    md.bar_time = 2  # a bar closed
+    market = bot.begin_cycle(["AAPL"])
+    assert prefetched == [("AAPL", "4H", 2), ("AAPL", "D", 1), ("AAPL", "1H", 2)]
+    bot.run_cycle("AAPL", market)
+    assert len(md.calls) > calls
+    assert (bot.memo_hits, bot.memo_misses) == (0, 1)
+
+
+def test_screen_news_serves_entry_scoring_from_cache(tmp_path):
+    path = tmp_path / "news.json"
+    path.write_text(json.dumps({"AAPL": "neg"}))
+    provider = FileNewsProvider(path)
+    bot = TradingBot(FakeMarketData(), MockBroker(), news=NewsCache(provider))
+    market = MarketSnapshot(fg=50, regime="RO")
+
+    assert asyncio.run(bot.screen_news(["AAPL", "MSFT"], market)) == ["AAPL", "MSFT"]
+    assert provider.requests == 1
+    bot.run_cycle("AAPL", market)
+    bot.run_cycle("MSFT", market)
+    assert provider.requests == 1
+    assert bot.scores["AAPL"]["entry"] == 0.0  # negative news blocks in risk-off
+    assert bot.scores["MSFT"]["entry"] > 0
+
+
+def test_earnings_blackout_blocks_new_entries():
+    from datetime import date
+
+    from scoring.earnings import EarningsCalendar
+
+    md = FakeMarketData()
+    broker = MockBroker()
+    bot = TradingBot(md, broker, earnings=EarningsCalendar.from_rows([("AAPL", date.today())]))
+    assert bot.bar_requests("AAPL") == []
+    bot.run_cycle("AAPL")
+    assert broker.orders == [] and md.calls == []
+    bot.run_cycle("MSFT")
+    assert len(broker.orders) == 4
+
+
+def test_score_exits_scores_open_positions_in_one_pass():
+    md = FakeMarketData()
+    md.exit_ready = True
+    broker = MockBroker()
+    bot = TradingBot(md, broker)
+    for symbol in ("AAPL", "MSFT"):
+        bot.positions[symbol] = PositionState.MANAGED
+        bot.position_sizes[symbol] = 9
+
+    market = bot.begin_cycle()
+    scores = bot.score_exits(["AAPL", "MSFT", "NVDA"])
+    assert set(scores) == {"AAPL", "MSFT"} and all(score >= 15 for score in scores.values())
+    calls = len(md.calls)
+    bot.run_cycle("AAPL", market)
+    assert [call[1] for call in md.calls[calls:]] == ["D"]  # only the exit price
+    assert broker.orders[-1].qty == 9
+    assert bot.scores["AAPL"]["exit"] == scores["AAPL"]
@@ -0,0 +1,38 @@
+import numpy as np
+
+from data.columnar import ColumnarBarStore
+
+HOUR = 3_600 * 10**9
+
+
+def ohlcv(n, start=0.0):
+    close = np.arange(n, dtype=float) + start
+    return {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": np.ones(n)}
+
+
+def test_open_slice_is_zero_copy_view(tmp_path):
+    store = ColumnarBarStore(tmp_path)
+    ts = np.arange(10, dtype=np.int64) * HOUR
+    store.write_arrays("AAPL", "1 hour", ts, **ohlcv(10))
+    bars = store.open("AAPL", "1 hour")
+    assert isinstance(bars.ts, np.memmap)
+    view = bars.slice(start=2 * HOUR, end=5 * HOUR)
+    assert list(view["close"]) == [2.0, 3.0, 4.0, 5.0]
+    assert np.shares_memory(view["close"], bars["close"])
+    assert bars.locate(int(7.5 * HOUR)) == 8
+    assert store.symbols("1 hour") == ["AAPL"]
+
+
+def test_append_skips_rows_already_stored(tmp_path):
+    store = ColumnarBarStore(tmp_path)
+    store.write_arrays("AAPL", "1 day", np.arange(5, dtype=np.int64), **ohlcv(5))
+    added = store.append_arrays("AAPL", "1 day", np.arange(3, 8, dtype=np.int64), **ohlcv(5, start=3))
+    assert added == 3
+    bars = store.open("AAPL", "1 day")
+    assert list(bars.ts) == list(range(8))
+    assert list(bars["close"]) == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+
+
+def test_missing_symbol_opens_empty(tmp_path):
+    bars = ColumnarBarStore(tmp_path).open("NONE", "1 day")
+    assert len(bars) == 0 and len(bars.tail(3)) == 0
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from data.columns import REGISTRY, add_columns, resolve
+from data.market_data import YFinanceMarketData
+
+
+class StaticMarketData(YFinanceMarketData):
+    def __post_init__(self) -> None:
+        self.loads = 0
+
+    def _load(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:
+        self.loads += 1
+        return pd.DataFrame(
+            {"open": [1.0, 2.0, 3.0], "high": [1.0, 2.0, 3.0], "low": [1.0, 2.0, 3.0], "close": [1.0, 2.0, 3.0], "volume": [10.0, 20.0, 30.0]}
+        )
+
+
+def test_resolve_groups_multi_output_indicators():
+    order = resolve(["macd_hist", "macd_line", "unknown"])
+    assert order == [REGISTRY["macd_line"]]
+
+
+def test_get_bars_computes_only_requested_columns():
+    md = StaticMarketData(cache=None)
+    d1 = md.get_bars("AAPL", "D", 1, columns=("sma50", "avg_vol"))
+    assert d1.columns == ["open", "high", "low", "close", "volume", "sma50", "avg_vol"]
+    assert d1.iloc[-1]["avg_vol"] == 20.0
+
+    close = md.get_bars("AAPL", "D", 1, columns=())
+    assert close.columns == ["open", "high", "low", "close", "volume"]
+    assert md.loads == 1
+
+
+def test_computed_columns_are_memoised_for_the_cycle():
+    md = StaticMarketData(cache=None)
+    md.get_bars("AAPL", "D", 2, columns=("sma50",))
+    (frame,) = md._frames.values()
+    assert add_columns(frame, ["sma50", "session_vol"]) == ["session_vol"]
+    md.begin_cycle()
+    assert not md._frames
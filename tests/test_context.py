@@ -0,0 +1,117 @@
+import threading
+
+import pandas as pd
+
+from data.pacing import Priority, current_priority, prioritised
+from scoring.context import MarketContext
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ReferenceData:
+    def __init__(self):
+        self.calls = {"bars": 0, "vix": 0}
+        self.vix = 30.0
+        self.release = threading.Event()
+        self.release.set()
+
+    def get_reference_symbol(self):
+        return "SPY"
+
+    def get_bars(self, symbol, tf, lookback, columns=None):
+        self.calls["bars"] += 1
+        return pd.DataFrame({"close": [90.0], "sma50": [95.0], "sma200": [100.0], "adx": [25.0]})
+
+    def get_vix(self):
+        self.release.wait(5)
+        self.calls["vix"] += 1
+        return self.vix
+
+
+def test_snapshot_fetches_each_item_once_per_ttl():
+    md, clock = ReferenceData(), Clock()
+    fg_calls = []
+    ctx = MarketContext(md, fear_greed=lambda: fg_calls.append(1) or 40, clock=clock)
+    first = ctx.snapshot()
+    for _ in range(10):
+        assert ctx.snapshot().reference_bars is first.reference_bars
+    assert md.calls == {"bars": 1, "vix": 1} and len(fg_calls) == 1
+    assert (first.regime, first.vix, first.fg) == ("RO", 30.0, 40)
+
+    clock.now = 6 * 60.0  # VIX TTL (5 min) elapsed, the others are still fresh
+    md.vix = 15.0
+    assert ctx.snapshot().vix == 15.0
+    assert md.calls == {"bars": 1, "vix": 2} and len(fg_calls) == 1
+
+
+def test_market_data_refreshes_synchronously():
+    md, clock = ReferenceData(), Clock()
+    ctx = MarketContext(md, fear_greed=lambda: 50, clock=clock)
+    ctx.snapshot()
+    clock.now = 6 * 60.0
+    md.vix = 15.0
+    assert ctx.snapshot().vix == 15.0
+    assert threading.active_count() == 1
+
+
+def test_stale_fear_greed_refreshes_in_background():
+    clock, release, seen = Clock(), threading.Event(), []
+    values = iter([40, 60])
+
+    def fear_greed():
+        if seen:
+            release.wait(5)
+        seen.append(current_priority())
+        return next(values)
+
+    ctx = MarketContext(ReferenceData(), fear_greed=fear_greed, clock=clock)
+    ctx.snapshot()
+    clock.now = 24 * 3600.0
+    with prioritised(Priority.REFERENCE):
+        assert ctx.snapshot().fg == 40  # stale value served while refreshing
+    release.set()
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and thread.daemon:
+            thread.join(5)
+    assert ctx.snapshot().fg == 60
+    # The refresh thread keeps the caller's pacing priority.
+    assert seen == [Priority.ENTRY, Priority.REFERENCE]
+
+
+def test_reference_bars_define_slow_sma(real_pandas):
+    real_pandas(
+        """
+        from data.market_data import YFinanceMarketData
+        from scoring.context import MarketContext, REFERENCE_LOOKBACK
+
+        class SyntheticMarketData(YFinanceMarketData):
+            def __post_init__(self):
+                pass
+
+            def _fetch(self, symbol, duration, bar_size):
+                sessions = int(duration.split()[0])
+                days = pd.bdate_range(end="2024-03-01", periods=sessions)
+                stamps = [f"{day.date()} {hour}" for day in days for hour in HOURS]
+                index = pd.DatetimeIndex(stamps).tz_localize("America/New_York").tz_convert("UTC")
+                close = 100 + np.sin(np.arange(len(index)) / 10)
+                return pd.DataFrame(
+                    {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1e6},
+                    index=index,
+                )
+
+            def get_vix(self):
+                return 15.0
+
+        ctx = MarketContext(SyntheticMarketData(cache=None), fear_greed=lambda: 50)
+        bars = ctx.snapshot().reference_bars
+        assert len(bars) == REFERENCE_LOOKBACK
+        assert np.isfinite(bars["sma200"].to_numpy()).all()
+        assert np.isfinite(bars["adx"].to_numpy()).all()
+        """
+    )
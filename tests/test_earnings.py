@@ -0,0 +1,39 @@
+import sys, pathlib; sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from scoring.earnings import EarningsCalendar
+
+ROWS = [("AAPL", "2024-05-02"), ("AAPL", "2024-01-25"), ("MSFT", date(2024, 4, 25)), ("AAPL", "2024-08-01")]
+
+
+def _ns(day: str) -> int:
+    return int(datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp()) * 10**9
+
+
+def test_blackout_window_and_next_earnings(tmp_path):
+    path = tmp_path / "earnings.csv"
+    path.write_text("symbol,date\n" + "".join(f"{s},{d}\n" for s, d in ROWS))
+    calendar = EarningsCalendar.load(str(path), before=3, after=1)
+
+    assert calendar.in_blackout("AAPL", date(2024, 4, 29))
+    assert calendar.in_blackout("AAPL", date(2024, 5, 3))
+    assert not calendar.in_blackout("AAPL", date(2024, 4, 28))
+    assert not calendar.in_blackout("AAPL", date(2024, 5, 4))
+    assert not calendar.in_blackout("NVDA", date(2024, 5, 2))
+    assert calendar.next_earnings("AAPL", date(2024, 2, 1)).date() == date(2024, 5, 2)
+    assert calendar.next_earnings("MSFT", date(2024, 5, 1)) is None
+
+
+def test_vectorised_blackout_matches_bisect():
+    calendar = EarningsCalendar.from_rows(ROWS, before=3, after=1)
+    symbols = ["AAPL", "MSFT", "NVDA"]
+    for offset in range(-10, 10):
+        day = date.fromordinal(date(2024, 4, 28).toordinal() + offset)
+        expected = [calendar.in_blackout(s, day) for s in symbols]
+        assert calendar.blackout(symbols, day).tolist() == expected
+        ns = _ns(day.isoformat())
+        assert calendar.blackout(symbols, np.full(3, ns)).tolist() == expected
+    assert not EarningsCalendar().blackout(symbols, date(2024, 5, 2)).any()
@@ -60,3 +60,48 @@ def test_entry_fg_block():
     h4 = build_h4()
     score, _ = compute_entry_score(daily, h4, "TR", {"fg": 10})
     assert score == 0
+
+
+def test_batch_entry_scores_match_scalar():
+    import numpy as np
+
+    from scoring.batch import last_rows
+    from scoring.entry_scoring import COLUMNS, DEFAULTS, compute_entry_scores
+
+    rng = np.random.default_rng(7)
+    dailies, h4s = [], []
+    for i in range(200):
+        daily = {
+            "close": rng.uniform(80, 120, 2),
+            "sma50": rng.uniform(80, 120, 2),
+            "sma200": rng.uniform(80, 120, 2),
+            "supertrend": rng.choice([-1.0, 1.0], 2),
+            "rsi": rng.uniform(40, 85, 2),
+            "macd_line": rng.normal(size=2),
+            "macd_signal": rng.normal(size=2),
+            "macd_hist": rng.normal(size=2),
+            "avg_vol": rng.uniform(5e5, 2e6, 2),
+            "session_vol": rng.uniform(5e5, 3e6, 2),
+            "obv_slope": rng.normal(size=2),
+            "pullback": rng.random(2) < 0.5,
+            "bb_pos": rng.random(2),
+            "extended": rng.random(2) < 0.3,
+            "gap_up": rng.random(2) < 0.3,
+        }
+        if i % 5 == 0:
+            del daily["supertrend"], daily["pullback"]
+        rows = 1 if i % 7 == 0 else 2
+        dailies.append(pd.DataFrame({k: [float(x) for x in v[:rows]] for k, v in daily.items()}))
+        h4s.append(pd.DataFrame({"supertrend": [1.0, float(rng.choice([-1, 1]))], "rsi": list(rng.uniform(40, 70, 2))}))
+
+    daily_table = last_rows(dailies, ("close",) + COLUMNS["D"], DEFAULTS)
+    h4_table = last_rows(h4s, COLUMNS["4H"], DEFAULTS)
+    news = rng.choice(["pos", "neg", "neutral"], len(dailies))
+    for regime in ("TR", "RG", "RO"):
+        for fg in (None, 10, 30, 50, 90):
+            scores, comps = compute_entry_scores(daily_table, h4_table, regime, {"fg": fg, "news": news})
+            for i, (daily, h4) in enumerate(zip(dailies, h4s)):
+                score, comp = compute_entry_score(daily, h4, regime, {"fg": fg, "news": news[i]})
+                assert scores[i] == score
+                for name in ("trend", "momentum", "volume", "setup", "penalties"):
+                    assert comps[name][i] == getattr(comp, name)
@@ -52,3 +52,50 @@ def test_exit_full_score_with_confirmation():
 def test_exit_no_confirmation_without_macd_cross():
     comp = compute_exit_score(build_h4(), build_d1(), build_h1(False))
     assert comp.h1_accel_confirmation == 0
+
+
+def test_batch_exit_scores_match_scalar():
+    import dataclasses
+
+    import numpy as np
+
+    from scoring.batch import last_rows
+    from scoring.exit_scoring import COLUMNS, DEFAULTS, compute_exit_scores
+
+    rng = np.random.default_rng(3)
+
+    def frame(columns, rows):
+        data = {}
+        for name in columns:
+            if name in ("bearish_pattern", "trendline_break"):
+                values = rng.random(rows) < 0.3
+            elif name == "supertrend":
+                values = rng.choice([-1.0, 1.0], rows)
+            elif name == "rsi":
+                values = rng.uniform(40, 60, rows)
+            elif name in ("volume", "avg_vol"):
+                values = rng.uniform(5e5, 2e6, rows)
+            else:
+                values = rng.normal(100 if name in ("close", "sma20", "sma50") else 0, 2, rows)
+            data[name] = [float(v) for v in values]
+        return pd.DataFrame(data)
+
+    h4s, d1s, h1s = [], [], []
+    for i in range(300):
+        h4_cols = ("close",) + COLUMNS["4H"] if i % 6 else ("close", "supertrend", "macd_line", "macd_signal")
+        h4s.append(frame(h4_cols, 1 if i % 11 == 0 else 2))
+        d1s.append(frame(("close", "volume") + COLUMNS["D"], 1))
+        h1s.append(frame(COLUMNS["1H"], 1 if i % 4 == 0 else 2))
+
+    def table(frames, columns):
+        return last_rows(frames, columns, DEFAULTS)
+
+    scores = compute_exit_scores(
+        table(h4s, ("close",) + COLUMNS["4H"]),
+        table(d1s, ("close", "volume") + COLUMNS["D"]),
+        table(h1s, COLUMNS["1H"]),
+    )
+    assert scores["total"].any() and scores["h1_accel_confirmation"].any()
+    for i, (h4, d1, h1) in enumerate(zip(h4s, d1s, h1s)):
+        expected = dataclasses.astuple(compute_exit_score(h4, d1, h1))
+        assert tuple(scores[i].tolist()) == expected
@@ -0,0 +1,124 @@
+import math
+
+import numpy as np
+import pytest
+
+from data import kernels
+from data.streaming import SuperTrendState
+
+N = 40
+CLOSE = np.array([100 + 5 * math.sin(i / 3) + 0.3 * i for i in range(N)])
+HIGH = np.array([c + 1 + 0.5 * math.cos(i) for i, c in enumerate(CLOSE)])
+LOW = np.array([c - 1 - 0.5 * math.sin(i / 2) for i, c in enumerate(CLOSE)])
+
+MODES = [False] + ([True] if kernels.njit is not None else [])
+
+
+@pytest.fixture(params=MODES, ids=lambda jit: "jit" if jit else "numpy")
+def jit(request, monkeypatch):
+    monkeypatch.setattr(kernels, "JIT", request.param)
+    return request.param
+
+
+def test_atr_matches_ta_golden_values(jit):
+    # ta.volatility.AverageTrueRange(window=5)
+    expected = [1.9963186054, 2.0908284436, 2.3148433121, 2.5384437656, 2.637458357]
+    out = kernels.atr(HIGH, LOW, CLOSE, 5)
+    assert (out[:4] == 0).all()
+    np.testing.assert_allclose(out[-5:], expected, rtol=1e-9)
+
+
+def test_rsi_matches_ta_golden_values(jit):
+    # ta.momentum.RSIIndicator(window=5)
+    expected = [50.7174507454, 66.6112471788, 77.4522734164, 84.2772522206, 88.5042267667]
+    out = kernels.rsi(CLOSE, 5)
+    assert np.isnan(out[:4]).all()
+    np.testing.assert_allclose(out[-5:], expected, rtol=1e-9)
+
+
+def test_adx_matches_ta_golden_values(jit):
+    # ta.trend.ADXIndicator(window=5)
+    expected = [41.6300641478, 40.9601260987, 45.0562578756, 50.6245288125, 56.2710914757]
+    out = kernels.adx(HIGH, LOW, CLOSE, 5)
+    assert (out[:9] == 0).all()
+    np.testing.assert_allclose(out[9:12], [68.5222172117, 58.4888800584, 54.5777528264], rtol=1e-9)
+    np.testing.assert_allclose(out[-5:], expected, rtol=1e-9)
+
+
+def test_supertrend_golden_values(jit):
+    # ta 0.11 has no SuperTrend; these follow the reference definition
+    # (Wilder ATR bands ratcheting until the close crosses them).
+    flips = [(10, -1), (18, 1), (28, -1), (37, 1)]
+    out = kernels.supertrend(HIGH, LOW, CLOSE, 5, 1.5)
+    expected = np.ones(N)
+    for start, direction in flips:
+        expected[start:] = direction
+    np.testing.assert_array_equal(out, expected)
+
+
+def test_supertrend_matches_streaming_state(jit):
+    out = kernels.supertrend(HIGH, LOW, CLOSE, 5, 1.5)
+    assert list(np.flatnonzero(np.diff(out)) + 1) == [10, 18, 28, 37]
+    state = SuperTrendState(5, 1.5)
+    assert [state.update(h, lo, c) for h, lo, c in zip(HIGH, LOW, CLOSE)] == list(out)
+
+
+def test_rows_with_missing_bars_match_single_series(jit):
+    close = np.vstack([CLOSE, CLOSE])
+    high, low = np.vstack([HIGH, HIGH]), np.vstack([LOW, LOW])
+    for arr in (close, high, low):
+        arr[1, :7] = np.nan
+    out = kernels.supertrend(high, low, close, 5, 1.5)
+    np.testing.assert_array_equal(out[1, 7:], kernels.supertrend(HIGH[7:], LOW[7:], CLOSE[7:], 5, 1.5))
+    np.testing.assert_allclose(kernels.atr(high, low, close, 5)[1, 7:], kernels.atr(HIGH[7:], LOW[7:], CLOSE[7:], 5))
+    np.testing.assert_allclose(kernels.adx(high, low, close, 5)[1, 7:], kernels.adx(HIGH[7:], LOW[7:], CLOSE[7:], 5))
+    assert np.isnan(kernels.adx(high, low, close, 5)[1, :7]).all()
+
+
+def test_compiled_kernels_match_numpy(monkeypatch):
+    pytest.importorskip("numba")
+    rng = np.random.default_rng(3)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (3, 300)), axis=1))
+    high, low = close * (1 + rng.uniform(0, 0.01, close.shape)), close * (1 - rng.uniform(0, 0.01, close.shape))
+    for arr in (close, high, low):
+        arr[1, :25] = np.nan
+    kernel_calls = {
+        "ewm": lambda: kernels.ewm(close, 0.1, 5),
+        "wilder": lambda: kernels.wilder(close, 14),
+        "atr": lambda: kernels.atr(high, low, close, 14),
+        "rsi": lambda: kernels.rsi(close, 14),
+        "adx": lambda: kernels.adx(high, low, close, 14),
+        "supertrend": lambda: kernels.supertrend(high, low, close, 10, 3.0),
+    }
+    for name, call in kernel_calls.items():
+        monkeypatch.setattr(kernels, "JIT", True)
+        compiled = call()
+        monkeypatch.setattr(kernels, "JIT", False)
+        np.testing.assert_allclose(compiled, call(), rtol=1e-12, atol=1e-12, err_msg=name)
+
+
+def test_kernels_match_installed_ta(real_pandas):
+    real_pandas(
+        """
+        from ta.momentum import RSIIndicator
+        from ta.trend import ADXIndicator
+        from ta.volatility import AverageTrueRange
+
+        from data import kernels
+
+        rng = np.random.default_rng(7)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 500)))
+        high, low = close * (1 + rng.uniform(0, 0.01, 500)), close * (1 - rng.uniform(0, 0.01, 500))
+        h, l, c = pd.Series(high), pd.Series(low), pd.Series(close)
+        for window in (5, 14):
+            np.testing.assert_allclose(
+                kernels.atr(high, low, close, window),
+                AverageTrueRange(h, l, c, window).average_true_range().to_numpy(),
+                rtol=1e-10,
+            )
+            np.testing.assert_allclose(kernels.rsi(close, window), RSIIndicator(c, window).rsi().to_numpy(), rtol=1e-10)
+            np.testing.assert_allclose(
+                kernels.adx(high, low, close, window), ADXIndicator(h, l, c, window).adx().to_numpy(), rtol=1e-10
+            )
+        """
+    )
@@ -0,0 +1,230 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from data.live import Bar, LiveBarStore, ScriptedBarFeed, bucket_start
+
+NY = ZoneInfo("America/New_York")
+
+
+def five_second_bars(start, count, price=100.0):
+    return [
+        ("AAPL", Bar(start + timedelta(seconds=5 * i), price + i, price + i + 1, price + i - 1, price + i, 10.0))
+        for i in range(count)
+    ]
+
+
+def test_first_hour_bucket_starts_at_open():
+    ts = datetime(2024, 3, 1, 9, 45, tzinfo=NY)
+    assert bucket_start(ts, "1 hour", NY) == datetime(2024, 3, 1, 14, 30, tzinfo=timezone.utc)
+    later = datetime(2024, 3, 1, 10, 15, tzinfo=NY)
+    assert bucket_start(later, "1 hour", NY) == datetime(2024, 3, 1, 15, 0, tzinfo=timezone.utc)
+    assert bucket_start(later, "1 day", NY) == datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+
+def collecting_store():
+    closed = []
+    return LiveBarStore(tz=NY, on_close=lambda symbol, size, bar: closed.append((size, symbol, bar))), closed
+
+
+def test_scripted_feed_builds_hourly_and_daily_bars():
+    store, closed = collecting_store()
+    # 09:30 - 10:30 in five second steps
+    feed = ScriptedBarFeed(five_second_bars(datetime(2024, 3, 1, 9, 30, tzinfo=NY), 720))
+    feed.subscribe(["AAPL"], store.on_bar)
+    assert feed.play() == 720
+
+    assert [(size, symbol) for size, symbol, _ in closed] == [("1 hour", "AAPL")]
+    first = closed[0][2]
+    assert first.open == 100.0 and first.close == 100.0 + 359
+    assert first.volume == 3600.0
+    assert first.high == 100.0 + 360 and first.low == 99.0
+
+    hourly = store.rows("AAPL", "1 hour")
+    assert [b.ts.astimezone(NY).hour for b in hourly] == [9, 10]
+    daily = store.rows("AAPL", "1 day")
+    assert len(daily) == 1 and daily[0].volume == 7200.0
+
+
+def test_flush_closes_bucket_after_its_end():
+    store, closed = collecting_store()
+    for symbol, bar in five_second_bars(datetime(2024, 3, 1, 10, 0, tzinfo=NY), 3):
+        store.on_bar(symbol, bar)
+    store.flush(datetime(2024, 3, 1, 10, 59, tzinfo=NY))
+    assert closed == []
+    store.flush(datetime(2024, 3, 1, 11, 0, 1, tzinfo=NY))
+    assert [size for size, _, _ in closed] == ["1 hour"]
+    store.flush(datetime(2024, 3, 1, 16, 0, tzinfo=NY))
+    assert [size for size, _, _ in closed] == ["1 hour", "1 day"]
+
+
+def test_first_live_bucket_extends_seeded_partial_bar(real_pandas):
+    real_pandas(
+        """
+        from datetime import datetime, timedelta, timezone
+        from zoneinfo import ZoneInfo
+
+        from data.live import Bar, LiveBarStore
+
+        NY = ZoneInfo("America/New_York")
+        store = LiveBarStore(tz=NY)
+        # Seeded at 11:00 with yesterday's bar and today's partial one.
+        days = pd.DatetimeIndex([datetime(2024, 2, 29, tzinfo=timezone.utc), datetime(2024, 3, 1, tzinfo=timezone.utc)])
+        seed = pd.DataFrame(
+            {"open": [80.0, 90.0], "high": [85.0, 101.0], "low": [79.0, 88.0], "close": [84.0, 99.0], "volume": [2e6, 1e6]},
+            index=days,
+        )
+        store.seed("AAPL", "1 day", seed)
+        start = datetime(2024, 3, 1, 11, 0, tzinfo=NY)
+        for i in range(3):
+            store.on_bar("AAPL", Bar(start + timedelta(seconds=5 * i), 100.0, 102.0 + i, 95.0, 100.0 + i, 50.0))
+        for _ in range(2):  # the in-progress merge must not modify the seed
+            today = store.frame("AAPL", "1 day").iloc[-1]
+            assert (today["open"], today["high"], today["low"]) == (90.0, 104.0, 88.0)
+            assert (today["close"], today["volume"]) == (102.0, 1e6 + 150.0)
+        store.flush(datetime(2024, 3, 1, 16, 0, tzinfo=NY))
+        daily = store.frame("AAPL", "1 day")
+        assert len(daily) == 2 and daily["open"].iloc[-1] == 90.0 and daily["volume"].iloc[-1] == 1e6 + 150.0
+        assert daily["open"].iloc[0] == 80.0
+        """
+    )
+
+
+def test_live_indicators_match_batch(real_pandas):
+    real_pandas(
+        """
+        from datetime import datetime, timedelta, timezone
+        from zoneinfo import ZoneInfo
+
+        from data.live import Bar, LiveBarStore, LiveMarketData, ScriptedBarFeed, _streamable
+        from data.market_data import IBKRMarketData
+        from scoring.entry_scoring import COLUMNS as ENTRY
+        from scoring.exit_scoring import COLUMNS as EXIT
+
+        NY = ZoneInfo("America/New_York")
+        now = datetime(2024, 3, 1, 11, 0, 1, tzinfo=NY)
+        rng = np.random.default_rng(5)
+
+        def history(bar_size, sessions):
+            days = pd.bdate_range(end="2024-03-01", periods=sessions)
+            if bar_size == "1 day":
+                index = pd.DatetimeIndex(days).tz_localize("UTC")
+            else:
+                stamps = [f"{d.date()} {h}" for d in days for h in HOURS if d.date() < now.date() or h < "11:00"]
+                index = pd.DatetimeIndex(stamps).tz_localize("America/New_York").tz_convert("UTC")
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+            return pd.DataFrame(
+                {"open": close, "high": close * 1.01, "low": close * 0.99, "close": close, "volume": 1e5},
+                index=index,
+            )
+
+        class Offline(LiveMarketData):
+            def __post_init__(self):
+                pass
+
+            def _fetch(self, symbol, duration, bar_size):
+                return history(bar_size, int(duration.split()[0]))
+
+        ticks = [
+            ("AAPL", Bar(now + timedelta(seconds=5 * i), 101.0, 102.0 + i % 7, 99.0, 100.0 + i % 5, 500.0))
+            for i in range(1000)
+        ]
+        feed = ScriptedBarFeed(ticks)
+        md = Offline(cache=None, feed=feed, store=LiveBarStore(tz=NY))
+        md.start(["AAPL"], daily_lookback=400, now=now)
+        feed.play()  # closes the 11:00 hour; 12:00-12:23 is in progress
+
+        def batch(tf, columns):
+            return IBKRMarketData.get_bars(md, "AAPL", tf, 2, columns)
+
+        assert _streamable(EXIT["1H"]) and _streamable(ENTRY["D"])
+        for tf, columns in (("1H", EXIT["1H"]), ("D", ENTRY["D"]), ("D", EXIT["D"])):
+            streamed = md.get_bars("AAPL", tf, 2, columns)
+            expected = batch(tf, columns)
+            assert list(streamed.columns) == list(expected.columns)
+            assert list(streamed.index) == list(expected.index)
+            pd.testing.assert_frame_equal(streamed, expected, check_dtype=False, rtol=1e-9)
+        assert md.indicators.state("AAPL", "1H").latest["ts"] == pd.Timestamp("2024-03-01 16:00", tz="UTC")
+        """
+    )
+
+
+def test_restored_indicator_states_resume(real_pandas):
+    real_pandas(
+        """
+        import pickle
+        from datetime import datetime
+        from zoneinfo import ZoneInfo
+
+        from data.live import LiveBarStore, LiveMarketData, ScriptedBarFeed
+
+        NY = ZoneInfo("America/New_York")
+        days = pd.bdate_range(end="2024-03-01", periods=300)
+        close = 100 * np.exp(np.cumsum(np.random.default_rng(2).normal(0, 0.01, len(days))))
+        daily = pd.DataFrame(
+            {"open": close, "high": close * 1.01, "low": close * 0.99, "close": close, "volume": 1e5},
+            index=pd.DatetimeIndex(days).tz_localize("UTC"),
+        )
+
+        class Offline(LiveMarketData):
+            def __post_init__(self):
+                pass
+
+            def _fetch(self, symbol, duration, bar_size):
+                return daily if bar_size == "1 day" else daily.iloc[:0]
+
+        def provider():
+            return Offline(cache=None, feed=ScriptedBarFeed([]), store=LiveBarStore(tz=NY))
+
+        before = provider()
+        before.start(["AAPL"], daily_lookback=200, now=datetime(2024, 2, 29, 17, tzinfo=NY))
+        state = pickle.loads(pickle.dumps(before.checkpoint()))
+        assert set(state) == {"rollups", "indicators"}
+
+        after = provider()
+        after.restore(state)
+        restored = after.indicators.states[("AAPL", "D")]
+        now = datetime(2024, 3, 1, 17, tzinfo=NY)
+        after.start(["AAPL"], daily_lookback=200, now=now)
+        assert after.indicators.states[("AAPL", "D")] is restored
+
+        cold = provider()
+        cold.start(["AAPL"], daily_lookback=200, now=now)
+        assert restored.latest["ts"] == daily.index[-1]
+        assert restored.latest == cold.indicators.states[("AAPL", "D")].latest
+        """
+    )
+
+
+def test_live_market_data_reports_4h_closes(real_pandas):
+    real_pandas(
+        """
+        from datetime import datetime, timedelta
+        from zoneinfo import ZoneInfo
+
+        from data.live import Bar, LiveBarStore, LiveMarketData, ScriptedBarFeed
+
+        NY = ZoneInfo("America/New_York")
+
+        class Offline(LiveMarketData):
+            def __post_init__(self):
+                pass
+
+        md = Offline(cache=None, feed=ScriptedBarFeed([]), store=LiveBarStore(tz=NY))
+        md.store.on_close = md._on_close
+
+        def play(symbol, start, minutes):
+            for i in range(minutes * 12):
+                md.store.on_bar(symbol, Bar(start + timedelta(seconds=5 * i), 100.0, 101.0, 99.0, 100.0, 10.0))
+
+        play("AAPL", datetime(2024, 3, 1, 10, 55, tzinfo=NY), 10)
+        assert md.pop_4h_closes() == []  # the 10:00 hour is inside the 09:30-13:00 bucket
+        play("AAPL", datetime(2024, 3, 1, 12, 55, tzinfo=NY), 10)
+        play("MSFT", datetime(2024, 3, 1, 12, 55, tzinfo=NY), 10)
+        assert md.pop_4h_closes() == ["AAPL", "MSFT"]
+        assert md.pop_4h_closes() == []
+
+        play("AAPL", datetime(2024, 3, 1, 15, 55, tzinfo=NY), 5)
+        md.flush(datetime(2024, 3, 1, 16, 0, 1, tzinfo=NY))
+        assert md.pop_4h_closes() == ["AAPL"]
+        """
+    )
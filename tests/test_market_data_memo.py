@@ -0,0 +1,148 @@
+import asyncio
+
+import pandas as pd
+import pytest
+
+from data.async_market_data import AsyncIBKRMarketData
+from data.market_data import YFinanceMarketData
+
+
+class CountingMarketData(YFinanceMarketData):
+    """Test double counting provider loads instead of hitting the network."""
+
+    def __post_init__(self) -> None:
+        self.loads = []
+
+    def _load(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:
+        self.loads.append((symbol, duration, bar_size))
+        return pd.DataFrame({"close": [1.0, 2.0]})
+
+
+def test_download_memoised_within_cycle():
+    md = CountingMarketData(cache=None)
+    first = md._download("AAPL", "60 D", "1 hour")
+    first["sma20"] = [0.0, 0.0]
+    second = md._download("AAPL", "60 D", "1 hour")
+    assert md.loads == [("AAPL", "60 D", "1 hour")]
+    assert list(second.columns) == ["close"]
+
+
+def test_begin_cycle_invalidates_memo():
+    md = CountingMarketData(cache=None)
+    md._download("AAPL", "60 D", "1 hour")
+    md.begin_cycle()
+    md._download("AAPL", "60 D", "1 hour")
+    assert len(md.loads) == 2
+
+
+class CountingAsyncMarketData(AsyncIBKRMarketData):
+    def __post_init__(self) -> None:
+        self.loads = []
+
+    async def _load_async(self, symbol: str, duration: str, bar_size: str) -> pd.DataFrame:
+        self.loads.append((symbol, duration, bar_size))
+        if symbol == "BAD" or (symbol == "FLAKY" and self.loads.count(self.loads[-1]) == 1):
+            raise RuntimeError("no data")
+        return pd.DataFrame({"close": [1.0]})
+
+
+def test_prefetch_async_dedupes_and_fills_memo():
+    md = CountingAsyncMarketData(cache=None)
+    requests = [("AAPL", "4H", 2), ("AAPL", "1H", 2), ("AAPL", "D", 2), ("BAD", "D", 2), ("FLAKY", "D", 2)]
+    asyncio.run(md.prefetch_async(requests))
+    assert sorted(md.loads) == sorted(
+        [("AAPL", "130 D", "1 hour"), ("AAPL", "202 D", "1 day")]
+        + 2 * [("BAD", "202 D", "1 day"), ("FLAKY", "202 D", "1 day")]
+    )
+    md._download("AAPL", "130 D", "1 hour")
+    md._download("FLAKY", "202 D", "1 day")
+    assert len(md.loads) == 6
+    assert ("BAD", "202 D", "1 day") not in md._memo
+
+
+def test_failed_prefetch_is_not_retried_synchronously():
+    md = CountingAsyncMarketData(cache=None)
+    asyncio.run(md.prefetch_async([("BAD", "D", 2)]))
+    with pytest.raises(RuntimeError, match="failed this cycle"):
+        md.get_bars("BAD", "D", 2)
+    assert len(md.loads) == 2
+
+    md.begin_cycle()
+    md._fetch = lambda symbol, duration, bar_size: pd.DataFrame({"close": [1.0]})
+    assert list(md._download("BAD", "202 D", "1 day")["close"]) == [1.0]
+
+
+def test_last_closed_bar_follows_the_session_grid():
+    from datetime import datetime
+    from zoneinfo import ZoneInfo
+
+    md = CountingMarketData(cache=None)
+    ny = ZoneInfo("America/New_York")
+
+    def closed(tf, *when):
+        now = datetime(2024, 3, 1, *when, tzinfo=ny).timestamp()
+        return datetime.fromtimestamp(md.last_closed_bar("AAPL", tf, now) / 1e9, ny)
+
+    assert closed("1H", 10) == datetime(2024, 3, 1, 9, 30, tzinfo=ny)
+    assert closed("4H", 12, 59) == closed("4H", 10) < closed("4H", 13)
+    assert closed("4H", 13) == datetime(2024, 3, 1, 9, 30, tzinfo=ny)
+    assert closed("4H", 16) == datetime(2024, 3, 1, 13, tzinfo=ny)
+    assert closed("D", 15, 59) < closed("D", 16) == closed("D", 18)
+
+
+def test_yfinance_grouped_download_split_and_fallback(real_pandas, tmp_path):
+    real_pandas(
+        f"""
+        import types
+
+        from data.bar_cache import BarCache
+        from data.market_data import YFinanceMarketData
+
+        calls = []
+        index = pd.date_range("2024-03-01", periods=3, freq="D")
+
+        def ohlcv(base):
+            return pd.DataFrame(
+                {{"Open": base, "High": base + 1, "Low": base - 1, "Close": base + 0.5, "Volume": 1e6}},
+                index=index,
+            )
+
+        def download(tickers, period, interval, **kwargs):
+            calls.append((tuple(tickers), period, interval))
+            if "FAIL" in tickers:
+                raise RuntimeError("rate limited")
+            if len(tickers) == 1:
+                return ohlcv(1.0)
+            raw = pd.concat({{t: ohlcv(float(i)) for i, t in enumerate(tickers) if t != "GONE"}}, axis=1)
+            raw.loc[index[0], ("AAA", "Close")] = np.nan  # half-filled row from Yahoo
+            return raw
+
+        sys.modules["yfinance"] = types.SimpleNamespace(download=download)
+
+        md = YFinanceMarketData(cache=None)
+        frames = md._fetch_many(["AAA", "BBB", "GONE"], "5 D", "1 day")
+        assert calls == [(("AAA", "BBB", "GONE"), "5d", "1d")]
+        assert list(frames["BBB"].columns) == ["open", "high", "low", "close", "volume"]
+        assert frames["BBB"]["close"].tolist() == [1.5, 1.5, 1.5]
+        assert str(frames["BBB"].index.tz) == "UTC"
+        assert len(frames["AAA"]) == 2 and frames["GONE"].empty
+
+        # One grouped call for the uncached symbols, none for the fresh cache entry.
+        cache = BarCache(Path({str(tmp_path)!r}), ttl_sec=600)
+        cache.store("CCC", "1 day", ohlcv(7.0).rename(columns=str.lower).tz_localize("UTC"), "250 D", 3)
+        md = YFinanceMarketData(cache=cache)
+        calls.clear()
+        md.prefetch([("AAA", "D", 1), ("BBB", "D", 1), ("CCC", "D", 1)])
+        duration = md._raw_request("D", 1)[0]
+        assert calls == [(("AAA", "BBB"), duration.lower().replace(" ", ""), "1d")]
+        assert md.get_bars("CCC", "D", 1, columns=())["close"].iloc[-1] == 7.5
+        assert len(calls) == 1
+
+        # A failed bulk download leaves the symbols to the per-symbol path.
+        md = YFinanceMarketData(cache=None)
+        calls.clear()
+        md.prefetch([("FAIL", "D", 1), ("BBB", "D", 1)])
+        assert md.get_bars("BBB", "D", 1, columns=())["close"].iloc[-1] == 1.5
+        assert calls[1:] == [(("BBB",), duration.lower().replace(" ", ""), "1d")]
+        """
+    )
@@ -0,0 +1,83 @@
+import math
+
+import numpy as np
+
+from backtest.metrics import (
+    StreamingMetrics,
+    calmar,
+    drawdown_duration,
+    exposure,
+    hit_rate,
+    max_drawdown,
+    profit_factor,
+    returns,
+    rolling_sharpe,
+    sharpe,
+    sortino,
+    summary,
+)
+
+
+def test_matrix_rows_match_single_curves():
+    rng = np.random.default_rng(0)
+    curves = 100 * np.cumprod(1 + rng.normal(0.001, 0.02, (5, 250)), axis=1)
+    table = summary(curves, years=1.0, periods=252)
+    for i, curve in enumerate(curves):
+        single = summary(curve, years=1.0, periods=252)
+        for name, values in table.items():
+            assert np.isclose(values[i], single[name]), name
+            assert isinstance(single[name], (float, int))
+
+
+def test_drawdown_metrics():
+    equity = np.array([100.0, 120.0, 90.0, 100.0, 130.0, 125.0])
+    assert np.isclose(max_drawdown(equity), 0.25)
+    assert drawdown_duration(equity) == 2
+    assert drawdown_duration([1.0, 2.0, 3.0]) == 0
+    assert np.isclose(calmar(equity, 1.0), (1.25 ** 1.0 - 1) / 0.25)
+    assert calmar([1.0, 2.0], 1.0) == 0.0
+
+
+def test_return_ratios():
+    r = np.array([0.02, -0.01, 0.03, -0.02, 0.01])
+    assert np.isclose(sharpe(r), r.mean() / r.std())
+    assert np.isclose(sharpe(r, periods=252), r.mean() / r.std() * math.sqrt(252))
+    assert sharpe([0.01, 0.01]) == 0.0
+    assert sharpe(iter([0.01, 0.03])) == sharpe([0.01, 0.03])
+    downside = math.sqrt((0.01**2 + 0.02**2) / 5)
+    assert np.isclose(sortino(r), r.mean() / downside)
+    assert np.allclose(returns([100.0, 110.0, 99.0]), [0.1, -0.1])
+
+
+def test_rolling_sharpe_matches_windows():
+    rng = np.random.default_rng(1)
+    r = rng.normal(0, 0.01, (3, 40))
+    r[0, :10] = 0.01  # constant window
+    rolled = rolling_sharpe(r, 10)
+    assert rolled.shape == (3, 31)
+    for row in range(3):
+        expected = [sharpe(r[row, i : i + 10]) for i in range(31)]
+        assert np.allclose(rolled[row], expected)
+
+
+def test_trade_metrics_ignore_missing_trades():
+    trades = np.array([[0.05, np.nan, -0.02, 0.01], [np.nan, np.nan, np.nan, np.nan]])
+    assert np.allclose(hit_rate(trades), [2 / 3, 0.0])
+    assert np.allclose(profit_factor(trades), [3.0, 0.0])
+    assert profit_factor([0.1, 0.2]) == math.inf
+    assert np.allclose(exposure(np.array([[0, 10, 10, 0], [5, 5, 5, 5]])), [0.5, 1.0])
+
+
+def test_streaming_matches_batch():
+    pnl = [500.0, -200.0, 300.0, -400.0, 100.0]
+    live = StreamingMetrics(10_000.0)
+    for p in pnl:
+        live.close_trade(p)
+    equity = 10_000.0 + np.cumsum([0.0] + pnl)
+    trade_returns = np.array(pnl) / equity[:-1]
+    assert live.trades == 5 and live.equity == equity[-1]
+    assert np.isclose(live.hit_rate, hit_rate(pnl))
+    assert np.isclose(live.profit_factor, profit_factor(pnl))
+    assert np.isclose(live.max_dd, max_drawdown(equity))
+    assert np.isclose(live.sharpe, sharpe(trade_returns))
+    assert np.isclose(live.sortino, sortino(trade_returns))
@@ -0,0 +1,30 @@
+import sys, pathlib; sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import asyncio
+import json
+
+from scoring.sentiment import FileNewsProvider, NewsCache
+
+
+def test_news_cache_batches_expires_and_evicts(tmp_path):
+    path = tmp_path / "news.json"
+    path.write_text(json.dumps({"AAPL": "pos", "MSFT": "neg"}))
+    provider = FileNewsProvider(path)
+    now = [0.0]
+    cache = NewsCache(provider, ttl=60, maxsize=2, clock=lambda: now[0])
+
+    assert asyncio.run(cache.refresh(["AAPL", "MSFT", "AAPL"])) == {"AAPL": "pos", "MSFT": "neg"}
+    assert provider.requests == 1
+    assert cache.get("AAPL") == "pos"
+    asyncio.run(cache.refresh(["AAPL", "MSFT"]))
+    assert provider.requests == 1 and (cache.hits, cache.misses) == (2, 2)
+
+    asyncio.run(cache.refresh(["NVDA"]))
+    assert cache.get("MSFT") is None  # least recently used
+    assert cache.get("NVDA") == "neutral"
+
+    now[0] = 61.0
+    assert cache.get("AAPL") is None
+    asyncio.run(cache.refresh(["AAPL"]))
+    assert provider.requests == 3
+
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+import time
+
+from data.pacing import PacingScheduler, Priority, TokenBucket, current_priority, prioritised
+
+
+def test_token_bucket_matches_sliding_window():
+    bucket = TokenBucket(2, 10.0)
+    bucket.take(0.0)
+    bucket.take(1.0)
+    assert bucket.tokens(5.0) == 0
+    assert bucket.wait_time(5.0) == 5.0
+    assert bucket.tokens(10.0) == 1
+
+
+def test_prioritised_context():
+    assert current_priority() is Priority.ENTRY
+    with prioritised(Priority.EXIT):
+        assert current_priority() is Priority.EXIT
+    assert current_priority() is Priority.ENTRY
+
+
+def test_exit_requests_overtake_queued_entries():
+    pacer = PacingScheduler(limits=((1, 0.3),))
+    pacer.acquire(Priority.ENTRY)
+    order = []
+
+    def worker(priority):
+        pacer.acquire(priority)
+        order.append(priority)
+
+    entry = threading.Thread(target=worker, args=(Priority.ENTRY,))
+    entry.start()
+    while pacer.stats()["ENTRY"]["queued"] == 0:
+        time.sleep(0.005)
+    exit_ = threading.Thread(target=worker, args=(Priority.EXIT,))
+    exit_.start()
+    entry.join()
+    exit_.join()
+    assert order == [Priority.EXIT, Priority.ENTRY]
+    stats = pacer.stats()
+    assert stats["ENTRY"]["served"] == 2 and stats["EXIT"]["served"] == 1
+    assert stats["ENTRY"]["max_wait"] > 0.3
+
+
+def test_acquire_async_respects_limit():
+    pacer = PacingScheduler(limits=((2, 0.2),))
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(pacer.acquire_async() for _ in range(3)))
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.19
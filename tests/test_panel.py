@@ -0,0 +1,104 @@
+import math
+
+import numpy as np
+
+from data import kernels, panel
+from data.streaming import EMA, SuperTrendState, WilderATR, WilderRSI
+
+
+def make_ohlc(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, (3, n)).cumsum(axis=1)
+    high = close + rng.random((3, n))
+    low = close - rng.random((3, n))
+    close[2, :30] = high[2, :30] = low[2, :30] = np.nan  # late listing
+    return high, low, close
+
+
+def test_sma_handles_late_start():
+    _, _, close = make_ohlc()
+    out = panel.sma(close, 5)
+    assert np.isnan(out[2, :34]).all()
+    assert math.isclose(out[2, 34], close[2, 30:35].mean())
+    assert math.isclose(out[0, -1], close[0, -5:].mean())
+
+
+def test_recursive_indicators_match_streaming_state():
+    high, low, close = make_ohlc()
+    ema = panel.ema(close, 12)
+    rsi = panel.rsi(close, 14)
+    atr = kernels.atr(high, low, close, 10)
+    st = panel.supertrend(high, low, close, period=10, multiplier=3.0)
+    for row in range(3):
+        s_ema, s_rsi, s_atr, s_st = EMA.from_span(12), WilderRSI(14), WilderATR(10), SuperTrendState(10, 3.0)
+        for t in range(close.shape[1]):
+            if np.isnan(close[row, t]):
+                continue
+            h, lo, c = high[row, t], low[row, t], close[row, t]
+            np.testing.assert_allclose(s_ema.update(c), ema[row, t], equal_nan=True)
+            np.testing.assert_allclose(s_rsi.update(c), rsi[row, t], equal_nan=True)
+            np.testing.assert_allclose(s_atr.update(h, lo, c), atr[row, t])
+            assert s_st.update(h, lo, c) == st[row, t]
+
+
+def test_obv_and_adx_shapes():
+    high, low, close = make_ohlc()
+    volume = np.ones_like(close)
+    obv = panel.obv(close, volume)
+    assert obv[0, 0] == -1.0
+    adx = panel.adx(high, low, close, 14)
+    assert adx.shape == close.shape
+    assert np.nanmax(adx) <= 100.0
+
+
+def test_gapped_ignores_late_listings():
+    high, low, close = make_ohlc()
+    close[1, 60:62] = np.nan
+    aligned = panel.Panel(["A", "B", "C"], np.arange(close.shape[1]), {"close": close})
+    assert aligned.gapped() == ["B"]
+
+
+def test_panel_get_bars_matches_per_symbol_path(real_pandas):
+    real_pandas(
+        """
+        from data.market_data import IBKRMarketData
+        from scoring.entry_scoring import COLUMNS as ENTRY
+        from scoring.exit_scoring import COLUMNS as EXIT
+        from scoring.regime import COLUMNS as REGIME
+
+        session = Session()
+        rng = np.random.default_rng(4)
+        days = pd.bdate_range("2023-01-02", "2024-03-01")
+        stamps = [f"{day.date()} {hour}" for day in days for hour in HOURS]
+        index = pd.DatetimeIndex(stamps).tz_localize("America/New_York").tz_convert("UTC")
+        hourly = {}
+        for symbol in ("AAA", "BBB", "LATE", "GAP"):
+            close = 100 * np.exp(np.cumsum(rng.normal(0, 0.006, len(index))))
+            hourly[symbol] = pd.DataFrame(
+                {"open": close, "high": close * 1.003, "low": close * 0.997, "close": close, "volume": 1e5},
+                index=index,
+            )
+        hourly["LATE"] = hourly["LATE"].iloc[700:]
+        hourly["GAP"] = hourly["GAP"].drop(hourly["GAP"].index[1500:1540])
+        bars = {(s, "1 hour"): df for s, df in hourly.items()}
+        bars.update({(s, "1 day"): rollup(df, "1 day", "1 hour", session) for s, df in hourly.items()})
+
+        class Offline(IBKRMarketData):
+            def __post_init__(self):
+                pass
+
+            def _fetch(self, symbol, duration, bar_size):
+                return bars[(symbol, bar_size)]
+
+        columns = {"D": ENTRY["D"] + EXIT["D"] + REGIME, "4H": ENTRY["4H"] + EXIT["4H"]}
+        panels = Offline(cache=None)
+        for tf in columns:
+            assert list(panels.load_panel(list(hourly), tf, 2).symbols) == ["AAA", "BBB", "LATE"]
+        for symbol in hourly:
+            for tf, cols in columns.items():
+                for request in (cols, ("sma50", "sma200", "adx"), None):
+                    expected = Offline(cache=None).get_bars(symbol, tf, 2, request)
+                    got = panels.get_bars(symbol, tf, 2, request)
+                    pd.testing.assert_frame_equal(got, expected, check_dtype=False, check_freq=False, rtol=1e-9)
+        """
+    )
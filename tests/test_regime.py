@@ -29,3 +29,22 @@ def test_regime_ranging():
 def test_regime_risk_off():
     df = make_df(80, 100, 90, 25)
     assert detect_regime(df, vix=30) == "RO"
+
+
+def test_detect_regimes_matches_scalar():
+    import numpy as np
+
+    from scoring.regime import detect_regimes
+
+    rng = np.random.default_rng(0)
+    n = 40
+    close = 100 + rng.normal(0, 2, n)
+    sma50 = 100 + np.cumsum(rng.normal(0, 0.01, n))
+    sma200 = 98 + rng.normal(0, 1, n)
+    adx = rng.uniform(10, 30, n)
+    vix = rng.uniform(12, 35, n)
+    labels = detect_regimes(close, sma50, sma200, adx, vix)
+    for t in range(n):
+        columns = {"close": close, "sma50": sma50, "sma200": sma200, "adx": adx}
+        df = pd.DataFrame({name: list(values[: t + 1]) for name, values in columns.items()})
+        assert labels[t] == detect_regime(df, float(vix[t]))
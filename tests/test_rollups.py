@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from data.rollups import RollupEngine, Session, bucket_ends, bucket_labels
+
+SESSION = Session(ZoneInfo("America/New_York"))
+HOUR = 3_600 * 10**9
+
+
+def ns(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp()) * 10**9
+
+
+def hourly(days):
+    """RTH 1H bar starts (EDT) for July ``days`` of 2024."""
+
+    ts = []
+    for day in days:
+        ts.append(ns(2024, 7, day, 13, 30))
+        ts.extend(ns(2024, 7, day, h) for h in range(14, 20))
+    ts = np.array(ts, dtype=np.int64)
+    close = np.arange(len(ts), dtype=float)
+    return ts, {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": np.ones(len(ts))}
+
+
+def test_4h_buckets_split_at_the_session_edges():
+    ts, cols = hourly([1, 2])
+    engine = RollupEngine("4 hours", session=SESSION)
+    engine.append(ts, **cols)
+    out = engine.arrays()
+    assert list(out["ts"]) == [ns(2024, 7, 1, 13, 30), ns(2024, 7, 1, 17), ns(2024, 7, 2, 13, 30), ns(2024, 7, 2, 17)]
+    assert list(out["volume"]) == [4.0, 3.0, 4.0, 3.0]
+    assert list(out["open"]) == [0.0, 4.0, 7.0, 11.0]
+    assert list(out["close"]) == [3.0, 6.0, 10.0, 13.0]
+    assert list(out["high"]) == [4.0, 7.0, 11.0, 14.0]
+
+
+def test_incremental_append_matches_one_shot():
+    ts, cols = hourly([1, 2, 3])
+    full = RollupEngine("4 hours", session=SESSION)
+    full.append(ts, **cols)
+    engine = RollupEngine("4 hours", session=SESSION)
+    for i in range(1, len(ts) + 1):
+        lo = max(i - 3, 0)  # overlapping windows re-send already folded bars
+        engine.append(ts[lo:i], **{k: v[lo:i] for k, v in cols.items()})
+    for key, value in full.arrays().items():
+        assert list(engine.arrays()[key]) == list(value)
+
+
+def test_revised_last_bar_replaces_it():
+    ts, cols = hourly([1])
+    engine = RollupEngine("4 hours", session=SESSION)
+    engine.append(ts, **cols)
+    engine.append(ts[-1:], open=[6.0], high=[50.0], low=[5.0], close=[9.0], volume=[2.0])
+    out = engine.arrays()
+    assert out["high"][-1] == 50.0 and out["close"][-1] == 9.0 and out["volume"][-1] == 4.0
+
+
+def test_first_hour_bucket_starts_at_the_open():
+    ts = np.array([ns(2024, 7, 1, 13, 30), ns(2024, 7, 1, 13, 59, 55), ns(2024, 7, 1, 14)])
+    labels = bucket_labels(ts, "1 hour", SESSION)
+    assert list(labels) == [ns(2024, 7, 1, 13, 30), ns(2024, 7, 1, 13, 30), ns(2024, 7, 1, 14)]
+
+
+def test_daily_bars_roll_up_to_monday_weeks():
+    days = np.array([ns(2024, 7, d) for d in (1, 5, 8, 12)], dtype=np.int64)
+    labels = bucket_labels(days, "1 week", SESSION, dated=True)
+    assert list(labels) == [ns(2024, 7, 1)] * 2 + [ns(2024, 7, 8)] * 2
+
+
+def test_bucket_ends_follow_session_grid():
+    session = SESSION
+    # 2024-03-05, New York is UTC-5: 09:30 open is 14:30 UTC, 16:00 close is 21:00 UTC.
+    assert bucket_ends([ns(2024, 3, 5, 14, 30), ns(2024, 3, 5, 20)], "1 hour", session).tolist() == [
+        ns(2024, 3, 5, 15),
+        ns(2024, 3, 5, 21),
+    ]
+    assert bucket_ends([ns(2024, 3, 5, 14, 30), ns(2024, 3, 5, 18)], "4 hours", session).tolist() == [
+        ns(2024, 3, 5, 18),
+        ns(2024, 3, 5, 21),
+    ]
+    assert bucket_ends([ns(2024, 3, 5), ns(2024, 7, 5)], "1 day", session).tolist() == [
+        ns(2024, 3, 5, 21),
+        ns(2024, 7, 5, 20),
+    ]
@@ -0,0 +1,65 @@
+import sys, pathlib; sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pytest
+
+from scoring import entry_scoring
+from scoring.rules import Rule, RuleSet, columns, compile_condition
+
+
+def _env_tables(**cols):
+    return {"D": {k: np.asarray(v, dtype=float) for k, v in cols.items()}}
+
+
+def test_conditions_follow_python_semantics():
+    rules = RuleSet(
+        [
+            Rule("chain", "a", 1, "1 <= D.x < 3"),
+            Rule("prev", "a", 2, "D.x > prev(D.x) and not D.flag"),
+            Rule("truthy", "b", 4, "D.flag or D.missing > 0"),
+        ],
+        multipliers={"X": {"a": 0.5}},
+        defaults={"missing": 1},
+    ).compile()
+    tables = _env_tables(x=[[0, 1, 3, 2]], flag=[[0, 0, np.nan, 0]])
+    fired = rules.conditions(tables)
+    assert fired.tolist() == [[[True, False, True]], [[True, False, False]], [[True, True, True]]]
+    points = rules.evaluate(tables, "X")
+    assert points["a"].tolist() == [[1.5, 0.0, 0.5]]
+    assert points["b"].tolist() == [[4.0, 4.0, 4.0]]
+    assert columns(rules.rule_set) == {"D": ("x", "flag", "missing")}
+
+
+def test_unknown_syntax_and_columns_are_rejected():
+    with pytest.raises(ValueError):
+        compile_condition("D.x.__class__ or __import__('os')")
+    with pytest.raises(KeyError):
+        RuleSet([Rule("r", "a", 1, "D.nope > 0")]).compile().conditions(_env_tables(x=[[1, 2]]))
+
+
+def test_panel_evaluation_and_weight_sweep_match_tables(tmp_path):
+    rng = np.random.default_rng(0)
+    names = ("close", "sma50", "sma200", "rsi", "macd_line", "macd_signal", "macd_hist", "bb_pos")
+    daily = {name: rng.normal(50, 20, (4, 30)) for name in names}
+    h4 = {"supertrend": rng.choice([-1.0, 1.0], (4, 30)), "rsi": rng.uniform(40, 70, (4, 30))}
+    compiled = entry_scoring.RULES.compile()
+    panel = compiled.evaluate({"D": daily, "H4": h4}, "RG")
+    for t in range(1, 30):
+        window = {tf: {k: v[:, t - 1 : t + 1] for k, v in table.items()} for tf, table in (("D", daily), ("H4", h4))}
+        for name, values in compiled.evaluate(window, "RG").items():
+            assert values[:, 0].tolist() == panel[name][:, t - 1].tolist()
+
+    weights = np.stack([compiled.weights, compiled.weights * 2])
+    swept = compiled.components(compiled.conditions({"D": daily, "H4": h4}), "RG", weights)
+    doubled = entry_scoring.RULES.with_weights({r.name: r.weight * 2 for r in entry_scoring.RULES.rules}).compile()
+    for name, values in doubled.evaluate({"D": daily, "H4": h4}, "RG").items():
+        assert np.array_equal(swept[name][0], panel[name])
+        assert np.array_equal(swept[name][1], values)
+
+    path = tmp_path / "rules.csv"
+    path.write_text("name,component,weight,condition\n" + "".join(
+        f'{r.name},{r.component},{r.weight},"{r.condition}"\n' for r in entry_scoring.RULES.rules
+    ))
+    loaded = RuleSet.from_csv(path, multipliers=entry_scoring.REGIME_MULT, defaults=entry_scoring.DEFAULTS).compile()
+    for name, values in loaded.evaluate({"D": daily, "H4": h4}, "RG").items():
+        assert np.array_equal(values, panel[name])
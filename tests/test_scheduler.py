@@ -23,6 +23,16 @@ def test_scheduler_runs_on_4h_close_once():
     assert sched.should_run_primary(dt2) is False
 
 
+def test_scheduler_runs_once_per_boundary_minute():
+    tz = ZoneInfo("America/New_York")
+    sched = Scheduler(tz="America/New_York")
+    boundary = datetime(2024, 1, 1, 14, 0, tzinfo=tz)
+    # The live loop ticks every few seconds through the boundary minute.
+    ticks = [boundary + timedelta(seconds=s) for s in range(0, 60, 5)]
+    assert [sched.should_run_primary(t) for t in ticks].count(True) == 1
+    assert sched.should_run_primary(datetime(2024, 1, 1, 18, 0, 3, tzinfo=tz)) is True
+
+
 def test_scheduler_next_run_interval():
     tz = ZoneInfo("America/New_York")
     sched = Scheduler(tz="America/New_York")
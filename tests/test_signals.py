@@ -0,0 +1,96 @@
+import numpy as np
+
+from backtest.signals import SignalMatrix, chain, simulate
+from scoring.entry_scoring import DEFAULTS, compute_entry_scores
+
+
+def test_chain_skips_entries_while_in_a_trade():
+    entries = np.zeros((1, 10), dtype=bool)
+    entries[0, [0, 2, 4, 6]] = True
+    exit_bars = np.full((1, 10), 9)
+    exit_bars[0, [0, 2, 4, 6]] = [3, 5, 6, 8]
+    assert list(np.flatnonzero(chain(entries, exit_bars)[0])) == [0, 4]
+
+
+def test_chain_matches_sequential_walk():
+    rng = np.random.default_rng(1)
+    entries = rng.random((5, 300)) < 0.2
+    exit_bars = np.arange(300) + rng.integers(0, 12, (5, 300))
+    taken = chain(entries, exit_bars)
+    for row in range(5):
+        expected, free = [], 0
+        for bar in np.flatnonzero(entries[row]):
+            if bar >= free:
+                expected.append(bar)
+                free = exit_bars[row, bar] + 1
+        assert list(np.flatnonzero(taken[row])) == expected
+
+
+def test_simulate_bracket_half_target_then_stop():
+    prices = {
+        "open": np.array([[100.0, 100.0, 96.0, 96.0]]),
+        "high": np.array([[100.0, 102.5, 97.0, 97.0]]),
+        "low": np.array([[100.0, 99.0, 94.0, 96.0]]),
+        "close": np.array([[100.0, 101.0, 96.0, 96.0]]),
+    }
+    entries = np.array([[True, False, False, False]])
+    taken, exit_bars, returns = simulate(prices, entries, np.zeros_like(entries), max_hold=3)
+    assert taken[0, 0] and exit_bars[0, 0] == 2
+    # Half at pt1 (102), half at the 95 stop.
+    assert abs(returns[0, 0] - (-0.015)) < 1e-12
+
+
+def test_entry_scores_match_batch_scorer():
+    rng = np.random.default_rng(0)
+    symbols, bars = 6, 4
+    daily_cols = [c for c in DEFAULTS if c not in ("pullback", "extended", "gap_up")] + ["close", "sma50", "sma200"]
+    daily = {c: rng.normal(50, 20, (symbols, bars, 2)) for c in daily_cols}
+    daily["supertrend"] = np.sign(rng.normal(size=(symbols, bars, 2)))
+    for flag in ("pullback", "extended", "gap_up"):
+        daily[flag] = rng.random((symbols, bars, 2)) < 0.5
+    h4 = {"supertrend": np.sign(rng.normal(size=(symbols, bars, 2))), "rsi": rng.normal(55, 10, (symbols, bars, 2))}
+    close = rng.normal(100, 1, (symbols, bars))
+    prices = {name: close for name in ("open", "high", "low", "close")}
+    matrix = SignalMatrix.from_tables(range(symbols), np.arange(bars), prices, {"D": daily, "H4": h4}, regime="RG")
+    scores = matrix.entry_scores()
+    for bar in range(bars):
+        expected, _ = compute_entry_scores(
+            {k: v[:, bar] for k, v in daily.items()}, {k: v[:, bar] for k, v in h4.items()}, "RG", {"fg": 50}
+        )
+        assert np.allclose(scores[:, bar], expected)
+
+
+def test_research_modules_do_not_import_the_bot(real_pandas):
+    real_pandas(
+        """
+        import backtest.signals, backtest.sweep, backtest.walkforward
+
+        assert "main" not in sys.modules and "ib_insync" not in sys.modules
+        """
+    )
+
+
+def test_earnings_blackout_blocks_matrix_entries(real_pandas, tmp_path):
+    real_pandas(
+        f"""
+        from datetime import date
+
+        from backtest.signals import SignalMatrix, SignalParams
+        from config import overridden
+        from scoring.earnings import EarningsCalendar
+
+        store = synthetic_store({str(tmp_path)!r}, ["SPY", "AAA", "BBB", "VIX"], "2022-06-01", "2023-03-31")
+        calendar = EarningsCalendar.from_rows([("AAA", "2023-03-15")], before=3, after=1)
+        args = (store, ["AAA", "BBB"], date(2023, 3, 1), date(2023, 3, 31))
+        matrix = SignalMatrix.from_store(*args, calendar=calendar)
+        days = pd.to_datetime(matrix.times, utc=True).tz_convert("America/New_York").date
+        window = (days >= date(2023, 3, 12)) & (days <= date(2023, 3, 16))
+        assert matrix.blackout.tolist() == [window.tolist(), [False] * len(days)]
+
+        result = matrix.run(SignalParams(entry_threshold=0))
+        assert result.trades > 0 and not (result.entries & matrix.blackout).any()
+        assert matrix.window(5, 10).blackout.shape == (2, 5)
+        with overridden(earnings_policy="ALLOW"):
+            assert SignalMatrix.from_store(*args, calendar=calendar).blackout is None
+        """
+    )
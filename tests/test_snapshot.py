@@ -0,0 +1,74 @@
+import sys, pathlib; sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from main import TradingBot
+from exec.state import PositionState
+from storage.snapshot import load_snapshot, save_snapshot
+
+
+class CheckpointingMarketData:
+    def __init__(self):
+        self.state = {}
+
+    def checkpoint(self):
+        return dict(self.state)
+
+    def restore(self, state):
+        self.state.update(state)
+
+
+class HoldingBroker:
+    def __init__(self, held):
+        self.held = held
+
+    def get_positions(self):
+        return dict(self.held)
+
+
+def _bot(held=None):
+    return TradingBot(CheckpointingMarketData(), broker=HoldingBroker(held or {}))
+
+
+def test_snapshot_round_trip(tmp_path):
+    bot = _bot()
+    bot.positions["AAPL"] = PositionState.FILLED
+    bot.position_sizes["AAPL"] = 10
+    bot.scores["AAPL"] = {"entry": 92.5}
+    bot.market_data.state["indicators"] = {("AAPL", "D"): {"last_ts": 1.0}}
+    path = tmp_path / "warm.pkl.gz"
+    save_snapshot(bot, path)
+
+    fresh = _bot()
+    assert load_snapshot(fresh, path)
+    assert fresh.positions == {"AAPL": PositionState.FILLED}
+    assert fresh.position_sizes == {"AAPL": 10}
+    assert fresh.scores == {"AAPL": {"entry": 92.5}}
+    assert fresh.market_data.state == bot.market_data.state
+
+
+def test_stale_or_corrupt_snapshot_is_ignored(tmp_path):
+    bot = _bot()
+    bot.position_sizes["MSFT"] = 5
+    path = tmp_path / "warm.pkl.gz"
+    save_snapshot(bot, path)
+    assert not load_snapshot(_bot(), path, max_age_sec=-1)
+
+    path.write_bytes(b"not a snapshot")
+    fresh = _bot()
+    assert not load_snapshot(fresh, path)
+    assert not load_snapshot(fresh, tmp_path / "missing.pkl.gz")
+    assert fresh.position_sizes == {}
+
+
+def test_restored_positions_are_reconciled_with_the_broker(tmp_path):
+    bot = _bot()
+    bot.positions.update({"AAPL": PositionState.MANAGED, "MSFT": PositionState.FILLED})
+    bot.position_sizes.update({"AAPL": 10, "MSFT": 5})
+    path = tmp_path / "warm.pkl.gz"
+    save_snapshot(bot, path)
+
+    # MSFT was stopped out and NVDA bought while the bot was down.
+    fresh = _bot({"AAPL": 7, "NVDA": 3})
+    assert load_snapshot(fresh, path)
+    fresh.reconcile_positions()
+    assert fresh.positions == {"AAPL": PositionState.MANAGED, "NVDA": PositionState.MANAGED}
+    assert fresh.position_sizes == {"AAPL": 7, "NVDA": 3}
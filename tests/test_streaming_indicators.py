@@ -0,0 +1,80 @@
+import math
+
+import pandas as pd
+
+from data.streaming import EMA, IndicatorEngine, IndicatorState, OBVState, RollingWindow, WilderRSI
+
+
+def test_rolling_window_mean_and_std():
+    win = RollingWindow(3)
+    for value in [1.0, 2.0, 3.0, 4.0]:
+        win.update(value)
+    assert win.mean == 3.0
+    assert math.isclose(win.std, math.sqrt(2 / 3))
+
+
+def test_ema_matches_recursive_definition():
+    ema = EMA.from_span(3)
+    values = [10.0, 11.0, 12.0, 11.0]
+    expected = values[0]
+    for v in values:
+        out = ema.update(v)
+    for v in values[1:]:
+        expected = 0.5 * v + 0.5 * expected
+    assert math.isclose(out, expected)
+
+
+def test_rsi_saturates_when_only_rising():
+    rsi = WilderRSI(3)
+    outputs = [rsi.update(float(p)) for p in range(1, 6)]
+    assert math.isnan(outputs[1])
+    assert outputs[-1] == 100.0
+
+
+def test_obv_sign_follows_batch_rule():
+    obv = OBVState()
+    assert obv.update(10.0, 5.0) == -5.0  # first bar has no previous close
+    assert obv.update(11.0, 5.0) == 5.0
+    assert obv.update(11.0, 2.0) == 2.0
+    assert obv.update(9.0, 1.0) == -1.0
+    assert obv.value == 1.0
+
+
+def test_engine_seed_and_update_skip_replayed_bars():
+    df = pd.DataFrame(
+        {
+            "high": [11.0, 12.0, 13.0],
+            "low": [9.0, 10.0, 11.0],
+            "close": [10.0, 11.0, 12.0],
+            "volume": [100.0, 100.0, 100.0],
+        }
+    )
+    engine = IndicatorEngine()
+    state = engine.seed("AAPL", "D", df)
+    assert len(state.rows) == 2 and state.latest["close"] == 12.0
+    engine.update("AAPL", "D", {"high": 14, "low": 12, "close": 13, "volume": 50, "ts": 5})
+    row = engine.update("AAPL", "D", {"high": 1, "low": 1, "close": 1, "volume": 1, "ts": 5})
+    assert row["close"] == 13.0
+    assert isinstance(engine.state("MSFT", "D"), IndicatorState)
+
+
+def test_streamed_indicators_match_batch(real_pandas):
+    real_pandas(
+        """
+        from data.streaming import compare_with_batch
+
+        rng = np.random.default_rng(3)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 400)))
+        df = pd.DataFrame(
+            {
+                "high": close * (1 + rng.uniform(0, 0.01, 400)),
+                "low": close * (1 - rng.uniform(0, 0.01, 400)),
+                "close": close,
+                "volume": rng.integers(1_000, 10_000, 400).astype(float),
+            },
+            index=pd.date_range("2024-01-01", periods=400, freq="h", tz="UTC"),
+        )
+        diffs = compare_with_batch(df)
+        assert diffs and all(diff < 1e-8 for diff in diffs.values()), diffs
+        """
+    )
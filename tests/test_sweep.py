@@ -0,0 +1,65 @@
+import pytest
+
+from backtest.sweep import SweepTable, grid, sample, split_params
+from config import overridden, settings
+
+
+def test_grid_and_sample_cover_the_space():
+    sets = grid(entry_threshold=[80, 90], supertrend_mult=[2.0, 3.0, 4.0])
+    assert len(sets) == 6 and {"entry_threshold": 90, "supertrend_mult": 4.0} in sets
+    drawn = sample({"max_hold": (10, 20), "pt1_pct": (0.01, 0.03), "regime_vix_tr": [18, 20]}, 50, seed=1)
+    assert all(10 <= s["max_hold"] <= 20 and isinstance(s["max_hold"], int) for s in drawn)
+    assert all(0.01 <= s["pt1_pct"] <= 0.03 and s["regime_vix_tr"] in (18, 20) for s in drawn)
+    assert drawn == sample({"max_hold": (10, 20), "pt1_pct": (0.01, 0.03), "regime_vix_tr": [18, 20]}, 50, seed=1)
+
+
+def test_split_params_routes_fields():
+    signal, bracket, overrides = split_params({"entry_threshold": 85, "stop_pct": 0.04, "supertrend_mult": 2.5})
+    assert signal == {"entry_threshold": 85}
+    assert bracket == {"stop_pct": 0.04}
+    assert overrides == {"supertrend_mult": 2.5}
+    with pytest.raises(ValueError):
+        split_params({"no_such_knob": 1})
+
+
+def test_overridden_restores_settings():
+    before = settings.supertrend_mult
+    with overridden(supertrend_mult=before + 1):
+        assert settings.supertrend_mult == before + 1
+    assert settings.supertrend_mult == before
+    with pytest.raises(AttributeError):
+        with overridden(no_such_knob=1):
+            pass
+
+
+def test_sweep_table_ranks_rows():
+    table = SweepTable("cagr")
+    for i, cagr in enumerate([0.1, 0.3, -0.2, 0.2]):
+        table.add({"id": i, "cagr": cagr})
+    assert [r["id"] for r in table.top(3)] == [1, 3, 0]
+    drawdowns = SweepTable("max_dd", descending=False)
+    for i, dd in enumerate([0.3, 0.1, 0.2]):
+        drawdowns.add({"id": i, "max_dd": dd})
+    assert [r["id"] for r in drawdowns.rows] == [1, 2, 0]
+
+
+def test_sweep_rows_do_not_depend_on_process_count(real_pandas):
+    real_pandas(
+        """
+        from datetime import date
+
+        from backtest.signals import load_panels
+        from backtest.sweep import SharedPanels, grid, run_sweep
+
+        store = synthetic_store(Path("bars"), ["SPY", "AAA", "BBB", "VIX"], "2022-01-03", "2023-06-30")
+        symbols, start = ["AAA", "BBB"], date(2022, 11, 1)
+        panels = load_panels(store, symbols, start, date(2023, 6, 30))
+        params = grid(entry_threshold=[0, 60], supertrend_mult=[2.0, 3.0], stop_pct=[0.02, 0.05])
+        with SharedPanels.create(panels) as shared:
+            tables = [run_sweep(shared, symbols, start, params, processes=n) for n in (1, 2)]
+        serial, parallel = ([sorted(row.items()) for row in table.rows] for table in tables)
+        assert len(serial) == len(params)
+        assert sorted(serial) == sorted(parallel)
+        assert any(row["trades"] for row in tables[0].rows)
+        """
+    )
@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from backtest.metrics import returns, sharpe
+from backtest.signals import SignalMatrix, SignalParams
+from backtest.walkforward import make_folds, walk_forward
+from exec.orders import BracketParams
+from scoring.rules import Rule, RuleSet
+
+DAY = 86_400 * 10**9
+ENTRY = RuleSet(
+    [Rule("go", "trend", 100, "H4.go")]
+    + [Rule(f"no_{c}", c, 0, "H4.go") for c in ("momentum", "volume", "setup", "penalties")]
+)
+EXIT = RuleSet([Rule("out", "out", 20, "H4.out")])
+
+
+def matrix(bars=200, symbols=3, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (symbols, bars)), axis=1))
+    prices = {"open": close, "high": close * 1.01, "low": close * 0.99, "close": close}
+    go, out = rng.random((symbols, bars)) < 0.2, rng.random((symbols, bars)) < 0.2
+    tables = {"H4": {"go": np.stack([go, go], -1), "out": np.stack([out, out], -1)}, "D": {}}
+    times = np.arange(bars, dtype=np.int64) * DAY
+    return SignalMatrix.from_tables(range(symbols), times, prices, tables, entry_rules=ENTRY, exit_rules=EXIT)
+
+
+def test_window_is_a_view():
+    m = matrix()
+    w = m.window(50, 80)
+    assert len(w.times) == 30 and w.locate(int(w.times[5])) == 5
+    assert np.shares_memory(w.prices["close"], m.prices["close"])
+    assert np.shares_memory(w.entry_fired, m.entry_fired)
+
+
+def test_make_folds_roll_by_test_span():
+    times = np.arange(100, dtype=np.int64) * DAY
+    folds = make_folds(times, timedelta(days=30), timedelta(days=10))
+    assert (folds[0].train, folds[0].test) == (slice(0, 30), slice(30, 40))
+    assert folds[1].train == slice(10, 40)
+    assert folds[-1].test == slice(90, 100)
+    assert len(folds) == 7
+    with pytest.raises(ValueError):
+        make_folds(times, timedelta(days=30), timedelta(days=10), step=timedelta(days=5))
+
+
+def test_walk_forward_chains_out_of_sample_folds():
+    m = matrix()
+    candidates = [{"max_hold": h, "pt1_pct": p} for h in (5, 20) for p in (0.01, 0.03)]
+    report = walk_forward(m, candidates, timedelta(days=60), timedelta(days=20), processes=1, cash=1.0)
+    assert len(report.folds) == 7
+    growth = np.prod([f.out_of_sample.equity[-1] for f in report.folds])
+    assert np.isclose(report.equity[-1], growth)
+    assert report.trades == sum(f.out_of_sample.trades for f in report.folds)
+    # One bar per day: the Sharpe ratio is annualised with 365.25 bars a year.
+    assert np.isclose(report.sharpe, sharpe(returns(report.equity)) * np.sqrt(365.25))
+    for f in report.folds:
+        train = m.window(f.fold.train.start, f.fold.train.stop)
+        cagrs = [
+            train.run(SignalParams(max_hold=c["max_hold"], bracket=BracketParams(pt1_pct=c["pt1_pct"])), 1.0).cagr
+            for c in candidates
+        ]
+        assert f.in_sample["cagr"] == max(cagrs)